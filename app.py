@@ -1,10 +1,190 @@
-from flask import Flask, render_template, request, jsonify
-from utils.analyzer import analyze_job_match
-from utils.file_parser import extract_text_from_file
+from flask import Flask, Response, g, render_template, request, jsonify, send_file
+from werkzeug.exceptions import RequestEntityTooLarge
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from utils.analyzer import (
+    analysis_pipeline, analyze_job_match, analyze_match_matrix, analyze_section, batching_encoder, embedding_cache,
+    extract_skills, is_ready, parse_sections, skill_matrix, stream_job_match
+)
+from utils.candidate_index import CandidateIndex, DEFAULT_INDEX_PATH
+from utils.cpu_profiler import cpu_profile_store_from_env
+from utils.file_parser import (
+    DocumentTooLargeError, expand_archive, extract_document, extract_text_from_file, is_archive, truncate_text
+)
+from utils.job_queue import JobQueue, job_backend_from_env
+from utils.memory_tracer import MemoryTracer
+from utils.metrics import cache_collector, registry, request_seconds, requests_in_flight
+from utils.model_loader import is_model_loaded, model_status, start_warmup
+from utils.pipeline import StageTimeoutError
+from utils.profiles import job_profiles, profile_key, resume_profiles
+from utils.response_encoding import COMPRESS_MIN_BYTES, choose_encoding, compact_analysis, compress, pack
+from utils.result_cache import result_cache_from_env, result_key
+import hmac
+import json
 import os
+import time
 
 app = Flask(__name__)
 
+# Whole-request cap covering uploads, archives and JSON bodies (0 disables);
+# pasted form fields share it and are then truncated like JSON text
+app.config['MAX_CONTENT_LENGTH'] = int(float(os.environ.get('JOBFIT_MAX_REQUEST_MB', '32')) * 1024 * 1024) or None
+app.config['MAX_FORM_MEMORY_SIZE'] = app.config['MAX_CONTENT_LENGTH']
+
+# gzip / brotli negotiation for JSON responses (JOBFIT_COMPRESS=0 disables)
+COMPRESS_RESPONSES = os.environ.get('JOBFIT_COMPRESS', '1') == '1'
+
+# Finished /api/analyze bodies by input hash (JOBFIT_RESULT_CACHE=off disables)
+result_cache = result_cache_from_env()
+
+# Parses uploaded files concurrently; threads are created on first use
+upload_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='upload-parser')
+
+# ?profile=1 runs a request under cProfile; only for callers presenting
+# JOBFIT_ADMIN_TOKEN, and disabled while it is unset
+ADMIN_TOKEN = os.environ.get('JOBFIT_ADMIN_TOKEN', '')
+cpu_profiles = cpu_profile_store_from_env()
+
+# Batch analyses behind /api/jobs, worked off in the background
+JOB_MAX_ITEMS = int(os.environ.get('JOBFIT_JOB_MAX_ITEMS', '1000'))
+
+def _process_job_item(item):
+    if item['kind'] == 'resumes':
+        jd_text, resume_text = item['document'], item['text']
+    else:
+        jd_text, resume_text = item['text'], item['document']
+    return analyze_job_match(jd_text, resume_text, sections=item['options'].get('sections'))
+
+job_queue = JobQueue(
+    job_backend_from_env(),
+    _process_job_item,
+    workers=int(os.environ.get('JOBFIT_JOB_WORKERS', '2'))
+)
+
+# Counters kept by the caches and the job workers, exported on /metrics
+if embedding_cache is not None:
+    registry.add_collector(cache_collector('embedding', lambda: {
+        **embedding_cache.stats(),
+        'hits': embedding_cache.counters['memory_hits'] + embedding_cache.counters['disk_hits']
+    }))
+registry.add_collector(cache_collector('resume_profile', resume_profiles.stats))
+registry.add_collector(cache_collector('jd_profile', job_profiles.stats))
+if result_cache is not None:
+    registry.add_collector(cache_collector('result', result_cache.stats))
+registry.add_collector(lambda: [
+    ('jobfit_job_items_total', 'counter', 'Batch job items handled by this process.',
+     [({'outcome': outcome}, job_queue.counters[outcome]) for outcome in ('processed', 'failed')])
+])
+
+# Persistent resume / JD pool used by /api/rank
+candidate_index = CandidateIndex(os.environ.get('JOBFIT_INDEX_PATH', DEFAULT_INDEX_PATH))
+
+def start_background_threads():
+    """
+    Starts the batch job workers and, unless the model is already loaded,
+    the background model load so the first request does not wait for it
+    (not needed when serving from the precomputed skill matrix).
+    Threads do not survive a fork, so under gunicorn.conf.py (JOBFIT_PREFORK=1)
+    this runs in every worker instead of at import.
+    """
+    job_queue.start()
+    if skill_matrix is None and not is_model_loaded() and os.environ.get('JOBFIT_WARMUP', '1') == '1':
+        start_warmup()
+
+# __mp_main__ is this module re-imported by the PDF page workers' forkserver
+if os.environ.get('JOBFIT_PREFORK') != '1' and __name__ != '__mp_main__':
+    start_background_threads()
+
+@app.before_request
+def start_request_timer():
+    g.started = time.perf_counter()
+    g.server_timing = {}
+    g.endpoint_label = request.endpoint or 'unmatched'
+    requests_in_flight.inc(endpoint=g.endpoint_label)
+
+@app.before_request
+def reject_oversized_request():
+    """
+    Answers 413 from the declared Content-Length, before any of the body is read.
+    """
+    limit = app.config['MAX_CONTENT_LENGTH']
+    if limit and request.content_length and request.content_length > limit:
+        return _too_large(RequestEntityTooLarge())
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    return _too_large(e)
+
+def _too_large(e):
+    """
+    413 response for a document over a byte or page limit, or a request over
+    MAX_CONTENT_LENGTH (also raised while a chunked body is being read).
+    """
+    if isinstance(e, RequestEntityTooLarge):
+        message = f"Request is larger than the {app.config['MAX_CONTENT_LENGTH'] / 1024 / 1024:g} MB limit."
+    else:
+        message = str(e)
+    return jsonify({"error": message}), 413
+
+@app.teardown_request
+def finish_request(exc=None):
+    if 'endpoint_label' in g:
+        requests_in_flight.dec(endpoint=g.endpoint_label)
+
+@app.after_request
+def record_request(response):
+    """
+    Observes the request latency and sends a Server-Timing header with the
+    time spent in file parsing, each analysis stage and the whole handler.
+    Streamed bodies are produced later, so only the handler time is included.
+    """
+    if 'started' not in g:
+        return response
+    elapsed = time.perf_counter() - g.started
+    request_seconds.observe(elapsed, endpoint=g.endpoint_label, method=request.method,
+                            status=response.status_code)
+    entries = [f"{name};dur={ms:.2f}" for name, ms in g.server_timing.items()]
+    if 'X-Cache' in response.headers:
+        entries.append(f'cache;desc="{response.headers["X-Cache"].lower()}"')
+    entries.append(f"app;dur={elapsed * 1000:.2f}")
+    response.headers['Server-Timing'] = ', '.join(entries)
+    return response
+
+@app.after_request
+def flag_truncated_inputs(response):
+    """
+    Names the documents cut at JOBFIT_MAX_CHARS (also for streamed responses).
+    """
+    if g.get('truncated'):
+        response.headers['X-Input-Truncated'] = ','.join(sorted(g.truncated))
+    return response
+
+@contextmanager
+def _timed(name):
+    """
+    Adds the duration of the block to the request's Server-Timing entry name.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = g.server_timing
+        timings[name] = timings.get(name, 0) + (time.perf_counter() - started) * 1000
+
+def _stage_timings():
+    """
+    Dict for the pipeline to fill with stage timings; they end up in Server-Timing.
+    """
+    return g.server_timing
+
+@app.route('/metrics')
+def metrics():
+    """
+    Prometheus scrape endpoint: request, stage and operation latencies,
+    input sizes, cache counters and in-flight gauges.
+    """
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
 def index():
     """
@@ -12,46 +192,697 @@ def index():
     """
     return render_template('index.html')
 
+@app.route('/healthz')
+def healthz():
+    """
+    Liveness probe: the process is up and serving requests.
+    """
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz')
+def readyz():
+    """
+    Readiness probe: reports 503 until skills can be scored without a model load.
+    """
+    ready = is_ready()
+    return jsonify({
+        "ready": ready,
+        "embedding_mode": "precomputed" if skill_matrix is not None else "model",
+        "model": model_status()
+    }), 200 if ready else 503
+
+@app.route('/api/stats/encoder')
+def encoder_stats():
+    """
+    Reports batch size and queue wait distributions of the micro-batching encoder.
+    """
+    if batching_encoder is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **batching_encoder.stats()})
+
+@app.route('/api/stats/embedding-cache')
+def embedding_cache_stats():
+    """
+    Reports hit/miss/eviction counters of the phrase embedding cache.
+    """
+    if embedding_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **embedding_cache.stats()})
+
+@app.route('/api/stats/pipeline')
+def pipeline_stats():
+    """
+    Reports per-stage duration distributions of the analysis pipeline.
+    """
+    return jsonify(analysis_pipeline.stats())
+
+@app.route('/api/stats/profiles')
+def profile_stats():
+    """
+    Reports hit/miss/eviction counters of the resume and JD profile caches.
+    """
+    return jsonify({"resume": resume_profiles.stats(), "jd": job_profiles.stats()})
+
+@app.route('/api/stats/result-cache')
+def result_cache_stats():
+    """
+    Reports hit/miss counters of the analysis result cache.
+    """
+    if result_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **result_cache.stats()})
+
+@app.route('/api/stats/jobs')
+def job_stats():
+    """
+    Reports submitted/processed/failed counters of the job workers.
+    """
+    return jsonify(job_queue.stats())
+
+@app.route('/api/profiles/resume', methods=['POST'])
+def register_resume():
+    """
+    API Endpoint to analyze a Resume once and get back a profile ID.
+    Pass the ID as resume_profile_id to /api/analyze to match it against
+    any number of Job Descriptions without re-parsing the resume.
+    """
+    return _register_profile(resume_profiles, 'resume', "Resume is required.")
+
+@app.route('/api/profiles/jd', methods=['POST'])
+def register_jd():
+    """
+    API Endpoint to analyze a Job Description once and get back a profile ID.
+    Pass the ID as jd_profile_id to /api/analyze to match it against any
+    number of Resumes without re-parsing the JD.
+    """
+    return _register_profile(job_profiles, 'jd', "Job Description is required.")
+
+def _register_profile(cache, prefix, missing_message):
+    """
+    Builds (or finds) the profile for <prefix>_text or <prefix>_file.
+    """
+    try:
+        if request.is_json:
+            text = _limited(prefix, request.get_json().get(f'{prefix}_text', ''))
+        else:
+            text, = _read_documents([prefix])
+
+        if not text.strip():
+            return jsonify({"error": missing_message}), 400
+
+        profile = cache.get_or_build(text)
+
+        payload = {"success": True, "data": profile.summary()}
+        if g.get('truncated'):
+            payload["truncated"] = sorted(g.truncated)
+        return jsonify(payload)
+
+    except (DocumentTooLargeError, RequestEntityTooLarge) as e:
+        return _too_large(e)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze():
     """
     API Endpoint to analyze the match between JD and Resume.
     Supports both JSON (text) and Multipart Form Data (files).
+    A resume_profile_id or jd_profile_id from /api/profiles/* can replace
+    the resume or the Job Description. sections (list or comma-separated)
+    limits the response, and the work done, to those sections.
+    compact=1 and msgpack output are described in _analysis_response.
+    Identical requests are answered from the result cache; the ETag lets a
+    client revalidate with If-None-Match and get a 304.
+    Admins can add ?profile=1 (or X-Profile: 1) to run the request under
+    cProfile; the stored profile's ID comes back in X-Profile-Id.
+    ?trace_memory=1 (or X-Trace-Memory: 1) adds a per-stage tracemalloc report.
+    """
+    try:
+        if _profiling_requested():
+            return _profiled('analyze', lambda: _analysis_response(
+                analyze_job_match(**_analysis_arguments(), timings=_stage_timings(), serial=True)
+            ))
+        if _admin_option('trace_memory', 'X-Trace-Memory', "Memory tracing"):
+            return _memory_traced_analysis()
+
+        arguments = _analysis_arguments()
+        key = result_key(
+            jd=arguments['jd_profile'] or profile_key(arguments['jd_text']),
+            resume=arguments['resume_profile'] or profile_key(arguments['resume_text']),
+            sections=sorted(parse_sections(arguments['sections'])),
+            truncated=sorted(g.get('truncated', ()))
+        )
+        
+        return _cached_response(key, lambda: analyze_job_match(**arguments, timings=_stage_timings()))
+        
+    except (DocumentTooLargeError, RequestEntityTooLarge) as e:
+        return _too_large(e)
+    except PermissionError as pe:
+        return jsonify({"error": str(pe)}), 403
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except StageTimeoutError as te:
+        return jsonify({"error": str(te)}), 504
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """
+    Streaming variant of /api/analyze with the same inputs.
+    Sends the score and skill lists as soon as the skill match is done, then
+    each generated section as it becomes ready. The response is NDJSON
+    ({"section": ..., "data": ...} per line) or Server-Sent Events when
+    ?format=sse is given or the client accepts text/event-stream.
+    """
+    try:
+        arguments = _analysis_arguments()
+        parse_sections(arguments['sections'])
+    except (DocumentTooLargeError, RequestEntityTooLarge) as e:
+        return _too_large(e)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+    use_sse = request.args.get('format') == 'sse' or 'text/event-stream' in request.headers.get('Accept', '')
+    compact, omit_input = _compact_options()
+
+    def generate():
+        try:
+            for section, data in stream_job_match(**arguments):
+                if compact:
+                    data = compact_analysis(data, omit_input=omit_input)
+                yield _stream_event(section, {"section": section, "data": data}, use_sse)
+        except Exception as e:
+            yield _stream_event('error', {"section": "error", "error": str(e)}, use_sse)
+
+    return Response(
+        generate(),
+        mimetype='text/event-stream' if use_sse else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def _compact_options():
+    """
+    compact and omit_input flags from the query string, JSON body or form.
+    """
+    data = request.get_json(silent=True) if request.is_json else request.form
+    values = {**(data or {}), **request.args}
+    flag = lambda name: str(values.get(name, '')).lower() in ('1', 'true', 'yes')
+    return flag('compact'), flag('omit_input')
+
+def _analysis_response(result):
+    """
+    Wraps an analysis result for the client.
+    compact=1 sends the tailored resume as line edits against the original
+    and lists repeated strings once (omit_input=1 also drops the original
+    resume); Accept: application/msgpack or ?format=msgpack switches the
+    body to msgpack. Compression is negotiated in compress_response.
+    """
+    compact, omit_input = _compact_options()
+    if compact:
+        result = compact_analysis(result, omit_input=omit_input)
+
+    payload = {"success": True, "data": result}
+    if g.get('truncated'):
+        # Only the first JOBFIT_MAX_CHARS characters of these were analyzed
+        payload["truncated"] = sorted(g.truncated)
+    if _wants_msgpack():
+        return Response(pack(payload), mimetype='application/msgpack')
+    return jsonify(payload)
+
+def _is_admin():
+    token = request.headers.get('X-Admin-Token', '')
+    if not token and request.headers.get('Authorization', '').startswith('Bearer '):
+        token = request.headers['Authorization'][len('Bearer '):]
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8'))
+
+def _admin_option(param, header, what):
+    """
+    True for ?<param>=1 or <header>: 1 from an admin.
+    Raises PermissionError when anyone else asks for it.
+    """
+    if request.args.get(param) != '1' and request.headers.get(header) != '1':
+        return False
+    if not _is_admin():
+        raise PermissionError(f"{what} requires a valid admin token.")
+    return True
+
+def _profiling_requested():
+    if not _admin_option('profile', 'X-Profile', "Profiling"):
+        return False
+    g.profiling = True
+    return True
+
+def _memory_traced_analysis():
+    """
+    Runs an analysis with tracemalloc on, stage by stage, and returns the
+    result with a memory_trace report next to the data. Uploads are parsed
+    in the "parse" stage and JSON encoding is measured as "serialize".
+    """
+    with MemoryTracer() as tracer:
+        with tracer.stage('parse'):
+            arguments = _analysis_arguments()
+        result = analyze_job_match(**arguments, timings=_stage_timings(), around_stage=tracer.stage)
+        with tracer.stage('serialize'):
+            json.dumps(result)
+    return jsonify({"success": True, "data": result, "memory_trace": tracer.report()})
+
+def _profiled(label, handler):
+    """
+    Runs handler() under cProfile, bypassing the result cache, and tags the
+    response with the profile ID.
+    """
+    details = {'endpoint': request.path, 'content_length': request.content_length or 0}
+    try:
+        response, profile_id = cpu_profiles.run(handler, label, details)
+    except Exception as e:
+        profile_id = getattr(e, 'profile_id', None)
+        print(f"Profiled request failed (profile {profile_id}): {e}")
+        raise
+    response.headers['X-Profile-Id'] = profile_id
+    return response
+
+def _wants_msgpack():
+    return request.args.get('format') == 'msgpack' or 'application/msgpack' in request.headers.get('Accept', '')
+
+def _cached_response(key, compute):
+    """
+    Serves an analysis response from the result cache, or computes it with
+    compute() and stores it. key identifies the inputs; the output options
+    (compact, omit_input, msgpack) are added here. Sets a weak ETag (the
+    body may still be compressed) and answers If-None-Match with 304.
+    """
+    if result_cache is None:
+        return _analysis_response(compute())
+
+    compact, omit_input = _compact_options()
+    key = result_key(inputs=key, compact=compact, omit_input=omit_input, msgpack=_wants_msgpack())
+    cached = result_cache.get(key)
+    if cached is not None:
+        etag, body, mimetype = cached
+        response = Response(body, mimetype=mimetype)
+        response.headers['X-Cache'] = 'HIT'
+    else:
+        response = _analysis_response(compute())
+        etag = result_cache.put(key, response.get_data(), response.mimetype)
+        response.headers['X-Cache'] = 'MISS'
+
+    response.set_etag(etag, weak=True)
+    if request.if_none_match.contains_weak(etag):
+        not_modified = Response(status=304)
+        not_modified.set_etag(etag, weak=True)
+        return not_modified
+    return response
+
+@app.after_request
+def compress_response(response):
+    """
+    gzip / brotli for buffered responses above JOBFIT_COMPRESS_MIN_BYTES.
+    Streamed responses are left alone so sections are not held back.
+    """
+    if (not COMPRESS_RESPONSES or response.is_streamed or response.direct_passthrough
+            or 'Content-Encoding' in response.headers or not 200 <= response.status_code < 300):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    body = response.get_data()
+    if encoding is None or len(body) < COMPRESS_MIN_BYTES:
+        return response
+    response.set_data(compress(body, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def _stream_event(name, payload, use_sse):
+    body = json.dumps(payload)
+    if use_sse:
+        return f"event: {name}\ndata: {body}\n\n"
+    return body + "\n"
+
+def _analysis_arguments():
+    """
+    Reads the /api/analyze inputs from JSON or Multipart Form Data.
+    Raises ValueError when the Job Description or the Resume is missing.
+    """
+    # Handle JSON Request (Text only)
+    if request.is_json:
+        data = request.get_json()
+        jd_text = _limited('jd', data.get('jd_text', ''))
+        resume_text = _limited('resume', data.get('resume_text', ''))
+    
+    # Handle Multipart Form Data (Files + Text)
+    else:
+        data = request.form
+        # JD and Resume (File or Text); uploaded files are parsed in parallel
+        with _timed('parse'):
+            jd_text, resume_text = _read_documents(['jd', 'resume'])
+
+    resume_profile_id = data.get('resume_profile_id')
+    jd_profile_id = data.get('jd_profile_id')
+    if not (jd_text or jd_profile_id) or not (resume_text or resume_profile_id):
+        raise ValueError("Both Job Description and Resume are required.")
+
+    return {
+        "jd_text": jd_text,
+        "resume_text": resume_text,
+        "resume_profile": resume_profile_id,
+        "jd_profile": jd_profile_id,
+        "sections": data.get('sections')
+    }
+
+@app.route('/api/analysis/<analysis_id>/<section>')
+def analysis_section(analysis_id, section):
+    """
+    API Endpoint to load one more section of an earlier /api/analyze call,
+    e.g. when a results tab is opened.
     """
     try:
-        jd_text = ""
-        resume_text = ""
+        key = result_key(analysis_id=analysis_id, section=section)
+        return _cached_response(key, lambda: analyze_section(analysis_id, section, timings=_stage_timings()))
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except StageTimeoutError as te:
+        return jsonify({"error": str(te)}), 504
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        # Handle JSON Request (Text only)
+def _read_documents(prefixes):
+    """
+    Returns the text of each <prefix>_file upload (parsed concurrently) or,
+    when no file was sent, of the <prefix>_text form field. Texts over
+    JOBFIT_MAX_CHARS are truncated and noted in g.truncated.
+    """
+    documents, futures = {}, {}
+    for prefix in prefixes:
+        file_storage = request.files.get(f'{prefix}_file')
+        if file_storage is not None and file_storage.filename:
+            if g.get('profiling'):
+                # Parsed in this thread so the profiler sees pypdf / python-docx
+                documents[prefix] = extract_document(file_storage)
+            else:
+                futures[prefix] = upload_executor.submit(extract_document, file_storage)
+    for prefix, future in futures.items():
+        documents[prefix] = future.result()
+
+    texts = []
+    for prefix in prefixes:
+        text, truncated = documents.get(prefix) or truncate_text(request.form.get(f'{prefix}_text', ''))
+        if truncated:
+            g.setdefault('truncated', set()).add(prefix)
+        texts.append(text)
+    return texts
+
+def _limited(prefix, text):
+    """
+    A pasted document cut at JOBFIT_MAX_CHARS, noted in g.truncated if it was.
+    """
+    text, truncated = truncate_text(text)
+    if truncated:
+        g.setdefault('truncated', set()).add(prefix)
+    return text
+
+@app.route('/admin/profiles')
+def list_cpu_profiles():
+    """
+    Admin listing of profiled requests, newest first, with the functions
+    that took the most self time in each.
+    """
+    if not _is_admin():
+        return jsonify({"error": "Admin token required."}), 403
+    return jsonify({"success": True, "data": cpu_profiles.list()})
+
+@app.route('/admin/profiles/<profile_id>')
+def download_cpu_profile(profile_id):
+    """
+    Returns a stored profile: the .pstats dump (default, for snakeviz,
+    flameprof, gprof2dot or pstats) or the text report with ?format=txt.
+    """
+    if not _is_admin():
+        return jsonify({"error": "Admin token required."}), 403
+    extension = 'txt' if request.args.get('format') == 'txt' else 'pstats'
+    try:
+        path = cpu_profiles.path(profile_id, extension)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    if not os.path.exists(path):
+        return jsonify({"error": f"Unknown profile '{profile_id}'."}), 404
+    if extension == 'txt':
+        return send_file(path, mimetype='text/plain')
+    return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                     download_name=f"{profile_id}.pstats")
+
+@app.route('/api/match-matrix', methods=['POST'])
+def match_matrix():
+    """
+    API Endpoint to score N Job Descriptions against M Resumes in one call.
+    Accepts JSON ({"jd_texts": [...], "resume_texts": [...]}) or Multipart Form
+    Data with repeated jd_files / resume_files (and jd_texts / resume_texts) fields.
+    Returns only scores and matched/missing skills, no generated content.
+    """
+    try:
         if request.is_json:
             data = request.get_json()
-            jd_text = data.get('jd_text', '')
-            resume_text = data.get('resume_text', '')
-        
-        # Handle Multipart Form Data (Files + Text)
+            jd_texts = [truncate_text(text)[0] for text in data.get('jd_texts', [])]
+            resume_texts = [truncate_text(text)[0] for text in data.get('resume_texts', [])]
+            jd_labels = [f"jd_{i + 1}" for i in range(len(jd_texts))]
+            resume_labels = [f"resume_{i + 1}" for i in range(len(resume_texts))]
         else:
-            # 1. Get JD (File or Text)
-            if 'jd_file' in request.files and request.files['jd_file'].filename:
-                jd_text = extract_text_from_file(request.files['jd_file'])
-            else:
-                jd_text = request.form.get('jd_text', '')
+            with _timed('parse'):
+                jd_texts, jd_labels = _collect_documents('jd')
+                resume_texts, resume_labels = _collect_documents('resume')
 
-            # 2. Get Resume (File or Text)
-            if 'resume_file' in request.files and request.files['resume_file'].filename:
-                resume_text = extract_text_from_file(request.files['resume_file'])
-            else:
-                resume_text = request.form.get('resume_text', '')
+        if not jd_texts or not resume_texts:
+            return jsonify({"error": "At least one Job Description and one Resume are required."}), 400
+
+        result = analyze_match_matrix(jd_texts, resume_texts)
+        result["jd_labels"] = jd_labels
+        result["resume_labels"] = resume_labels
 
-        if not jd_text or not resume_text:
-            return jsonify({"error": "Both Job Description and Resume are required."}), 400
-            
-        result = analyze_job_match(jd_text, resume_text)
-        
         return jsonify({
             "success": True,
             "data": result
         })
-        
+
+    except (DocumentTooLargeError, RequestEntityTooLarge) as e:
+        return _too_large(e)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def _collect_documents(prefix):
+    """
+    Gathers texts from repeated <prefix>_files uploads and <prefix>_texts fields.
+    Returns the texts and a label (file name or position) for each.
+    """
+    texts, labels = [], []
+    uploads = []
+    for file_storage in request.files.getlist(f'{prefix}_files'):
+        if file_storage.filename:
+            # A .zip upload contributes every document inside it
+            uploads.extend(expand_archive(file_storage, JOB_MAX_ITEMS) if is_archive(file_storage) else [file_storage])
+    for file_storage, text in zip(uploads, upload_executor.map(extract_text_from_file, uploads)):
+        texts.append(text)
+        labels.append(file_storage.filename)
+    for text in request.form.getlist(f'{prefix}_texts'):
+        if text.strip():
+            texts.append(truncate_text(text)[0])
+            labels.append(f"{prefix}_{len(texts)}")
+    return texts, labels
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """
+    API Endpoint to queue a batch analysis and return its job ID right away.
+    Send one Job Description (jd_text / jd_file) and many resumes
+    (resume_texts / resume_files, .zip archives allowed), or one resume and
+    many Job Descriptions (jd_texts / jd_files). sections defaults to score.
+    """
+    try:
+        jd_texts, jd_labels = _batch_documents('jd')
+        resume_texts, resume_labels = _batch_documents('resume')
+        data = (request.get_json() if request.is_json else request.form) or {}
+        sections = parse_sections(data.get('sections') or ['score'])
+
+        empty = [label for label, text in zip(jd_labels + resume_labels, jd_texts + resume_texts) if not text.strip()]
+        if empty:
+            return jsonify({"error": f"No text found in: {', '.join(empty)}."}), 400
+
+        if len(jd_texts) == 1 and resume_texts:
+            kind, document, items = 'resumes', jd_texts[0], list(zip(resume_labels, resume_texts))
+        elif len(resume_texts) == 1 and jd_texts:
+            kind, document, items = 'jds', resume_texts[0], list(zip(jd_labels, jd_texts))
+        else:
+            return jsonify({"error": "Send one Job Description and many Resumes, or one Resume and many Job Descriptions."}), 400
+
+        if len(items) > JOB_MAX_ITEMS:
+            return jsonify({"error": f"A job can hold at most {JOB_MAX_ITEMS} documents."}), 400
+
+        job_id = job_queue.submit(kind, document, items, {"sections": sections})
+
+        return jsonify({
+            "success": True,
+            "data": job_queue.status(job_id)
+        }), 202
+
+    except (DocumentTooLargeError, RequestEntityTooLarge) as e:
+        return _too_large(e)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """
+    API Endpoint to poll the progress of a batch analysis.
+    """
+    status = job_queue.status(job_id)
+    if status is None:
+        return jsonify({"error": f"Unknown job '{job_id}'."}), 404
+    return jsonify({"success": True, "data": status})
+
+@app.route('/api/jobs/<job_id>/results')
+def job_results(job_id):
+    """
+    API Endpoint to page through the results of a batch analysis, finished
+    or not (?offset=0&limit=50). Items keep their submission order; pending
+    ones have no result yet.
+    """
+    try:
+        offset = int(request.args.get('offset', 0))
+        limit = min(int(request.args.get('limit', 50)), 500)
+    except ValueError:
+        return jsonify({"error": "offset and limit must be integers."}), 400
+
+    items = job_queue.results(job_id, offset, limit)
+    if items is None:
+        return jsonify({"error": f"Unknown job '{job_id}'."}), 404
+    status = job_queue.status(job_id)
+    next_offset = offset + len(items)
+    return jsonify({
+        "success": True,
+        "data": {
+            "job": status,
+            "items": items,
+            "next_offset": next_offset if next_offset < status['total'] else None
+        }
+    })
+
+def _batch_documents(prefix):
+    """
+    All documents of one side of a batch: <prefix>_text / <prefix>_file plus
+    the repeated <prefix>_texts / <prefix>_files fields (zip archives expanded).
+    """
+    if request.is_json:
+        data = request.get_json()
+        texts = ([data[f'{prefix}_text']] if data.get(f'{prefix}_text') else []) + list(data.get(f'{prefix}_texts', []))
+        if not all(isinstance(text, str) for text in texts):
+            raise ValueError(f"{prefix}_texts must be a list of strings.")
+        texts = [truncate_text(text)[0] for text in texts]
+        return texts, [f"{prefix}_{i + 1}" for i in range(len(texts))]
+
+    with _timed('parse'):
+        texts, labels = _collect_documents(prefix)
+        single, = _read_documents([prefix])
+    if single.strip():
+        file_storage = request.files.get(f'{prefix}_file')
+        texts.insert(0, single)
+        labels.insert(0, file_storage.filename if file_storage is not None and file_storage.filename else prefix)
+    return texts, labels
+
+@app.route('/api/index', methods=['POST'])
+def index_document():
+    """
+    API Endpoint to add or update a Resume or Job Description in the ranking pool.
+    Expects kind ("resume" or "jd"), doc_id and either text or a file.
+    """
+    try:
+        if request.is_json:
+            data = request.get_json()
+            kind = data.get('kind', '')
+            doc_id = str(data.get('doc_id', '')).strip()
+            text = truncate_text(data.get('text', ''))[0]
+        else:
+            kind = request.form.get('kind', '')
+            doc_id = request.form.get('doc_id', '').strip()
+            if 'file' in request.files and request.files['file'].filename:
+                text = extract_text_from_file(request.files['file'])
+                doc_id = doc_id or request.files['file'].filename
+            else:
+                text = truncate_text(request.form.get('text', ''))[0]
+
+        if not doc_id or not text:
+            return jsonify({"error": "Both doc_id and document text are required."}), 400
+
+        skills = candidate_index.upsert(kind, doc_id, text=text)
+
+        return jsonify({
+            "success": True,
+            "data": {"kind": kind, "doc_id": doc_id, "skills": skills}
+        })
+
+    except (DocumentTooLargeError, RequestEntityTooLarge) as e:
+        return _too_large(e)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/index/<kind>/<doc_id>', methods=['DELETE'])
+def delete_document(kind, doc_id):
+    """
+    API Endpoint to remove a Resume or Job Description from the ranking pool.
+    """
+    try:
+        if not candidate_index.delete(kind, doc_id):
+            return jsonify({"error": f"No {kind} with id '{doc_id}' in the index."}), 404
+        return jsonify({"success": True})
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+@app.route('/api/rank', methods=['POST'])
+def rank():
+    """
+    API Endpoint to rank the indexed pool.
+    A Job Description (jd_text or jd_id) ranks resumes; a Resume
+    (resume_text or resume_id) ranks job descriptions.
+    """
+    try:
+        data = request.get_json() if request.is_json else request.form
+        top_k = int(data.get('top_k', 50))
+        prune = data.get('prune', 'skills')
+
+        if data.get('jd_text') or data.get('jd_id'):
+            query_kind, target_kind = 'jd', 'resume'
+        elif data.get('resume_text') or data.get('resume_id'):
+            query_kind, target_kind = 'resume', 'jd'
+        else:
+            return jsonify({"error": "Provide a Job Description or a Resume to rank against."}), 400
+
+        if data.get(f'{query_kind}_id'):
+            query_skills = candidate_index.get_skills(query_kind, data[f'{query_kind}_id'])
+            if query_skills is None:
+                return jsonify({"error": f"No {query_kind} with id '{data[f'{query_kind}_id']}' in the index."}), 404
+        else:
+            query_skills = extract_skills(_limited(query_kind, data[f'{query_kind}_text']))
+
+        results = candidate_index.query(query_skills, target_kind, top_k=top_k, prune=prune)
+
+        payload = {
+            "success": True,
+            "data": {
+                "target": target_kind,
+                "query_skills": sorted(query_skills),
+                "pool_size": candidate_index.count(target_kind),
+                "results": results
+            }
+        }
+        if g.get('truncated'):
+            payload["truncated"] = sorted(g.truncated)
+        return jsonify(payload)
+
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 400
     except Exception as e:
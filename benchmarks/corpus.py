@@ -0,0 +1,297 @@
+"""
+Synthetic Corpus
+Deterministic resumes and job descriptions of controlled size (pages, skill
+count, section layout, bullet density), rendered as TXT, PDF and DOCX
+
+Usage:
+    python benchmarks/corpus.py --output corpus/ --resumes 50 --jds 5
+    python benchmarks/corpus.py --output corpus/ --min-pages 5 --max-pages 20 --min-skills 100 --max-skills 500
+
+The corpus directory also gets a taxonomy.json covering every generated
+skill; point JOBFIT_SKILL_TAXONOMY at it to exercise large skill counts.
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+
+from utils.skill_taxonomy import DEFAULT_TAXONOMY_PATH
+
+# Roughly one page of a typical resume at 11pt
+CHARS_PER_PAGE = 3000
+
+PDF_LINES_PER_PAGE = 60
+PDF_LINE_WIDTH = 95
+
+SYLLABLES = ('zen', 'tri', 'vo', 'lex', 'mar', 'quo', 'dra', 'pix', 'sol', 'ny', 'bel', 'tor', 'kan', 'ri', 'ox')
+SKILL_SUFFIXES = ('', '', ' db', ' cloud', ' ml', 'js', ' stream', ' ops')
+
+SECTION_STYLES = {
+    'upper': lambda name: name.upper(),
+    'colon': lambda name: f"{name.title()}:",
+    'markdown': lambda name: f"## {name.title()}",
+}
+SECTION_NAMES = {
+    'summary': ('summary', 'professional summary', 'profile'),
+    'skills': ('technical skills', 'skills', 'core competencies'),
+    'experience': ('work experience', 'experience', 'employment history'),
+    'projects': ('projects', 'selected projects'),
+    'education': ('education', 'academic background'),
+    'certifications': ('certifications', 'licenses & certifications'),
+}
+BULLET_CHARS = ('-', '•', '*')
+
+BULLET_TEMPLATES = (
+    "Developed {skill} services handling {n}K requests per day",
+    "Led migration of legacy systems to {skill}, cutting costs by {n}%",
+    "Built internal tooling with {skill} and {skill2} used by {n} engineers",
+    "Implemented monitoring and alerting for {skill} deployments",
+    "Optimized {skill} queries, reducing latency by {n}%",
+    "Mentored {n} junior developers on {skill} best practices",
+    "Designed a data pipeline combining {skill} and {skill2}",
+    "Collaborated with cross-functional teams to deliver {skill} features",
+)
+JD_LINES = (
+    "You will design, build and operate services using {skill}.",
+    "Experience with {skill} and {skill2} is required.",
+    "Knowledge of {skill} is a plus.",
+    "Own the roadmap for our {skill} platform and mentor other engineers.",
+    "We value collaboration, ownership and a data-driven mindset.",
+    "Proficiency in {skill} for production workloads.",
+)
+
+
+def skill_vocabulary(size, seed=0, base=None):
+    """
+    The taxonomy's skills followed by deterministic synthetic skill names
+    until the vocabulary holds size entries
+    """
+    if base is None:
+        with open(DEFAULT_TAXONOMY_PATH, encoding='utf-8') as f:
+            base = [entry['name'] for entry in json.load(f)['skills']]
+    vocab = list(dict.fromkeys(base))[:size]
+    rng = random.Random(seed)
+    seen = set(vocab)
+    while len(vocab) < size:
+        name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) + rng.choice(SKILL_SUFFIXES)
+        if name not in seen:
+            seen.add(name)
+            vocab.append(name)
+    return vocab
+
+
+def generate_resume(rng, vocab, pages=1, skills=15, bullets_per_job=4, layout=None):
+    """
+    One resume of about pages * CHARS_PER_PAGE characters mentioning
+    skills distinct skills
+
+    Args:
+        rng (random.Random): Source of all choices
+        vocab (list): Skill names to draw from
+        pages (int): Target length in pages
+        skills (int): Number of distinct skills mentioned
+        bullets_per_job (int): Bullet density of the experience section
+        layout (dict): Heading style, section order and bullet character;
+            drawn from rng when None
+
+    Returns:
+        tuple: (text, layout)
+    """
+    layout = layout or random_layout(rng)
+    heading = SECTION_STYLES[layout['heading']]
+    bullet = layout['bullet']
+    chosen = rng.sample(vocab, min(skills, len(vocab)))
+    n = rng.randint(100, 999)
+
+    def line(template):
+        return template.format(skill=rng.choice(chosen), skill2=rng.choice(chosen), n=rng.randint(2, 90))
+
+    sections = {
+        'summary': [f"Engineer with {rng.randint(2, 20)} years of experience in {', '.join(chosen[:3])}."],
+        'skills': [f"Languages & Tools: {', '.join(chosen[i:i + 12])}" for i in range(0, len(chosen), 12)],
+        'projects': [f"{bullet} {line(rng.choice(BULLET_TEMPLATES))}" for _ in range(rng.randint(1, 3))],
+        'education': [f"B.S. Computer Science | State University {n} | {rng.randint(1995, 2020)}"],
+        'certifications': [f"Certified {rng.choice(chosen)} Professional"],
+    }
+
+    target = pages * CHARS_PER_PAGE
+    header = [f"Candidate {n}", f"Email: candidate{n}@example.com | Phone: (555) 010-{n:04d}", ""]
+    fixed = sum(len(l) + 1 for part in sections.values() for l in part) + sum(len(l) + 1 for l in header)
+
+    experience, job = [], 0
+    while fixed + sum(len(l) + 1 for l in experience) < target or job == 0:
+        year = 2023 - job
+        experience.append(f"Software Engineer | Company {job + 1} | {year - 1} - {year}")
+        experience.extend(f"{bullet} {line(rng.choice(BULLET_TEMPLATES))}" for _ in range(bullets_per_job))
+        experience.append("")
+        job += 1
+    sections['experience'] = experience
+
+    lines = list(header)
+    for name in layout['order']:
+        lines.append(heading(rng.choice(SECTION_NAMES[name])))
+        lines.extend(sections[name])
+        lines.append("")
+    return '\n'.join(lines).rstrip() + '\n', layout
+
+
+def random_layout(rng):
+    order = ['summary', 'skills', 'experience', 'projects', 'education', 'certifications']
+    # Summary stays first; everything else can move
+    rest = order[1:]
+    rng.shuffle(rest)
+    return {'heading': rng.choice(sorted(SECTION_STYLES)), 'bullet': rng.choice(BULLET_CHARS), 'order': [order[0]] + rest}
+
+
+def generate_jd(rng, vocab, skills=12, pages=1):
+    """
+    A job description requiring skills distinct skills
+    """
+    chosen = rng.sample(vocab, min(skills, len(vocab)))
+    n = rng.randint(1, 99)
+    lines = ["Senior Software Engineer", f"Company: Example Corp {n}", "Location: Remote", "",
+             f"Requirements: {', '.join(chosen)}", ""]
+    while sum(len(l) + 1 for l in lines) < pages * CHARS_PER_PAGE:
+        lines.append(rng.choice(JD_LINES).format(skill=rng.choice(chosen), skill2=rng.choice(chosen)))
+    return '\n'.join(lines) + '\n'
+
+
+def _pdf_escape(text):
+    text = text.replace('•', '-').replace('–', '-')
+    text = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return text.encode('latin-1', 'replace')
+
+
+def render_pdf(text):
+    """
+    Minimal text-only PDF (Helvetica, one text line per source line,
+    long lines wrapped) that pypdf can extract again
+    """
+    lines = []
+    for source in text.split('\n'):
+        lines.extend([source[i:i + PDF_LINE_WIDTH] for i in range(0, len(source), PDF_LINE_WIDTH)] or [''])
+    pages = [lines[i:i + PDF_LINES_PER_PAGE] for i in range(0, len(lines), PDF_LINES_PER_PAGE)] or [[]]
+
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in pages:
+        stream = b"BT /F1 10 Tf 12 TL 50 770 Td\n" + b''.join(b"(" + _pdf_escape(l) + b") Tj T*\n" for l in page) + b"ET"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+                       b"/Contents %d 0 R >>" % content_id)
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b' '.join(b"%d 0 R" % k for k in kids), len(kids))
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b''.join(b"%010d 00000 n \n" % offset for offset in offsets))
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def render_docx(text):
+    """
+    DOCX with one paragraph per line; bullet lines use the List Bullet style
+    """
+    document = Document()
+    for line in text.split('\n'):
+        if line[:2] in ('- ', '• ', '* '):
+            document.add_paragraph(line[2:], style='List Bullet')
+        else:
+            document.add_paragraph(line)
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def generate_corpus(resumes=20, jds=3, seed=0, min_pages=1, max_pages=3, min_skills=10, max_skills=40,
+                    min_bullets=2, max_bullets=8, vocab_size=None):
+    """
+    Documents with sizes spread evenly over the requested ranges
+
+    Returns:
+        tuple: (vocabulary, list of dicts with id, kind, text and the
+        parameters used to generate it)
+    """
+    rng = random.Random(seed)
+    vocab = skill_vocabulary(vocab_size or max(max_skills, 60), seed)
+    documents = []
+    for n in range(jds):
+        skills = rng.randint(min_skills, max(min_skills, max_skills // 2))
+        documents.append({'id': f"jd_{n:03d}", 'kind': 'jd', 'pages': 1, 'skills': skills,
+                          'text': generate_jd(rng, vocab, skills)})
+    for n in range(resumes):
+        pages = min_pages + (n * (max_pages - min_pages + 1) // max(resumes, 1))
+        skills = rng.randint(min_skills, max_skills)
+        bullets = rng.randint(min_bullets, max_bullets)
+        text, layout = generate_resume(rng, vocab, pages=pages, skills=skills, bullets_per_job=bullets)
+        documents.append({'id': f"resume_{n:03d}", 'kind': 'resume', 'pages': pages, 'skills': skills,
+                          'bullets_per_job': bullets, 'layout': layout, 'text': text})
+    return vocab, documents
+
+
+def write_corpus(output, vocab, documents, formats=('txt', 'pdf', 'docx')):
+    """
+    Write every document in every format plus manifest.json and taxonomy.json
+    """
+    renderers = {'txt': lambda text: text.encode('utf-8'), 'pdf': render_pdf, 'docx': render_docx}
+    os.makedirs(output, exist_ok=True)
+    manifest = []
+    for document in documents:
+        entry = {k: v for k, v in document.items() if k != 'text'}
+        entry['characters'] = len(document['text'])
+        entry['files'] = {}
+        for file_format in formats:
+            name = f"{document['id']}.{file_format}"
+            with open(os.path.join(output, name), 'wb') as f:
+                f.write(renderers[file_format](document['text']))
+            entry['files'][file_format] = name
+        manifest.append(entry)
+
+    with open(os.path.join(output, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    with open(os.path.join(output, 'taxonomy.json'), 'w') as f:
+        json.dump({'version': 1, 'skills': [{'name': s, 'category': None, 'aliases': []} for s in vocab]}, f, indent=1)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume / JD corpus.")
+    parser.add_argument('--output', required=True, help="Directory to write the corpus to")
+    parser.add_argument('--resumes', type=int, default=20)
+    parser.add_argument('--jds', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--min-pages', type=int, default=1)
+    parser.add_argument('--max-pages', type=int, default=3)
+    parser.add_argument('--min-skills', type=int, default=10)
+    parser.add_argument('--max-skills', type=int, default=40)
+    parser.add_argument('--min-bullets', type=int, default=2)
+    parser.add_argument('--max-bullets', type=int, default=8)
+    parser.add_argument('--formats', default='txt,pdf,docx', help="Comma-separated subset of txt,pdf,docx")
+    args = parser.parse_args(argv)
+
+    vocab, documents = generate_corpus(
+        resumes=args.resumes, jds=args.jds, seed=args.seed, min_pages=args.min_pages, max_pages=args.max_pages,
+        min_skills=args.min_skills, max_skills=args.max_skills, min_bullets=args.min_bullets,
+        max_bullets=args.max_bullets
+    )
+    manifest = write_corpus(args.output, vocab, documents, formats=tuple(args.formats.split(',')))
+    print(f"Wrote {len(manifest)} documents ({len(vocab)} skills) to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
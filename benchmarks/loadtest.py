@@ -0,0 +1,441 @@
+"""
+Load Test
+Replays a synthetic corpus against /api/analyze, either over HTTP or
+in-process through the Flask test client, and reports throughput, latency
+percentiles, error rate and the per-stage breakdown from Server-Timing
+
+Closed loop: --concurrency workers each send their next request as soon as
+the previous one returns. Open loop: requests arrive at --rate per second
+(Poisson by default) whether or not earlier ones have finished, and latency
+is counted from the scheduled arrival so queueing in the client is included.
+Comma-separated --concurrency / --rate values run one step per value.
+
+Usage:
+    python benchmarks/loadtest.py --concurrency 1,4,8 --duration 30
+    python benchmarks/loadtest.py --url http://localhost:5000 --rate 2,5,10,20 --duration 60 --output run.json
+    python benchmarks/loadtest.py --mix json,pdf --compare run.json
+"""
+
+import argparse
+import http.client
+import io
+import json
+import os
+import platform
+import queue
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_corpus, render_docx, render_pdf
+from benchmarks.microbench import percentile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ANALYZE_PATH = '/api/analyze'
+PAYLOAD_FORMATS = ('json', 'txt', 'pdf', 'docx')
+
+
+def _multipart(fields, files):
+    """
+    (body, content type) of a multipart/form-data request
+    """
+    boundary = uuid.uuid4().hex
+    out = io.BytesIO()
+    for name, value in fields.items():
+        out.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode())
+        out.write(value.encode('utf-8') + b'\r\n')
+    for name, (filename, data) in files.items():
+        out.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                  f'Content-Type: application/octet-stream\r\n\r\n'.encode())
+        out.write(data + b'\r\n')
+    out.write(f'--{boundary}--\r\n'.encode())
+    return out.getvalue(), f'multipart/form-data; boundary={boundary}'
+
+
+def build_payloads(documents, formats):
+    """
+    One request per resume and format, each resume paired with a JD in turn.
+    'json' sends both texts as JSON; the other formats upload the resume as
+    a file with the JD in a form field.
+
+    Returns:
+        list: dicts with format, body and content_type
+    """
+    renderers = {'txt': lambda text: text.encode('utf-8'), 'pdf': render_pdf, 'docx': render_docx}
+    jds = [d['text'] for d in documents if d['kind'] == 'jd']
+    resumes = [d for d in documents if d['kind'] == 'resume']
+    payloads = []
+    for n, resume in enumerate(resumes):
+        jd = jds[n % len(jds)]
+        for payload_format in formats:
+            if payload_format == 'json':
+                body = json.dumps({'jd_text': jd, 'resume_text': resume['text']}).encode('utf-8')
+                content_type = 'application/json'
+            else:
+                body, content_type = _multipart(
+                    {'jd_text': jd},
+                    {'resume_file': (f"{resume['id']}.{payload_format}", renderers[payload_format](resume['text']))}
+                )
+            payloads.append({'format': payload_format, 'body': body, 'content_type': content_type})
+    return payloads
+
+
+def parse_server_timing(header):
+    """
+    {name: milliseconds} of the entries in a Server-Timing header that carry
+    a duration, plus the cache description if present
+    """
+    durations, cache = {}, None
+    for entry in (header or '').split(','):
+        name, *params = [part.strip() for part in entry.split(';')]
+        for param in params:
+            key, _, value = param.partition('=')
+            if key == 'dur':
+                durations[name] = durations.get(name, 0) + float(value)
+            elif key == 'desc' and name == 'cache':
+                cache = value.strip('"')
+    return durations, cache
+
+
+class HttpTransport:
+    """
+    Keep-alive connection per worker thread to a running server
+    """
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.path = parts.path.rstrip('/') + ANALYZE_PATH
+        self._local = threading.local()
+
+    def describe(self):
+        return f"{self.connection_class.__name__}({self.netloc})"
+
+    def post(self, payload, timeout):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self.connection_class(self.netloc, timeout=timeout)
+        try:
+            connection.request('POST', self.path, body=payload['body'],
+                               headers={'Content-Type': payload['content_type']})
+            response = connection.getresponse()
+            response.read()
+            return response.status, response.getheader('Server-Timing')
+        except Exception:
+            # Reconnect on the next request
+            connection.close()
+            self._local.connection = None
+            raise
+
+
+class InProcessTransport:
+    """
+    Flask test client, one per worker thread; the app runs in this process
+    """
+
+    def __init__(self):
+        from app import app
+        self.app = app
+        self._local = threading.local()
+
+    def describe(self):
+        return 'in-process'
+
+    def post(self, payload, timeout):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.post(ANALYZE_PATH, data=payload['body'], content_type=payload['content_type'])
+        return response.status_code, response.headers.get('Server-Timing')
+
+
+def _send(transport, payload, timeout):
+    started = time.perf_counter()
+    try:
+        status, server_timing = transport.post(payload, timeout)
+        error = None
+    except Exception as e:
+        status, server_timing, error = None, None, f"{type(e).__name__}: {e}"
+    return {'format': payload['format'], 'started': started, 'finished': time.perf_counter(),
+            'status': status, 'server_timing': server_timing, 'error': error}
+
+
+def run_closed_loop(transport, payloads, concurrency, duration, max_requests, timeout):
+    """
+    concurrency workers sending back to back until duration seconds pass or
+    max_requests have been sent
+    """
+    deadline = time.perf_counter() + duration
+    counter = iter(range(max_requests or sys.maxsize))
+    counter_lock = threading.Lock()
+    results = []
+
+    def worker():
+        while time.perf_counter() < deadline:
+            with counter_lock:
+                n = next(counter, None)
+            if n is None:
+                return
+            result = _send(transport, payloads[n % len(payloads)], timeout)
+            result['scheduled'] = result['started']
+            results.append(result)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def run_open_loop(transport, payloads, rate, concurrency, duration, max_requests, timeout, arrivals, rng):
+    """
+    Requests scheduled at rate per second for duration seconds and served by
+    up to concurrency workers; a request waiting for a free worker is late,
+    and that wait counts towards its latency
+    """
+    pending = queue.Queue()
+    results = []
+
+    def worker():
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            n, scheduled = item
+            result = _send(transport, payloads[n % len(payloads)], timeout)
+            result['scheduled'] = scheduled
+            results.append(result)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+
+    start = time.perf_counter()
+    scheduled, n = start, 0
+    while scheduled < start + duration and n < (max_requests or sys.maxsize):
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        pending.put((n, scheduled))
+        n += 1
+        scheduled += rng.expovariate(rate) if arrivals == 'poisson' else 1 / rate
+
+    for _ in threads:
+        pending.put(None)
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def _latency_summary(values):
+    values = sorted(values)
+    if not values:
+        return None
+    return {
+        'mean_ms': round(sum(values) / len(values), 3),
+        'p50_ms': round(percentile(values, 0.50), 3),
+        'p95_ms': round(percentile(values, 0.95), 3),
+        'p99_ms': round(percentile(values, 0.99), 3),
+        'max_ms': round(values[-1], 3)
+    }
+
+
+def summarize(results):
+    """
+    Throughput, latency percentiles (from scheduled arrival), service time,
+    error rate, status codes, cache hits and per-stage Server-Timing
+    """
+    if not results:
+        return {'requests': 0}
+    first = min(r['scheduled'] for r in results)
+    elapsed = max(r['finished'] for r in results) - first
+    ok = [r for r in results if r['status'] is not None and r['status'] < 400]
+    stages = defaultdict(list)
+    caches = Counter()
+    for r in ok:
+        durations, cache = parse_server_timing(r['server_timing'])
+        for name, ms in durations.items():
+            stages[name].append(ms)
+        if cache:
+            caches[cache] += 1
+
+    return {
+        'requests': len(results),
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_rps': round(len(ok) / elapsed, 3) if elapsed else None,
+        'error_rate': round(1 - len(ok) / len(results), 4),
+        'statuses': dict(Counter(str(r['status'] or 'exception') for r in results)),
+        'errors': dict(Counter(r['error'] for r in results if r['error']).most_common(5)),
+        'latency': _latency_summary([(r['finished'] - r['scheduled']) * 1000 for r in ok]),
+        'service_time': _latency_summary([(r['finished'] - r['started']) * 1000 for r in ok]),
+        'by_format': {
+            payload_format: _latency_summary([(r['finished'] - r['scheduled']) * 1000
+                                              for r in ok if r['format'] == payload_format])
+            for payload_format in sorted({r['format'] for r in ok})
+        },
+        'cache': dict(caches),
+        'stages': {name: {'requests': len(values), **_latency_summary(values)}
+                   for name, values in sorted(stages.items())}
+    }
+
+
+def _git_revision():
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision + ('-dirty' if dirty else '')
+
+
+def _ms(summary, key):
+    return f"{summary[key]:.1f}" if summary else '-'
+
+
+def print_step(step):
+    summary = step['summary']
+    latency = summary.get('latency')
+    print(f"{step['label']:<18}{summary['requests']:>8}{summary.get('throughput_rps') or 0:>10.2f}"
+          f"{_ms(latency, 'p50_ms'):>10}{_ms(latency, 'p95_ms'):>10}{_ms(latency, 'p99_ms'):>10}"
+          f"{summary.get('error_rate', 0) * 100:>8.1f}%")
+
+
+def print_stages(step):
+    stages = step['summary'].get('stages') or {}
+    if not stages:
+        return
+    print(f"  stages of {step['label']}: " + ', '.join(
+        f"{name} p50 {row['p50_ms']:.1f} / p95 {row['p95_ms']:.1f} ms"
+        for name, row in sorted(stages.items(), key=lambda item: -item[1]['p50_ms'])
+    ))
+
+
+def print_comparison(report, previous):
+    """
+    Throughput and tail latency of matching steps against an earlier report
+    """
+    before = {step['label']: step['summary'] for step in previous.get('steps', [])}
+    print(f"\nCompared with {previous.get('meta', {}).get('git_revision')} "
+          f"({previous.get('meta', {}).get('label') or 'unlabelled'}):")
+    matched = False
+    for step in report['steps']:
+        old, new = before.get(step['label']), step['summary']
+        if not old or not old.get('latency') or not new.get('latency'):
+            continue
+        matched = True
+        changes = [f"throughput {old['throughput_rps']:.2f} -> {new['throughput_rps']:.2f} rps"]
+        for key in ('p50_ms', 'p99_ms'):
+            changes.append(f"{key[:3]} {old['latency'][key]:.1f} -> {new['latency'][key]:.1f} ms "
+                           f"({(new['latency'][key] / old['latency'][key] - 1) * 100:+.1f}%)")
+        print(f"  {step['label']:<18}" + ', '.join(changes))
+    if not matched:
+        print("  no steps in common (run the same --concurrency / --rate values)")
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(',')]
+
+
+def _float_list(value):
+    return [float(v) for v in value.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test /api/analyze.")
+    parser.add_argument('--url', help="Base URL of a running server (default: in-process test client)")
+    parser.add_argument('--concurrency', type=_int_list, default=[4],
+                        help="Workers; a comma-separated list runs one closed-loop step per value")
+    parser.add_argument('--rate', type=_float_list,
+                        help="Arrivals per second for an open loop; a list runs one step per rate")
+    parser.add_argument('--arrivals', choices=('poisson', 'uniform'), default='poisson')
+    parser.add_argument('--duration', type=float, default=20, help="Seconds per step")
+    parser.add_argument('--requests', type=int, help="Stop a step after this many requests")
+    parser.add_argument('--warmup', type=int, default=5, help="Unmeasured requests sent first")
+    parser.add_argument('--timeout', type=float, default=120, help="HTTP timeout per request")
+    parser.add_argument('--mix', default='json,pdf,docx', help=f"Comma-separated subset of {','.join(PAYLOAD_FORMATS)}")
+    parser.add_argument('--resumes', type=int, default=30)
+    parser.add_argument('--jds', type=int, default=3)
+    parser.add_argument('--max-pages', type=int, default=3)
+    parser.add_argument('--max-skills', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--label', help="Free text stored with the results, e.g. the server configuration")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    parser.add_argument('--compare', help="Earlier report to compare against")
+    args = parser.parse_args(argv)
+
+    formats = args.mix.split(',')
+    unknown = set(formats) - set(PAYLOAD_FORMATS)
+    if unknown:
+        parser.error(f"unknown --mix formats: {', '.join(sorted(unknown))}")
+
+    from utils.analyzer import COMMON_SKILLS
+    _, documents = generate_corpus(resumes=args.resumes, jds=args.jds, seed=args.seed, max_pages=args.max_pages,
+                                   max_skills=args.max_skills, vocab_size=len(COMMON_SKILLS))
+    payloads = build_payloads(documents, formats)
+    random.Random(args.seed).shuffle(payloads)
+
+    transport = HttpTransport(args.url) if args.url else InProcessTransport()
+    for n in range(args.warmup):
+        _send(transport, payloads[n % len(payloads)], args.timeout)
+
+    report = {
+        'meta': {
+            'git_revision': _git_revision(),
+            'label': args.label,
+            'transport': transport.describe(),
+            'created_at': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            # Only describes the server for in-process runs
+            'environment': {k: v for k, v in os.environ.items() if k.startswith('JOBFIT_') and k != 'JOBFIT_ADMIN_TOKEN'},
+            'corpus': {'resumes': args.resumes, 'jds': args.jds, 'max_pages': args.max_pages,
+                       'max_skills': args.max_skills, 'seed': args.seed, 'mix': formats,
+                       'payloads': len(payloads)},
+            'mode': 'open' if args.rate else 'closed',
+            'arrivals': args.arrivals if args.rate else None,
+            'duration_seconds': args.duration
+        },
+        'steps': []
+    }
+
+    print(f"{'step':<18}{'requests':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+    rng = random.Random(args.seed)
+    if args.rate:
+        concurrency = max(args.concurrency)
+        steps = [(f"rate={rate:g}", lambda rate=rate: run_open_loop(
+            transport, payloads, rate, concurrency, args.duration, args.requests, args.timeout, args.arrivals, rng
+        ), {'rate': rate, 'concurrency': concurrency}) for rate in args.rate]
+    else:
+        steps = [(f"concurrency={c}", lambda c=c: run_closed_loop(
+            transport, payloads, c, args.duration, args.requests, args.timeout
+        ), {'concurrency': c}) for c in args.concurrency]
+
+    for label, run, settings in steps:
+        step = {'label': label, **settings, 'summary': summarize(run())}
+        report['steps'].append(step)
+        print_step(step)
+    for step in report['steps']:
+        print_stages(step)
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+Memory Report
+Replays a corpus through the analysis pipeline with tracemalloc on and
+reports peak memory per stage, per input size and the allocation sites that
+hold the most memory, e.g. PDF text building, resume section line lists or
+the duplicated strings of the response payload
+
+Usage:
+    python benchmarks/memory_report.py --resumes 50
+    python benchmarks/memory_report.py --corpus my_resumes/ --jd job.txt --output memory.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.datastructures import FileStorage
+
+from benchmarks.payload_size import sample_documents
+from utils.analyzer import analyze_job_match, encode_skills
+from utils.file_parser import SUPPORTED_EXTENSIONS, extract_text_from_file
+from utils.memory_tracer import MemoryTracer, peak_rss_bytes
+from utils.response_encoding import compact_analysis
+
+SIZE_BUCKETS = ((0, 2000), (2000, 5000), (5000, 10000), (10000, 20000), (20000, None))
+
+
+def _size_bucket(characters):
+    for low, high in SIZE_BUCKETS:
+        if high is None or characters < high:
+            return f"{low}+" if high is None else f"{low}-{high}"
+
+
+def load_corpus(corpus, jd_path):
+    """
+    (name, loader) pairs; a loader returns the document text and is traced
+    as the "parse" stage
+    """
+    def loader(path):
+        def load():
+            with open(path, 'rb') as f:
+                return extract_text_from_file(FileStorage(stream=f, filename=os.path.basename(path)))
+        return load
+
+    documents = [
+        (name, loader(os.path.join(corpus, name)))
+        for name in sorted(os.listdir(corpus)) if name.lower().endswith(SUPPORTED_EXTENSIONS)
+    ]
+    return loader(jd_path)(), documents
+
+
+def trace_document(jd, load, top):
+    """
+    Trace one resume: parsing, every pipeline stage, and JSON encoding of
+    the full and the compact response
+    """
+    with MemoryTracer(top=top) as tracer:
+        with tracer.stage('parse'):
+            text = load()
+        result = analyze_job_match(jd, text, around_stage=tracer.stage)
+        with tracer.stage('serialize'):
+            json.dumps(result)
+        with tracer.stage('serialize_compact'):
+            json.dumps(compact_analysis(result))
+    return len(text), tracer.report()
+
+
+def build_report(jd, documents, top):
+    stage_peaks = defaultdict(list)
+    by_size = defaultdict(lambda: {'documents': 0, 'peaks': [], 'stages': defaultdict(int)})
+    sites = defaultdict(lambda: defaultdict(int))
+    largest = []
+
+    for name, load in documents:
+        characters, trace = trace_document(jd, load, top)
+        bucket = by_size[_size_bucket(characters)]
+        bucket['documents'] += 1
+        bucket['peaks'].append(trace['peak_bytes'])
+        for stage, stats in trace['stages'].items():
+            stage_peaks[stage].append(stats['peak_bytes'])
+            bucket['stages'][stage] = max(bucket['stages'][stage], stats['peak_bytes'])
+            for site in stats['top_sites']:
+                sites[stage][site['site']] += site['bytes']
+        largest.append({'document': name, 'characters': characters, 'peak_bytes': trace['peak_bytes']})
+
+    return {
+        'documents': len(documents),
+        'peak_rss_bytes': peak_rss_bytes(),
+        'stages': {
+            stage: {
+                'max_peak_bytes': max(peaks),
+                'mean_peak_bytes': round(sum(peaks) / len(peaks)),
+                'top_sites': [
+                    {'site': site, 'bytes': size}
+                    for site, size in sorted(sites[stage].items(), key=lambda item: -item[1])[:top]
+                ]
+            }
+            for stage, peaks in stage_peaks.items()
+        },
+        'by_input_size': {
+            name: {
+                'documents': bucket['documents'],
+                'max_peak_bytes': max(bucket['peaks']),
+                'mean_peak_bytes': round(sum(bucket['peaks']) / len(bucket['peaks'])),
+                'stage_max_peak_bytes': dict(bucket['stages'])
+            }
+            for name, bucket in sorted(by_size.items(), key=lambda item: int(item[0].split('-')[0].rstrip('+')))
+        },
+        'largest_documents': sorted(largest, key=lambda d: -d['peak_bytes'])[:top]
+    }
+
+
+def _kib(size):
+    return f"{size / 1024:,.1f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report peak memory per analysis stage.")
+    parser.add_argument('--corpus', help="Directory of PDF/DOCX/TXT resumes (default: generated samples)")
+    parser.add_argument('--jd', help="Job description file used with --corpus")
+    parser.add_argument('--resumes', type=int, default=20, help="Number of generated resumes")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--top', type=int, default=5, help="Allocation sites listed per stage")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        if not args.jd:
+            parser.error("--corpus needs --jd")
+        jd, documents = load_corpus(args.corpus, args.jd)
+    else:
+        jd, resumes = sample_documents(args.resumes, args.seed)
+        documents = [(f"sample_{n}", lambda text=text: text) for n, text in enumerate(resumes)]
+
+    # Load the model before tracing; its one-off allocations are not per-request memory
+    encode_skills(['python'])
+    report = build_report(jd, documents, args.top)
+
+    print(f"{report['documents']} documents, peak RSS {_kib(report['peak_rss_bytes'] or 0)} KiB")
+    print(f"{'stage':<22}{'max KiB':>12}{'mean KiB':>12}  top site")
+    for stage, row in sorted(report['stages'].items(), key=lambda item: -item[1]['max_peak_bytes']):
+        site = row['top_sites'][0]['site'] if row['top_sites'] else '-'
+        print(f"{stage:<22}{_kib(row['max_peak_bytes']):>12}{_kib(row['mean_peak_bytes']):>12}  {site}")
+    print(f"\n{'input chars':<22}{'docs':>6}{'max KiB':>12}{'mean KiB':>12}")
+    for name, row in report['by_input_size'].items():
+        print(f"{name:<22}{row['documents']:>6}{_kib(row['max_peak_bytes']):>12}{_kib(row['mean_peak_bytes']):>12}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
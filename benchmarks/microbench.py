@@ -0,0 +1,246 @@
+"""
+Microbenchmarks
+Latency percentiles and throughput of the hot functions on a synthetic
+corpus, with an optional baseline check for CI
+
+Usage:
+    python benchmarks/microbench.py --output bench.json
+    python benchmarks/microbench.py --skill-counts 10,100,500 --taxonomy-sizes 10000,50000
+    python benchmarks/microbench.py --save-baseline benchmarks/baseline.json
+    python benchmarks/microbench.py --baseline benchmarks/baseline.json --threshold 0.25   # exit 1 on regression
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.datastructures import FileStorage
+
+from benchmarks.corpus import generate_corpus, generate_jd, generate_resume, render_docx, render_pdf, skill_vocabulary
+from utils import analyzer
+from utils.analyzer import (
+    EMBEDDING_MODE, analyze_job_match, calculate_semantic_match, encode_skills, extract_skills
+)
+from utils.company_insights import generate_company_insights
+from utils.file_parser import extract_text_from_file
+from utils.profiles import job_profiles, resume_profiles
+from utils.resume_formatter import analyze_resume_structure
+from utils.resume_tailor import generate_tailoring_analysis
+from utils.skill_taxonomy import SkillTaxonomy
+from utils.skill_vectors import build_skill_matrix
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list
+    """
+    index = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def install_vocabulary(vocab):
+    """
+    Extract skills from the corpus vocabulary instead of the configured
+    taxonomy. In precomputed mode the matching matrix goes to a temporary
+    file so data/skill_vectors.npz is left alone.
+    """
+    taxonomy = SkillTaxonomy([{'name': skill} for skill in vocab])
+    analyzer.skill_taxonomy = taxonomy
+    analyzer.COMMON_SKILLS = taxonomy.skills
+    analyzer._analysis_version = None
+    if analyzer.skill_matrix is not None:
+        path = os.path.join(tempfile.mkdtemp(prefix='jobfit-bench-'), 'skill_vectors.npz')
+        analyzer.skill_matrix = build_skill_matrix(analyzer.get_model(), taxonomy.skills, analyzer.MODEL_NAME, path)
+
+
+def build_cases(documents, vocab, skill_counts=(), taxonomy_sizes=(), seed=0):
+    """
+    benchmark name -> list of zero-argument callables, cycled through while
+    timing; inputs are prepared here so only the function itself is measured
+
+    Each entry of skill_counts adds extraction and matching benchmarks on
+    documents mentioning exactly that many skills; each entry of
+    taxonomy_sizes adds taxonomy matching with a vocabulary of that size.
+    """
+    jds = [d['text'] for d in documents if d['kind'] == 'jd']
+    resumes = [d['text'] for d in documents if d['kind'] == 'resume']
+    pairs = [(jds[i % len(jds)], resume) for i, resume in enumerate(resumes)]
+    skills = {text: sorted(extract_skills(text)) for text in jds + resumes}
+    matches = {}
+    for jd, resume in pairs:
+        _, matched, missing = calculate_semantic_match(skills[jd], skills[resume])
+        matches[(jd, resume)] = (matched, missing)
+
+    def parse(data, name):
+        return lambda: extract_text_from_file(FileStorage(stream=io.BytesIO(data), filename=name))
+
+    def full_analysis(jd, resume):
+        def run():
+            # Measure the cold path: both profiles are built again every time
+            resume_profiles.clear()
+            job_profiles.clear()
+            return analyze_job_match(jd, resume)
+        return run
+
+    cases = {
+        'extract_text_from_file[txt]': [parse(text.encode('utf-8'), 'r.txt') for text in resumes],
+        'extract_text_from_file[pdf]': [parse(render_pdf(text), 'r.pdf') for text in resumes],
+        'extract_text_from_file[docx]': [parse(render_docx(text), 'r.docx') for text in resumes],
+        'extract_skills': [lambda text=text: extract_skills(text) for text in resumes],
+        'calculate_semantic_match': [
+            lambda jd=jd, resume=resume: calculate_semantic_match(skills[jd], skills[resume]) for jd, resume in pairs
+        ],
+        'analyze_resume_structure': [lambda text=text: analyze_resume_structure(text) for text in resumes],
+        'generate_company_insights': [
+            lambda jd=jd, resume=resume: generate_company_insights(jd, *matches[(jd, resume)]) for jd, resume in pairs
+        ],
+        'generate_tailoring_analysis': [
+            lambda jd=jd, resume=resume: generate_tailoring_analysis(
+                resume, jd, matches[(jd, resume)][1], matches[(jd, resume)][0]
+            ) for jd, resume in pairs
+        ],
+        'analyze_job_match': [full_analysis(jd, resume) for jd, resume in pairs],
+    }
+
+    rng = random.Random(seed)
+    for count in skill_counts:
+        texts = [generate_resume(rng, vocab, skills=count)[0] for _ in range(3)]
+        jd_skills = sorted(extract_skills(generate_jd(rng, vocab, skills=count)))
+        resume_skills = [sorted(extract_skills(text)) for text in texts]
+        cases[f'extract_skills[{count} skills]'] = [lambda text=text: extract_skills(text) for text in texts]
+        cases[f'calculate_semantic_match[{count} skills]'] = [
+            lambda skills=skills: calculate_semantic_match(jd_skills, skills) for skills in resume_skills
+        ]
+
+    for size in taxonomy_sizes:
+        taxonomy = SkillTaxonomy([{'name': skill} for skill in skill_vocabulary(size, seed)])
+        cases[f'find_matches[vocab={size}]'] = [lambda text=text: taxonomy.find_matches(text) for text in resumes]
+    return cases
+
+
+def run_benchmark(cases, iterations, warmup):
+    for n in range(warmup):
+        cases[n % len(cases)]()
+    latencies = []
+    started = time.perf_counter()
+    for n in range(iterations):
+        call_started = time.perf_counter()
+        cases[n % len(cases)]()
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'mean_ms': round(sum(latencies) / len(latencies), 4),
+        'p50_ms': round(percentile(latencies, 0.50), 4),
+        'p95_ms': round(percentile(latencies, 0.95), 4),
+        'p99_ms': round(percentile(latencies, 0.99), 4),
+        'max_ms': round(latencies[-1], 4),
+        'ops_per_sec': round(iterations / elapsed, 2) if elapsed else None
+    }
+
+
+def compare(report, baseline, threshold, metric):
+    """
+    Benchmarks whose metric grew by more than threshold (a fraction) over
+    the baseline; benchmarks missing from either side are ignored
+    """
+    regressions = []
+    for name, result in report['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if not previous or not previous.get(metric):
+            continue
+        change = result[metric] / previous[metric] - 1
+        if change > threshold:
+            regressions.append({'benchmark': name, 'metric': metric, 'baseline': previous[metric],
+                                'current': result[metric], 'change': round(change, 4)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the JobFit AI microbenchmarks.")
+    parser.add_argument('--resumes', type=int, default=12)
+    parser.add_argument('--jds', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-pages', type=int, default=5)
+    parser.add_argument('--min-skills', type=int, default=10)
+    parser.add_argument('--max-skills', type=int, default=500,
+                        help="Largest skill count per resume; also sizes the skill vocabulary")
+    parser.add_argument('--skill-counts', default='10,50,100,250,500',
+                        help="Comma-separated skill counts benchmarked one by one (capped at --max-skills)")
+    parser.add_argument('--taxonomy-sizes', default='10000,50000',
+                        help="Comma-separated vocabulary sizes for the taxonomy matcher benchmark")
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', help="Comma-separated benchmark names (prefix match)")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    parser.add_argument('--baseline', help="Fail when a benchmark regressed against this report")
+    parser.add_argument('--save-baseline', help="Write this run as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown as a fraction (0.2 = 20%%)")
+    parser.add_argument('--metric', default='p50_ms', choices=('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'))
+    args = parser.parse_args(argv)
+
+    skill_counts = [int(n) for n in args.skill_counts.split(',') if n and int(n) <= args.max_skills]
+    taxonomy_sizes = [int(n) for n in args.taxonomy_sizes.split(',') if n]
+    vocab, documents = generate_corpus(
+        resumes=args.resumes, jds=args.jds, seed=args.seed, max_pages=args.max_pages,
+        min_skills=args.min_skills, max_skills=args.max_skills
+    )
+    # Skills are extracted with the corpus taxonomy, so every planted skill is found
+    install_vocabulary(vocab)
+    # Load the model up front so no benchmark pays for it
+    encode_skills(['python'])
+
+    cases = build_cases(documents, vocab, skill_counts, taxonomy_sizes, args.seed)
+    if args.only:
+        prefixes = args.only.split(',')
+        cases = {name: c for name, c in cases.items() if any(name.startswith(p) for p in prefixes)}
+
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'embedding_mode': EMBEDDING_MODE
+        },
+        'corpus': {'resumes': args.resumes, 'jds': args.jds, 'seed': args.seed, 'max_pages': args.max_pages,
+                   'min_skills': args.min_skills, 'max_skills': args.max_skills, 'vocab_size': len(vocab),
+                   'skill_counts': skill_counts, 'taxonomy_sizes': taxonomy_sizes},
+        'benchmarks': {}
+    }
+    print(f"{'benchmark':<40}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}")
+    for name, benchmark_cases in cases.items():
+        result = run_benchmark(benchmark_cases, args.iterations, args.warmup)
+        report['benchmarks'][name] = result
+        print(f"{name:<40}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}{result['p99_ms']:>10.3f}"
+              f"{result['ops_per_sec']:>10.1f}")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold, args.metric)
+        for r in regressions:
+            print(f"REGRESSION {r['benchmark']}: {r['metric']} {r['baseline']} -> {r['current']} "
+                  f"(+{r['change'] * 100:.1f}%)")
+        if not regressions:
+            print(f"No regressions beyond {args.threshold * 100:.0f}% against {args.baseline}.")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({**report, 'regressions': regressions}, f, indent=2)
+
+    if regressions:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
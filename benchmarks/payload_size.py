@@ -0,0 +1,149 @@
+"""
+Payload Size Benchmark
+Compares /api/analyze response sizes: full JSON, compact mode, compact mode
+without the original resume, and each of those gzip/brotli-compressed or
+msgpack-encoded, relative to the size of the submitted resume
+
+Usage:
+    python benchmarks/payload_size.py --resumes 20
+    python benchmarks/payload_size.py --corpus my_resumes/ --jd job.txt --output sizes.json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.analyzer import COMMON_SKILLS, analyze_job_match
+from utils.response_encoding import brotli, compact_analysis, msgpack
+
+SAMPLE_JD = """Senior Backend Engineer
+Company: Example Corp
+Location: Remote
+
+We are looking for an engineer with experience in {skills}.
+You will design services, review code and mentor junior developers.
+Collaboration with cross-functional teams and a data-driven mindset are expected."""
+
+BULLETS = [
+    "Developed {skill} services handling 50K requests per day",
+    "Built internal tooling with {skill} that cut release time by 30%",
+    "Implemented monitoring for {skill} deployments",
+    "Managed migration of legacy systems to {skill}",
+    "Created onboarding material for {skill} and mentored 3 engineers"
+]
+
+
+def sample_documents(count, seed):
+    """
+    Resumes of varying length (two to six jobs) and a JD, built from the
+    skill vocabulary with a fixed seed
+    """
+    rng = random.Random(seed)
+    vocab = sorted(COMMON_SKILLS)
+    jd = SAMPLE_JD.format(skills=", ".join(rng.sample(vocab, 12)))
+
+    resumes = []
+    for n in range(count):
+        skills = rng.sample(vocab, rng.randint(6, 18))
+        lines = [f"Candidate {n}", f"Email: candidate{n}@example.com | Phone: (555) 010-{n:04d}", "",
+                 "TECHNICAL SKILLS", "Languages & Tools: " + ", ".join(skills), "", "WORK EXPERIENCE"]
+        for job in range(rng.randint(2, 6)):
+            lines.append(f"Software Engineer | Company {job} | {2010 + job} - {2011 + job}")
+            lines.extend("- " + rng.choice(BULLETS).format(skill=rng.choice(skills)) for _ in range(rng.randint(3, 6)))
+            lines.append("")
+        lines += ["PROJECTS", f"- Project using {rng.choice(skills)} and {rng.choice(skills)}", "",
+                  "EDUCATION", "B.S. Computer Science | State University | 2010"]
+        resumes.append("\n".join(lines))
+    return jd, resumes
+
+
+def load_corpus(corpus, jd_path):
+    resumes = []
+    for name in sorted(os.listdir(corpus)):
+        if name.endswith('.txt'):
+            with open(os.path.join(corpus, name), encoding='utf-8') as f:
+                resumes.append(f.read())
+    with open(jd_path, encoding='utf-8') as f:
+        return f.read(), resumes
+
+
+def encoded_sizes(payload):
+    """
+    Byte sizes of one response body in every available encoding
+    """
+    body = json.dumps({"success": True, "data": payload}).encode('utf-8')
+    sizes = {'json': len(body), 'gzip': len(gzip.compress(body, compresslevel=6))}
+    if brotli is not None:
+        sizes['br'] = len(brotli.compress(body, quality=5))
+    if msgpack is not None:
+        packed = msgpack.packb({"success": True, "data": payload}, use_bin_type=True)
+        sizes['msgpack'] = len(packed)
+        sizes['msgpack+gzip'] = len(gzip.compress(packed, compresslevel=6))
+    return sizes
+
+
+def build_report(jd, resumes):
+    modes = {
+        'full': lambda result: result,
+        'compact': lambda result: compact_analysis(result),
+        'compact_omit_input': lambda result: compact_analysis(result, omit_input=True)
+    }
+    totals = {mode: {} for mode in modes}
+    input_bytes = 0
+
+    for resume in resumes:
+        input_bytes += len(resume.encode('utf-8'))
+        result = analyze_job_match(jd, resume)
+        for mode, transform in modes.items():
+            for encoding, size in encoded_sizes(transform(result)).items():
+                totals[mode][encoding] = totals[mode].get(encoding, 0) + size
+
+    return {
+        'resumes': len(resumes),
+        'input_bytes': input_bytes,
+        'modes': {
+            mode: {
+                encoding: {'bytes': size, 'ratio_to_input': round(size / max(input_bytes, 1), 3)}
+                for encoding, size in sizes.items()
+            }
+            for mode, sizes in totals.items()
+        }
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure analysis response sizes per encoding.")
+    parser.add_argument('--corpus', help="Directory of .txt resumes (default: generated samples)")
+    parser.add_argument('--jd', help="Job description .txt used with --corpus")
+    parser.add_argument('--resumes', type=int, default=20, help="Number of generated resumes")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        if not args.jd:
+            parser.error("--corpus needs --jd")
+        jd, resumes = load_corpus(args.corpus, args.jd)
+    else:
+        jd, resumes = sample_documents(args.resumes, args.seed)
+
+    report = build_report(jd, resumes)
+
+    print(f"{report['resumes']} resumes, {report['input_bytes']} input bytes")
+    print(f"{'mode':<20}{'encoding':<14}{'bytes':>10}{'x input':>10}")
+    for mode, encodings in report['modes'].items():
+        for encoding, row in encodings.items():
+            print(f"{mode:<20}{encoding:<14}{row['bytes']:>10}{row['ratio_to_input']:>10.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Pre-fork Benchmark
+Starts gunicorn with gunicorn.conf.py for each worker count, with and
+without preload_app, drives it with the load-test harness and reports the
+memory of the whole process tree next to throughput and tail latency
+
+Memory is read from /proc (Linux): RSS counts shared pages once per process
+and so overstates a pre-forked server; PSS splits each shared page between
+the processes mapping it and adds up to the real footprint.
+
+Usage:
+    python benchmarks/prefork.py --workers 1,2,4,8 --duration 20
+    python benchmarks/prefork.py --workers 2,4 --no-compare-preload --output prefork.json
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.loadtest import HttpTransport, build_payloads, run_closed_loop, summarize
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _children(pid):
+    children = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces; fields after it are fixed
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return children
+
+
+def _memory_kib(pid):
+    """
+    (rss, pss) of one process in KiB; pss is None without smaps_rollup
+    """
+    rss = pss = None
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                rss = int(line.split()[1])
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    pss = int(line.split()[1])
+    except OSError:
+        pass
+    return rss, pss
+
+
+def tree_memory(master_pid):
+    """
+    RSS and PSS in MiB of the master and its workers, summed and per process
+    """
+    processes = {'master': _memory_kib(master_pid)}
+    for n, pid in enumerate(sorted(_children(master_pid))):
+        processes[f'worker_{n}'] = _memory_kib(pid)
+    pss_known = all(pss is not None for _, pss in processes.values())
+    return {
+        'rss_mib': round(sum(rss for rss, _ in processes.values()) / 1024, 1),
+        'pss_mib': round(sum(pss for _, pss in processes.values()) / 1024, 1) if pss_known else None,
+        'processes': {name: {'rss_mib': round(rss / 1024, 1), 'pss_mib': round(pss / 1024, 1) if pss else None}
+                      for name, (rss, pss) in processes.items()}
+    }
+
+
+def _wait_ready(url, workers, timeout):
+    """
+    Wait until /readyz answers 200 several times in a row, so that without
+    preload_app every worker has most likely loaded its own model
+    """
+    deadline = time.monotonic() + timeout
+    streak = 0
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/readyz", timeout=5) as response:
+                streak = streak + 1 if response.status == 200 else 0
+        except OSError:
+            streak = 0
+        if streak >= 3 * workers:
+            return
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} not ready after {timeout}s")
+
+
+def run_configuration(workers, threads, preload, payloads, duration, warmup, startup_timeout):
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, 'JOBFIT_WORKERS': str(workers), 'JOBFIT_THREADS': str(threads),
+           'JOBFIT_BIND': f"127.0.0.1:{port}", 'JOBFIT_PRELOAD': '1' if preload else '0'}
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', 'app:app'], cwd=PROJECT_ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        started = time.perf_counter()
+        _wait_ready(url, workers, startup_timeout)
+        ready_seconds = time.perf_counter() - started
+        idle = tree_memory(server.pid)
+
+        transport = HttpTransport(url)
+        run_closed_loop(transport, payloads, workers * threads, duration=60, max_requests=warmup, timeout=120)
+        summary = summarize(run_closed_loop(transport, payloads, workers * threads, duration, None, 120))
+        return {
+            'workers': workers,
+            'threads': threads,
+            'preload': preload,
+            'ready_seconds': round(ready_seconds, 2),
+            'memory_idle': idle,
+            'memory_loaded': tree_memory(server.pid),
+            'load': summary
+        }
+    finally:
+        server.terminate()
+        server.wait(30)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory and throughput of gunicorn against worker count.")
+    parser.add_argument('--workers', default='1,2,4', help="Comma-separated worker counts")
+    parser.add_argument('--threads', type=int, default=4, help="gthread threads per worker")
+    parser.add_argument('--no-compare-preload', action='store_true', help="Only run with preload_app on")
+    parser.add_argument('--duration', type=float, default=20, help="Seconds of load per configuration")
+    parser.add_argument('--warmup', type=int, default=20, help="Unmeasured requests per configuration")
+    parser.add_argument('--startup-timeout', type=float, default=300)
+    parser.add_argument('--resumes', type=int, default=30)
+    parser.add_argument('--mix', default='json,pdf')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    from utils.analyzer import COMMON_SKILLS
+    _, documents = generate_corpus(resumes=args.resumes, seed=args.seed, vocab_size=len(COMMON_SKILLS))
+    payloads = build_payloads(documents, args.mix.split(','))
+
+    results = []
+    print(f"{'workers':>8}{'preload':>9}{'RSS MiB':>10}{'PSS MiB':>10}{'rps':>9}{'p50 ms':>9}{'p99 ms':>9}")
+    for workers in [int(w) for w in args.workers.split(',')]:
+        for preload in (True,) if args.no_compare_preload else (True, False):
+            result = run_configuration(workers, args.threads, preload, payloads, args.duration, args.warmup,
+                                       args.startup_timeout)
+            results.append(result)
+            memory, load = result['memory_loaded'], result['load']
+            latency = load.get('latency') or {}
+            print(f"{workers:>8}{'on' if preload else 'off':>9}{memory['rss_mib']:>10.1f}"
+                  f"{memory['pss_mib'] if memory['pss_mib'] is not None else float('nan'):>10.1f}"
+                  f"{load.get('throughput_rps') or 0:>9.1f}{latency.get('p50_ms', float('nan')):>9.1f}"
+                  f"{latency.get('p99_ms', float('nan')):>9.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'cpu_count': os.cpu_count(), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
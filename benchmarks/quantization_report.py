@@ -0,0 +1,116 @@
+"""
+Quantization Report
+Measures how often matched/missing decisions at the similarity threshold
+change when embeddings are stored as float16 or int8 instead of float32
+
+Usage:
+    python benchmarks/quantization_report.py --pairs 2000
+    python benchmarks/quantization_report.py --corpus path/to/texts --output report.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.analyzer import COMMON_SKILLS, SIMILARITY_THRESHOLD, encode_skills, extract_skills
+from utils.vector_storage import ENCODINGS, EncodedVectors, row_dtype
+
+
+def load_skill_sets(corpus, vocab, pairs, seed):
+    """
+    Skill sets to score: extracted from a corpus of .txt files, or sampled
+    from the vocabulary with a fixed seed
+    """
+    if corpus:
+        texts = []
+        for name in sorted(os.listdir(corpus)):
+            if name.endswith('.txt'):
+                with open(os.path.join(corpus, name), encoding='utf-8') as f:
+                    texts.append(f.read())
+        skill_sets = [sorted(extract_skills(text)) for text in texts]
+        return [(a, b) for a in skill_sets for b in skill_sets if a is not b][:pairs]
+
+    rng = random.Random(seed)
+    return [
+        (rng.sample(vocab, rng.randint(3, min(20, len(vocab)))), rng.sample(vocab, rng.randint(3, min(30, len(vocab)))))
+        for _ in range(pairs)
+    ]
+
+
+def matched_flags(similarity, index, jd_skills, resume_skills):
+    rows = [index[s] for s in jd_skills]
+    cols = [index[s] for s in resume_skills]
+    if not rows or not cols:
+        return np.zeros(len(rows), dtype=bool)
+    return similarity[np.ix_(rows, cols)].max(axis=1) >= SIMILARITY_THRESHOLD
+
+
+def build_report(vocab, skill_pairs):
+    embeddings = encode_skills(vocab)
+    index = {skill: i for i, skill in enumerate(vocab)}
+    reference = embeddings @ embeddings.T
+    upper = np.triu_indices(len(vocab), k=1)
+    reference_flags = [matched_flags(reference, index, jd, res) for jd, res in skill_pairs]
+    decisions = sum(len(flags) for flags in reference_flags)
+
+    report = {'vocabulary': len(vocab), 'dim': int(embeddings.shape[1]), 'threshold': SIMILARITY_THRESHOLD,
+              'pairs': len(skill_pairs), 'decisions': decisions, 'encodings': {}}
+
+    for encoding in ENCODINGS:
+        vectors = EncodedVectors.encode(embeddings, encoding)
+        similarity = vectors.dot(vectors)
+        error = np.abs(similarity - reference)[upper]
+
+        flipped_decisions = 0
+        changed_scores = 0
+        for (jd, res), expected in zip(skill_pairs, reference_flags):
+            flags = matched_flags(similarity, index, jd, res)
+            flips = int((flags != expected).sum())
+            flipped_decisions += flips
+            changed_scores += 1 if flips else 0
+
+        skill_pair_flips = int(((similarity >= SIMILARITY_THRESHOLD) != (reference >= SIMILARITY_THRESHOLD))[upper].sum())
+        bytes_per_vector = row_dtype(embeddings.shape[1], encoding).itemsize
+        report['encodings'][encoding] = {
+            'bytes_per_vector': bytes_per_vector,
+            'mb_per_100k_vectors': round(bytes_per_vector * 100000 / 1024 / 1024, 2),
+            'max_similarity_error': float(error.max()) if error.size else 0.0,
+            'mean_similarity_error': float(error.mean()) if error.size else 0.0,
+            'skill_pair_flips': skill_pair_flips,
+            'skill_pair_flip_rate': skill_pair_flips / max(len(upper[0]), 1),
+            'decision_flips': flipped_decisions,
+            'decision_flip_rate': flipped_decisions / max(decisions, 1),
+            'pairs_with_changed_score': changed_scores
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report accuracy vs memory of embedding encodings.")
+    parser.add_argument('--corpus', help="Directory of .txt resumes/JDs to pair up (default: sampled skill sets)")
+    parser.add_argument('--pairs', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    vocab = sorted(COMMON_SKILLS)
+    report = build_report(vocab, load_skill_sets(args.corpus, vocab, args.pairs, args.seed))
+
+    print(f"{'encoding':<10}{'bytes/vec':>10}{'max err':>10}{'pair flips':>12}{'decision flips':>16}")
+    for encoding, row in report['encodings'].items():
+        print(f"{encoding:<10}{row['bytes_per_vector']:>10}{row['max_similarity_error']:>10.4f}"
+              f"{row['skill_pair_flips']:>12}{row['decision_flip_rate']:>15.4%}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
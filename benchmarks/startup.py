@@ -0,0 +1,97 @@
+"""
+Startup Benchmark
+Measures app import time, time until /readyz reports ready and time to the
+first completed /api/analyze request, each in a fresh interpreter
+
+Usage:
+    python benchmarks/startup.py --runs 5
+    JOBFIT_WARMUP=0 python benchmarks/startup.py   # lazy load on first request
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter; prints one JSON line of timings
+CHILD_SCRIPT = r'''
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+
+client = app.app.test_client()
+while client.get('/readyz').status_code != 200 and time.perf_counter() - imported < 300:
+    time.sleep(0.01)
+ready = time.perf_counter()
+
+response = client.post('/api/analyze', json={
+    "jd_text": "Senior Python Developer. Required: Python, Flask, Docker, AWS, SQL.",
+    "resume_text": "Jane Doe\njane@example.com\nSkills: Python, Django, Docker, PostgreSQL"
+})
+first = time.perf_counter()
+
+print(json.dumps({
+    "import_seconds": imported - start,
+    "ready_seconds": ready - start,
+    "first_request_seconds": first - start,
+    "first_request_status": response.status_code
+}))
+'''
+
+# Requests are timed from a ready server only when warm-up is enabled
+CHILD_SCRIPT_LAZY = CHILD_SCRIPT.replace(
+    "while client.get('/readyz').status_code != 200", "while False"
+)
+
+
+def run_once(lazy):
+    script = CHILD_SCRIPT_LAZY if lazy else CHILD_SCRIPT
+    output = subprocess.run(
+        [sys.executable, '-c', script], cwd=PROJECT_ROOT,
+        capture_output=True, text=True, check=True
+    ).stdout
+    # The app prints progress messages; the timings are the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    return {
+        'min': round(min(samples), 4),
+        'median': round(statistics.median(samples), 4),
+        'max': round(max(samples), 4)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark JobFit AI startup time.")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    lazy = os.environ.get('JOBFIT_WARMUP', '1') == '0'
+    runs = [run_once(lazy) for _ in range(args.runs)]
+
+    report = {
+        'runs': args.runs,
+        'warmup': not lazy,
+        'embedding_mode': os.environ.get('JOBFIT_EMBEDDING_MODE', 'model'),
+        'import_seconds': summarize([r['import_seconds'] for r in runs]),
+        'ready_seconds': summarize([r['ready_seconds'] for r in runs]),
+        'first_request_seconds': summarize([r['first_request_seconds'] for r in runs]),
+        'errors': sum(1 for r in runs if r['first_request_status'] != 200)
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Production serving with gunicorn (picked up automatically from this directory):
+
+    gunicorn app:app
+    JOBFIT_WORKERS=4 JOBFIT_THREADS=4 gunicorn app:app
+
+The app, the model and the precomputed skill matrix are loaded once in the
+master and shared copy-on-write by the forked workers. Background threads
+(batch job workers, micro-batching) start in each worker after the fork.
+"""
+
+import os
+
+from utils.prefork import init_worker, preload_master
+
+# Tells app.py to leave its background threads to post_worker_init
+os.environ['JOBFIT_PREFORK'] = '1'
+
+bind = os.environ.get('JOBFIT_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('JOBFIT_WORKERS', str(min(os.cpu_count() or 1, 4))))
+worker_class = 'gthread'
+threads = int(os.environ.get('JOBFIT_THREADS', '4'))
+preload_app = os.environ.get('JOBFIT_PRELOAD', '1') == '1'
+timeout = int(os.environ.get('JOBFIT_WORKER_TIMEOUT', '120'))
+graceful_timeout = 30
+# Recycle workers now and then to bound slow growth of the private heap
+max_requests = int(os.environ.get('JOBFIT_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+
+def when_ready(server):
+    # The app module is already imported here when preload_app is on
+    if server.cfg.preload_app:
+        preload_master()
+
+
+def post_fork(server, worker):
+    init_worker(server.cfg.workers)
+
+
+def post_worker_init(worker):
+    # Without preload_app the worker imports the app itself, just before this
+    from app import start_background_threads
+    start_background_threads()
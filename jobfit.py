@@ -0,0 +1,263 @@
+"""
+JobFit AI command line: scores every resume in a folder against every Job
+Description in another, offline, using all cores
+
+Usage:
+    python jobfit.py --resumes resumes/ --jds jds/ --output results.jsonl
+    python jobfit.py --resumes resumes/ --jds jds/ --output scores.csv --sections score   # scores only
+    python jobfit.py --resumes resumes/ --jds jds/ --output results.jsonl   # again: resumes where it stopped
+
+Results are written in a fixed order (Job Descriptions, then resumes, both
+sorted by path) as soon as they are ready. Rerunning with the same output
+file skips the pairs it already holds, so an interrupted run can be resumed;
+pairs that failed are tried again and their error records replaced.
+"""
+
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from werkzeug.datastructures import FileStorage
+
+from utils.analyzer import ANALYSIS_SECTIONS, analyze_job_match, parse_sections
+from utils.file_parser import SUPPORTED_EXTENSIONS, extract_text_from_file
+from utils.prefork import init_worker, preload_master
+
+# Parsed documents by path, handed to the analysis workers when they start
+_texts = {}
+
+
+def find_documents(directory):
+    """
+    PDF, DOCX and TXT files under directory (recursively), as sorted paths
+    relative to it; hidden files and folders are skipped
+    """
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in files:
+            if not name.startswith('.') and name.lower().endswith(SUPPORTED_EXTENSIONS):
+                found.append(os.path.relpath(os.path.join(root, name), directory))
+    return sorted(found)
+
+
+def _parse(path):
+    try:
+        with open(path, 'rb') as f:
+            return path, extract_text_from_file(FileStorage(stream=f, filename=os.path.basename(path))), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def _init_analysis_worker(texts, workers):
+    global _texts
+    _texts = texts
+    init_worker(workers)
+
+
+def _analyze(task):
+    jd_path, resume_path, sections = task
+    jd_text, jd_error = _texts[jd_path]
+    resume_text, resume_error = _texts[resume_path]
+    if jd_error or resume_error:
+        return {'error': jd_error or resume_error}
+    try:
+        result = analyze_job_match(jd_text, resume_text, sections=sections, serial=True)
+    except Exception as e:
+        return {'error': str(e)}
+    # Session IDs only mean something to a running server
+    result.pop('analysis_id', None)
+    return {'result': result}
+
+
+class JsonlOutput:
+    """
+    One {"jd", "resume", "result" | "error"} object per line
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def completed(self):
+        """
+        (jd, resume) pairs already in the file with a result. Error records,
+        and a last line cut off by an interruption, are removed so that those
+        pairs are run again.
+        """
+        if not os.path.exists(self.path):
+            return set()
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        lines = data[:data.rfind(b'\n') + 1].decode('utf-8').splitlines(keepends=True)
+        done, keep = set(), []
+        for line in lines:
+            if line.strip():
+                record = json.loads(line)
+                if 'error' not in record:
+                    done.add((record['jd'], record['resume']))
+                    keep.append(line)
+        if sum(map(len, keep)) != len(data):
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.writelines(keep)
+        return done
+
+    def open(self):
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def write(self, jd, resume, outcome):
+        self._file.write(json.dumps({'jd': jd, 'resume': resume, **outcome}) + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class CsvOutput:
+    """
+    One row per pair with the fields of the requested sections; lists are
+    joined with '; ' and nested values are JSON-encoded
+    """
+
+    def __init__(self, path, sections):
+        self.path = path
+        self.columns = ['jd', 'resume', 'error'] + [
+            field for section in sections for field in ANALYSIS_SECTIONS[section]
+        ]
+
+    def completed(self):
+        """
+        (jd, resume) pairs already in the file with a result. Quoted fields
+        may span lines, so rows with an error, and a row cut off by an
+        interruption, are dropped by rewriting the file.
+        """
+        if not os.path.exists(self.path):
+            return set()
+        with open(self.path, newline='', encoding='utf-8') as f:
+            data = f.read()
+        rows = list(csv.reader(io.StringIO(data)))
+        if rows and rows[0] != self.columns:
+            raise ValueError(f"{self.path} was written with other sections; use a new output file.")
+        keep = rows[:1]
+        for n, row in enumerate(rows[1:], 1):
+            cut_off = n == len(rows) - 1 and (not data.endswith('\n') or len(row) != len(self.columns))
+            if not cut_off and not row[2]:
+                keep.append(row)
+        if len(keep) != len(rows):
+            with open(self.path, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerows(keep)
+        return {(row[0], row[1]) for row in keep[1:]}
+
+    def open(self):
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        if new:
+            self._writer.writerow(self.columns)
+
+    def write(self, jd, resume, outcome):
+        result = outcome.get('result', {})
+        row = {'jd': jd, 'resume': resume, 'error': outcome.get('error', '')}
+        for column in self.columns[3:]:
+            value = result.get(column, '')
+            if isinstance(value, list) and all(isinstance(item, str) for item in value):
+                value = '; '.join(value)
+            elif isinstance(value, (list, dict)):
+                value = json.dumps(value)
+            row[column] = value
+        self._writer.writerow([row[column] for column in self.columns])
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class Progress:
+    """
+    Running count and throughput on stderr, redrawn at most twice a second
+    """
+
+    def __init__(self, total, label):
+        self.total = total
+        self.label = label
+        self.done = 0
+        self.started = time.perf_counter()
+        self._shown = 0
+
+    def advance(self):
+        self.done += 1
+        now = time.perf_counter()
+        if now - self._shown >= 0.5 or self.done == self.total:
+            self._shown = now
+            elapsed = now - self.started
+            rate = self.done / elapsed if elapsed else 0
+            remaining = (self.total - self.done) / rate if rate else 0
+            end = '\n' if self.done == self.total else ''
+            print(f"\r{self.label}: {self.done}/{self.total}  {rate:.1f}/s  ETA {remaining:.0f}s ",
+                  end=end, file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a folder of resumes against a folder of Job Descriptions.")
+    parser.add_argument('--resumes', required=True, help="Directory of PDF/DOCX/TXT resumes")
+    parser.add_argument('--jds', required=True, help="Directory of PDF/DOCX/TXT Job Descriptions")
+    parser.add_argument('--output', required=True, help="Results file; .csv writes CSV, anything else JSONL")
+    parser.add_argument('--format', choices=('jsonl', 'csv'), help="Override the format chosen from --output")
+    parser.add_argument('--sections', default='all',
+                        help=f"Comma-separated sections, e.g. 'score' for scores only (default: all of "
+                             f"{', '.join(ANALYSIS_SECTIONS)})")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Processes (default: all cores)")
+    parser.add_argument('--chunksize', type=int, default=8, help="Pairs handed to a worker at a time")
+    args = parser.parse_args(argv)
+
+    try:
+        sections = parse_sections(None if args.sections == 'all' else args.sections)
+    except ValueError as e:
+        parser.error(str(e))
+    output_format = args.format or ('csv' if args.output.lower().endswith('.csv') else 'jsonl')
+    output = CsvOutput(args.output, sections) if output_format == 'csv' else JsonlOutput(args.output)
+
+    jds = find_documents(args.jds)
+    resumes = find_documents(args.resumes)
+    if not jds or not resumes:
+        parser.error("Both --jds and --resumes need at least one PDF, DOCX or TXT file.")
+
+    done = output.completed()
+    pairs = [(jd, resume) for jd in jds for resume in resumes if (jd, resume) not in done]
+    print(f"{len(jds)} Job Descriptions x {len(resumes)} resumes: {len(done)} pairs done, {len(pairs)} to go.",
+          file=sys.stderr)
+    if not pairs:
+        return
+
+    # Parse each document once, and only those still needed
+    paths = {('jd', p): os.path.join(args.jds, p) for p in {jd for jd, _ in pairs}}
+    paths.update({('resume', p): os.path.join(args.resumes, p) for p in {resume for _, resume in pairs}})
+    keys = sorted(paths)
+    texts = {}
+    progress = Progress(len(keys), 'parsed')
+    with multiprocessing.Pool(args.workers) as pool:
+        for key, (_, text, error) in zip(keys, pool.imap(_parse, [paths[key] for key in keys], chunksize=4)):
+            texts[key] = (text, error)
+            progress.advance()
+
+    # Workers forked from here share the loaded model copy-on-write
+    preload_master()
+    tasks = [(('jd', jd), ('resume', resume), sections) for jd, resume in pairs]
+    progress = Progress(len(tasks), 'analyzed')
+    output.open()
+    try:
+        with multiprocessing.Pool(args.workers, initializer=_init_analysis_worker,
+                                  initargs=(texts, args.workers)) as pool:
+            for (jd, resume), outcome in zip(pairs, pool.imap(_analyze, tasks, chunksize=args.chunksize)):
+                output.write(jd, resume, outcome)
+                progress.advance()
+    finally:
+        output.close()
+
+
+if __name__ == '__main__':
+    main()
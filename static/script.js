@@ -8,6 +8,11 @@ document.addEventListener('DOMContentLoaded', () => {
     const resultsSection = document.getElementById('results-section');
     const themeSelect = document.getElementById('theme-select');
     
+    // Analysis whose sections are shown, and which of them are already rendered
+    let currentAnalysisId = null;
+    const loadedSections = new Set();
+    let streamInProgress = false;
+    
     // Load default Job Description and Resume for debugging
     const defaultJD = `Senior Full Stack Developer
 
@@ -147,6 +152,9 @@ CERTIFICATIONS
             hasResume = true;
         }
         
+        // Tailored resume as line edits, repeated strings sent once
+        formData.append('compact', '1');
+        
         // Basic Validation
         if (!hasJd || !hasResume) {
             showError("Please provide both a Job Description and a Resume (Text or File).");
@@ -155,18 +163,18 @@ CERTIFICATIONS
         }
         
         try {
-            const response = await fetch('/api/analyze', {
+            // Sections arrive one by one: the score first, then each generated section
+            const response = await fetch('/api/analyze/stream', {
                 method: 'POST',
                 body: formData // Fetch automatically sets Content-Type to multipart/form-data
             });
             
-            const result = await response.json();
-            
             if (!response.ok) {
+                const result = await response.json();
                 throw new Error(result.error || "An error occurred during analysis.");
             }
             
-            displayResults(result.data);
+            await readAnalysisStream(response);
             
         } catch (error) {
             showError(error.message);
@@ -197,8 +205,126 @@ CERTIFICATIONS
     }
     
     function displayResults(data) {
+        currentAnalysisId = data.analysis_id;
+        loadedSections.clear();
+        renderSections(data);
+        
+        // The user may be looking at another tab than the score
+        const activeTab = document.querySelector('.results-tab-btn.active');
+        if (activeTab) {
+            loadSection(TAB_SECTIONS[activeTab.dataset.tab]);
+        }
+        
         resultsSection.classList.remove('hidden');
+        // Scroll to results
+        resultsSection.scrollIntoView({ behavior: 'smooth' });
+    }
+    
+    // Renders every section present in an /api/analyze or /api/analysis response
+    function renderSections(data) {
+        data = expandStrings(data);
+        Object.entries(SECTION_RENDERERS).forEach(([section, [field, render]]) => {
+            if (field in data) {
+                render(data);
+                loadedSections.add(section);
+            }
+        });
+    }
+    
+    // Resolves {"$s": i} references of a compact payload against its _strings table
+    function expandStrings(data) {
+        const table = data._strings;
+        if (!table) {
+            return data;
+        }
+        const expand = value => {
+            if (Array.isArray(value)) {
+                return value.map(expand);
+            }
+            if (value && typeof value === 'object') {
+                const keys = Object.keys(value);
+                if (keys.length === 1 && keys[0] === '$s') {
+                    return table[value.$s];
+                }
+                return Object.fromEntries(keys.map(key => [key, expand(value[key])]));
+            }
+            return value;
+        };
+        const { _strings, ...rest } = data;
+        return expand(rest);
+    }
+    
+    // Rebuilds text from [start, end, replacement lines] edits against the original
+    function applyLineEdits(originalText, edits) {
+        const lines = originalText.split('\n');
+        [...edits].reverse().forEach(([start, end, replacement]) => {
+            lines.splice(start, end - start, ...replacement);
+        });
+        return lines.join('\n');
+    }
+    
+    // Renders the NDJSON events of /api/analyze/stream as they arrive
+    async function readAnalysisStream(response) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        streamInProgress = true;
+        
+        try {
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) {
+                    break;
+                }
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                lines.filter(line => line.trim()).forEach(line => handleStreamEvent(JSON.parse(line)));
+            }
+        } finally {
+            streamInProgress = false;
+        }
+    }
+    
+    function handleStreamEvent(event) {
+        if (event.section === 'error') {
+            throw new Error(event.error);
+        }
+        if (event.section === 'score') {
+            displayResults(event.data);
+        } else if (event.section !== 'done') {
+            renderSections(event.data);
+        }
+    }
+    
+    // Fetches a section of the current analysis the first time its tab is opened
+    // (sections still on their way in the stream are not requested again)
+    async function loadSection(section) {
+        if (!section || !currentAnalysisId || loadedSections.has(section) || streamInProgress) {
+            return;
+        }
+        loadedSections.add(section);
+        const analysisId = currentAnalysisId;
         
+        try {
+            const response = await fetch(`/api/analysis/${analysisId}/${section}?compact=1`);
+            const result = await response.json();
+            
+            if (!response.ok) {
+                throw new Error(result.error || "An error occurred while loading this section.");
+            }
+            // Ignore late responses for an analysis that has been replaced
+            if (analysisId === currentAnalysisId) {
+                renderSections(result.data);
+            }
+        } catch (error) {
+            loadedSections.delete(section);
+            showError(error.message);
+        }
+    }
+    
+    // Match score and skill lists
+    function renderScore(data) {
         // Update Score with Animation
         const scoreValue = document.getElementById('score-value');
         const circle = document.querySelector('.progress-ring__circle');
@@ -255,7 +381,10 @@ CERTIFICATIONS
                 missingList.appendChild(li);
             });
         }
-
+    }
+    
+    // Cover letter
+    function renderCoverLetter(data) {
         // Update Cover Letter
         const coverLetterText = document.getElementById('cover-letter-text');
         if (data.cover_letter) {
@@ -263,7 +392,10 @@ CERTIFICATIONS
         } else {
             coverLetterText.value = "Could not generate cover letter.";
         }
-        
+    }
+    
+    // Interview questions
+    function renderInterview(data) {
         // Update Interview Questions
         const questionsList = document.getElementById('questions-list');
         questionsList.innerHTML = '';
@@ -289,7 +421,10 @@ CERTIFICATIONS
         } else {
             questionsList.innerHTML = '<p style="text-align:center; color:var(--text-muted);">No interview questions generated.</p>';
         }
-        
+    }
+    
+    // Formatting tips
+    function renderFormatting(data) {
         // Update Formatting Tips
         const tipsList = document.getElementById('tips-list');
         tipsList.innerHTML = '';
@@ -313,7 +448,10 @@ CERTIFICATIONS
         } else {
             tipsList.innerHTML = '<p style="text-align:center; color:var(--text-muted);">No formatting tips available.</p>';
         }
-        
+    }
+    
+    // Company & role insights
+    function renderInsights(data) {
         // Update Company Insights
         if (data.company_insights) {
             const insights = data.company_insights;
@@ -414,7 +552,10 @@ CERTIFICATIONS
                 redFlagsList.innerHTML = '<li style="color:var(--text-muted);">No red flags detected.</li>';
             }
         }
-        
+    }
+    
+    // Tailoring workbench
+    function renderTailoring(data) {
         // Update Tailoring Workbench
         if (data.tailoring_data) {
             const tailoringData = data.tailoring_data;
@@ -478,7 +619,8 @@ CERTIFICATIONS
             
             // Display tailored resume with highlights
             const tailoredDisplay = document.getElementById('tailored-resume-display');
-            const tailoredText = tailoringData.tailored_resume;
+            const tailoredText = tailoringData.tailored_resume ??
+                applyLineEdits(tailoringData.original_resume, tailoringData.tailored_edits);
             
             // Simple highlighting: show additions in green
             if (tailoringData.highlights && tailoringData.highlights.length > 0) {
@@ -500,7 +642,8 @@ CERTIFICATIONS
                 tailoredDisplay.textContent = tailoredText;
             }
         }
-        
+    }
+    
         /* Resume Builder - Hidden for future implementation
         // Update Resume Builder (but keep it hidden initially)
         const resumeBuilderText = document.getElementById('resume-builder-text');
@@ -515,7 +658,9 @@ CERTIFICATIONS
         const toggleBuilderBtn = document.getElementById('toggle-builder-btn');
         toggleBuilderBtn.innerHTML = '<i class="fas fa-file-edit"></i> Show Improved Resume Builder';
         */
-        
+    
+    // Upskilling plan
+    function renderUpskilling(data) {
         // Update Upskilling Plan
         const planContainer = document.getElementById('plan-container');
         planContainer.innerHTML = '';
@@ -542,12 +687,30 @@ CERTIFICATIONS
                 planContainer.appendChild(planItem);
             });
         }
-        
-        resultsSection.classList.remove('hidden');
-        // Scroll to results
-        resultsSection.scrollIntoView({ behavior: 'smooth' });
     }
     
+    // Section name -> [response field that marks it as present, renderer]
+    const SECTION_RENDERERS = {
+        score: ['score', renderScore],
+        upskilling: ['upskilling_plan', renderUpskilling],
+        cover_letter: ['cover_letter', renderCoverLetter],
+        interview: ['interview_questions', renderInterview],
+        formatting: ['formatting_tips', renderFormatting],
+        insights: ['company_insights', renderInsights],
+        tailoring: ['tailoring_data', renderTailoring]
+    };
+    
+    // Results tab -> section loaded when the tab is first opened
+    const TAB_SECTIONS = {
+        'match-score': 'score',
+        'upskilling': 'upskilling',
+        'cover-letter': 'cover_letter',
+        'interview': 'interview',
+        'formatting': 'formatting',
+        'insights': 'insights',
+        'tailoring': 'tailoring'
+    };
+    
     // Tab Switching Logic
     const resultsTabBtns = document.querySelectorAll('.results-tab-btn');
     const tabPanels = document.querySelectorAll('.tab-panel');
@@ -566,6 +729,8 @@ CERTIFICATIONS
             if (targetPanel) {
                 targetPanel.classList.add('active');
             }
+            
+            loadSection(TAB_SECTIONS[targetTab]);
         });
     });
     
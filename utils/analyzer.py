@@ -1,54 +1,161 @@
-import re
+import hashlib
+import os
 import random
-from sentence_transformers import SentenceTransformer, util
-from utils.generator import generate_cover_letter, extract_name
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from utils.generator import generate_cover_letter
 from utils.interview_generator import generate_interview_questions
-from utils.resume_formatter import analyze_resume_structure
 from utils.resume_builder import generate_resume_template
 from utils.company_insights import generate_company_insights
 from utils.resume_tailor import generate_tailoring_analysis
+from utils.skill_taxonomy import DEFAULT_TAXONOMY_PATH, load_taxonomy
+from utils.skill_vectors import load_or_rebuild_skill_matrix
+from utils.model_loader import MODEL_NAME, get_model, is_model_loaded, model_identity
+from utils.inference_worker import batching_encoder_from_env
+from utils.embedding_cache import embedding_cache_from_env
+from utils.metrics import document_characters, document_skills, operation_seconds
+from utils.pipeline import Stage, pipeline_from_env
+from utils.profiles import JobProfile, ResumeProfile, job_profiles, resume_profiles
+from utils.vector_storage import EncodedVectors
 
-# Load a lightweight, efficient model for semantic similarity
-# This runs locally and requires no API key
-print("Loading AI Model (all-MiniLM-L6-v2)...")
-model = SentenceTransformer('all-MiniLM-L6-v2')
-print("AI Model Loaded.")
-
-# A small dictionary of common technical and soft skills for extraction
-COMMON_SKILLS = {
-    "python", "java", "javascript", "react", "node.js", "flask", "django", "html", "css",
-    "sql", "nosql", "mongodb", "postgresql", "aws", "azure", "docker", "kubernetes",
-    "git", "agile", "scrum", "communication", "leadership", "problem solving",
-    "machine learning", "data analysis", "pandas", "numpy", "tensorflow", "pytorch",
-    "c++", "c#", "go", "rust", "typescript", "angular", "vue", "rest api", "graphql",
-    "reactjs", "react.js", "postgres", "postgresql", "aws services", "amazon web services"
-}
+# "model" encodes skills on every request; "precomputed" serves lookups from
+# the vocabulary matrix built by `python -m utils.skill_vectors build`
+EMBEDDING_MODE = os.environ.get('JOBFIT_EMBEDDING_MODE', 'model').lower()
+
+# Skills, aliases and categories live in a local taxonomy file and are compiled
+# once into a single-pass matcher
+SKILL_TAXONOMY_PATH = os.environ.get('JOBFIT_SKILL_TAXONOMY', DEFAULT_TAXONOMY_PATH)
+skill_taxonomy = load_taxonomy(SKILL_TAXONOMY_PATH)
+COMMON_SKILLS = skill_taxonomy.skills
+
+# Threshold for semantic match (0.7 is usually a good balance)
+SIMILARITY_THRESHOLD = 0.7
+
+skill_matrix = None
+
+if EMBEDDING_MODE == 'precomputed':
+    # Every extracted skill comes from COMMON_SKILLS, so a lookup table is enough
+    # and torch is never imported in this process
+    skill_matrix = load_or_rebuild_skill_matrix(COMMON_SKILLS, MODEL_NAME)
+    print(f"Loaded precomputed skill matrix ({len(skill_matrix.vocab)} skills).")
+
+# Otherwise the lightweight all-MiniLM-L6-v2 model is loaded on first use (or by
+# the warm-up thread started in app.py), so importing this module stays cheap
+
+def is_ready():
+    """
+    True once skills can be scored without blocking on a model load.
+    """
+    return skill_matrix is not None or is_model_loaded()
+
+_analysis_version = None
+
+def analysis_version():
+    """
+    Fingerprint of what profiles are derived from besides the text: the
+    skill taxonomy and the embeddings (precomputed matrix, including how its
+    rows are encoded, or model weights).
+    """
+    global _analysis_version
+    if _analysis_version is None:
+        if skill_matrix is not None:
+            embeddings = f"{skill_matrix.fingerprint}:{skill_matrix.vectors_fingerprint}"
+        else:
+            embeddings = model_identity()
+        _analysis_version = hashlib.sha256(
+            f"{skill_taxonomy.fingerprint}\0{embeddings}".encode('utf-8')
+        ).hexdigest()[:16]
+    return _analysis_version
+
+def extract_skill_matches(text):
+    """
+    Finds every occurrence of a taxonomy skill in the text.
+    Returns SkillMatch tuples (skill, category, start, end) ordered by offset.
+    """
+    if not text:
+        return []
+    return skill_taxonomy.find_matches(text)
 
 def extract_skills(text):
     """
-    Extracts skills from the provided text using a predefined list.
+    Extracts skills from the provided text using the skill taxonomy.
     Returns a set of found skills.
     """
-    if not text:
-        return set()
-    
-    text_lower = text.lower()
-    found_skills = set()
-    
-    # Simple keyword matching
-    for skill in COMMON_SKILLS:
-        # Use regex to match whole words only to avoid partial matches (e.g., "java" in "javascript")
-        # Escape skill for regex safety
-        pattern = r'\b' + re.escape(skill) + r'\b'
-        if re.search(pattern, text_lower):
-            found_skills.add(skill)
-            
-    return found_skills
+    with operation_seconds.time(operation='skill_extraction'):
+        return {match.skill for match in extract_skill_matches(text)}
+
+def _encode_with_model(phrases):
+    embeddings = get_model().encode(phrases, batch_size=max(len(phrases), 1),
+                                    convert_to_numpy=True, normalize_embeddings=True)
+    return np.asarray(embeddings, dtype=np.float32)
+
+# With JOBFIT_MICROBATCH=1, concurrent requests share batched forward passes
+batching_encoder = batching_encoder_from_env(_encode_with_model)
+
+# Phrases seen before (in this or any earlier process) skip the model entirely.
+# The model identity may mean hashing the weights, so it waits for first use.
+embedding_cache = embedding_cache_from_env(MODEL_NAME, model_identity) if skill_matrix is None else None
+
+def _encode_uncached(phrases):
+    if batching_encoder is not None:
+        return batching_encoder.encode(phrases)
+    return _encode_with_model(phrases)
 
-def calculate_semantic_match(jd_skills, resume_skills):
+def encode_skills(skills):
+    """
+    Returns unit-normalized embeddings for the given skills as a (n, dim) array,
+    so cosine similarity between two sets is a single matrix product.
+    """
+    with operation_seconds.time(operation='encoding'):
+        return _encode_skills(list(skills))
+
+def _encode_skills(skills):
+    if skill_matrix is not None:
+        return skill_matrix.lookup(skills)
+    if embedding_cache is None or not skills:
+        return _encode_uncached(skills)
+
+    vectors = embedding_cache.get_many(skills)
+    missing = [skill for skill in dict.fromkeys(skills) if skill not in vectors]
+    if missing:
+        fresh = _encode_uncached(missing)
+        embedding_cache.put_many(missing, fresh)
+        vectors.update(zip(missing, fresh))
+    return np.stack([vectors[skill] for skill in skills])
+
+def skill_similarity(skills_a, skills_b):
+    """
+    Returns the cosine similarity matrix (len(skills_a) x len(skills_b)).
+    Precomputed rows are multiplied in their storage encoding (int8 as
+    integers); otherwise both lists are encoded in one batch.
+    """
+    skills_a, skills_b = list(skills_a), list(skills_b)
+    if skill_matrix is not None:
+        with operation_seconds.time(operation='similarity'):
+            return skill_matrix.similarity(skills_a, skills_b)
+    embeddings = encode_skills(skills_a + skills_b)
+    return embeddings[:len(skills_a)] @ embeddings[len(skills_a):].T
+
+def skill_rows(skills):
+    """
+    Returns the skills' embeddings as EncodedVectors: the precomputed rows in
+    their storage encoding, otherwise the float32 model embeddings. dot() of
+    two of these scores like skill_similarity.
+    """
+    skills = list(skills)
+    if skill_matrix is not None:
+        return skill_matrix.rows(skills)
+    return EncodedVectors(encode_skills(skills))
+
+def calculate_semantic_match(jd_skills, resume_skills, jd_embeddings=None, resume_embeddings=None):
     """
     Computes the match score based on Semantic Similarity using Sentence Transformers.
     This handles synonyms (e.g., "ReactJS" vs "React") automatically.
+    Embeddings already computed for either side (rows in the same order as the
+    skills) are reused instead of being encoded again; with a precomputed skill
+    matrix the stored rows are scored directly instead.
     """
     if not jd_skills:
         return 0, [], []
@@ -59,41 +166,51 @@ def calculate_semantic_match(jd_skills, resume_skills):
     if not resume_skills_list:
         return 0, [], jd_skills_list
 
-    # Encode skills to vector embeddings
-    jd_embeddings = model.encode(jd_skills_list, convert_to_tensor=True)
-    resume_embeddings = model.encode(resume_skills_list, convert_to_tensor=True)
-
-    # Compute cosine similarity matrix
-    cosine_scores = util.cos_sim(jd_embeddings, resume_embeddings)
-    
-    matched_skills = set()
-    missing_skills = set()
+    if skill_matrix is not None:
+        # Precomputed rows are scored in their storage encoding
+        started = time.perf_counter()
+        cosine_scores = skill_matrix.similarity(jd_skills_list, resume_skills_list)
+    else:
+        # Encode whatever is missing in one batch and compute the cosine similarity matrix
+        if jd_embeddings is None and resume_embeddings is None:
+            embeddings = encode_skills(jd_skills_list + resume_skills_list)
+            jd_embeddings, resume_embeddings = embeddings[:len(jd_skills_list)], embeddings[len(jd_skills_list):]
+        elif jd_embeddings is None:
+            jd_embeddings = encode_skills(jd_skills_list)
+        elif resume_embeddings is None:
+            resume_embeddings = encode_skills(resume_skills_list)
+        started = time.perf_counter()
+        cosine_scores = jd_embeddings @ resume_embeddings.T
     
-    # Threshold for semantic match (0.7 is usually a good balance)
-    threshold = 0.7
+    # Lists keep the JD skill order, so results are reproducible across processes
+    matched_skills = []
+    missing_skills = []
     
     for i, jd_skill in enumerate(jd_skills_list):
         # Find the best match for this JD skill in the resume skills
         best_score = cosine_scores[i].max()
         
-        if best_score >= threshold:
-            matched_skills.add(jd_skill)
+        if best_score >= SIMILARITY_THRESHOLD:
+            matched_skills.append(jd_skill)
         else:
-            missing_skills.add(jd_skill)
+            missing_skills.append(jd_skill)
+    operation_seconds.observe(time.perf_counter() - started, operation='similarity')
             
     score = (len(matched_skills) / len(jd_skills)) * 100
-    return round(score, 2), list(matched_skills), list(missing_skills)
+    return round(score, 2), matched_skills, missing_skills
 
-def generate_upskilling_plan(missing_skills):
+def generate_upskilling_plan(missing_skills, seed=None):
     """
     Generates a learning plan for the missing skills.
+    The same seed always produces the same plan.
     """
+    rng = random.Random(seed) if seed is not None else random
     plan = []
     
     for skill in missing_skills:
         # Mock logic to generate course recommendations
         course_platforms = ["Udemy", "Coursera", "WiLearn", "edX"]
-        platform = random.choice(course_platforms)
+        platform = rng.choice(course_platforms)
         
         item = {
             "skill": skill.title(),
@@ -101,60 +218,297 @@ def generate_upskilling_plan(missing_skills):
             "platform": platform,
             "link": f"https://www.google.com/search?q=learn+{skill}+course", # Real search link
             "practice_task": f"Build a small project using {skill.title()}",
-            "timeline": f"{random.randint(1, 4)} weeks"
+            "timeline": f"{rng.randint(1, 4)} weeks"
         }
         plan.append(item)
         
     return plan
 
-def analyze_job_match(jd_text, resume_text):
+def analyze_match_matrix(jd_texts, resume_texts):
     """
-    Main function to coordinate the analysis using Local AI.
+    Scores every JD against every resume in one pass.
+    Skills are extracted once per document and the union of all skills is
+    encoded in a single batch; no generators run, only the skill match.
     """
-    jd_skills = extract_skills(jd_text)
-    resume_skills = extract_skills(resume_text)
-    
-    # Use Semantic Matching instead of simple set intersection
-    match_score, matched_skills, missing_skills = calculate_semantic_match(jd_skills, resume_skills)
-    
-    upskilling_plan = generate_upskilling_plan(missing_skills)
-    
-    # Generate Cover Letter
-    cover_letter = generate_cover_letter(jd_text, matched_skills, resume_text)
-    
-    # Generate Interview Questions
-    interview_questions = generate_interview_questions(jd_text, matched_skills, num_questions=5)
-    
-    # Analyze Resume Formatting
-    formatting_tips = analyze_resume_structure(resume_text)
-    
-    # Generate Improved Resume Template
-    candidate_name = extract_name(resume_text)
-    improved_resume = generate_resume_template(
-        resume_text, 
-        candidate_name, 
-        formatting_tips, 
-        matched_skills, 
-        missing_skills
+    jd_skill_lists = [sorted(extract_skills(text)) for text in jd_texts]
+    resume_skill_lists = [sorted(extract_skills(text)) for text in resume_texts]
+
+    jd_union = sorted(set().union(*jd_skill_lists))
+    resume_union = sorted(set().union(*resume_skill_lists))
+    jd_index = {skill: i for i, skill in enumerate(jd_union)}
+    resume_index = {skill: i for i, skill in enumerate(resume_union)}
+
+    # hits[k, j]: JD skill k has a match above threshold in resume j
+    hits = np.zeros((len(jd_union), len(resume_texts)), dtype=bool)
+    if jd_union and resume_union:
+        similarity = skill_similarity(jd_union, resume_union)
+        for j, skills in enumerate(resume_skill_lists):
+            if skills:
+                columns = [resume_index[skill] for skill in skills]
+                hits[:, j] = similarity[:, columns].max(axis=1) >= SIMILARITY_THRESHOLD
+
+    # membership[i, k]: JD i asks for skill k
+    membership = np.zeros((len(jd_texts), len(jd_union)), dtype=np.float32)
+    for i, skills in enumerate(jd_skill_lists):
+        membership[i, [jd_index[skill] for skill in skills]] = 1
+
+    matched_counts = membership @ hits
+    jd_sizes = membership.sum(axis=1, keepdims=True)
+    scores = np.divide(matched_counts * 100, jd_sizes, out=np.zeros_like(matched_counts), where=jd_sizes > 0)
+
+    pairs = []
+    for i, jd_skills in enumerate(jd_skill_lists):
+        row = []
+        for j in range(len(resume_texts)):
+            matched = [skill for skill in jd_skills if hits[jd_index[skill], j]]
+            missing = [skill for skill in jd_skills if not hits[jd_index[skill], j]]
+            row.append({"matched_skills": matched, "missing_skills": missing})
+        pairs.append(row)
+
+    return {
+        "scores": [[round(float(score), 2) for score in row] for row in scores],
+        "jd_skills": jd_skill_lists,
+        "resume_skills": resume_skill_lists,
+        "pairs": pairs
+    }
+
+def _resolve_profile(cache, profile_class, kind, text, profile):
+    if isinstance(profile, profile_class):
+        found = profile
+    elif profile:
+        found = cache.get(profile)
+        if found is None:
+            raise ValueError(f"Unknown {kind} profile '{profile}'. Register the {kind} again.")
+    else:
+        found = cache.get_or_build(text or "")
+    label = 'resume' if profile_class is ResumeProfile else 'jd'
+    document_characters.observe(len(found.text), kind=label)
+    document_skills.observe(len(found.skills), kind=label)
+    return found
+
+def resolve_resume_profile(resume_text=None, resume_profile=None):
+    """
+    Returns the ResumeProfile for a profile object, a profile ID or raw text.
+    Raises ValueError for an ID that is not in the profile cache.
+    """
+    return _resolve_profile(resume_profiles, ResumeProfile, 'resume', resume_text, resume_profile)
+
+def resolve_job_profile(jd_text=None, jd_profile=None):
+    """
+    Returns the JobProfile for a profile object, a profile ID or raw text.
+    Raises ValueError for an ID that is not in the profile cache.
+    """
+    return _resolve_profile(job_profiles, JobProfile, 'job description', jd_text, jd_profile)
+
+# Each stage reads the outputs of its dependencies from the results dict.
+# Everything after "match" only needs the skill match and one of the
+# profiles, so those stages run side by side on the pipeline's thread pool.
+
+def _match_stage(r):
+    job, profile = r["jd_profile"], r["resume_profile"]
+    score, matched, missing = calculate_semantic_match(
+        job.skills, profile.skills, jd_embeddings=job.skill_embeddings, resume_embeddings=profile.skill_embeddings
     )
-    
-    # Generate Company & Role Insights
-    company_insights = generate_company_insights(jd_text, matched_skills, missing_skills)
-    
-    # Generate Resume Tailoring Analysis
-    tailoring_data = generate_tailoring_analysis(resume_text, jd_text, missing_skills, matched_skills)
-    
+    return {"score": score, "matched_skills": matched, "missing_skills": missing}
+
+def _analysis_seed(r):
+    # Random picks depend only on the two documents, so results can be cached
+    key = f"{r['jd_profile'].profile_id}-{r['resume_profile'].profile_id}"
+    return int(hashlib.sha256(key.encode('utf-8')).hexdigest()[:16], 16)
+
+def _cover_letter_stage(r):
+    job, profile = r["jd_profile"], r["resume_profile"]
+    return generate_cover_letter(
+        job.text, r["match"]["matched_skills"], profile.text, candidate_name=profile.name, job_details=job.job_details
+    )
+
+def _improved_resume_stage(r):
+    profile, match = r["resume_profile"], r["match"]
+    return generate_resume_template(
+        profile.text,
+        profile.name,
+        profile.formatting_tips,
+        match["matched_skills"],
+        match["missing_skills"]
+    )
+
+def _tailoring_stage(r):
+    profile, match = r["resume_profile"], r["match"]
+    return generate_tailoring_analysis(
+        profile.text, r["jd_profile"].text, match["missing_skills"], match["matched_skills"],
+        resume_sections=profile.sections
+    )
+
+ANALYSIS_STAGES = [
+    # No timeout on the profile stages: a cold start loads the model inside them
+    Stage("resume_profile", lambda r: resolve_resume_profile(r["resume_text"], r["resume_profile_ref"]), timeout=0),
+    Stage("jd_profile", lambda r: resolve_job_profile(r["jd_text"], r["jd_profile_ref"]), timeout=0),
+    Stage("match", _match_stage, deps=("resume_profile", "jd_profile")),
+    Stage("upskilling_plan", lambda r: generate_upskilling_plan(r["match"]["missing_skills"], seed=_analysis_seed(r)),
+          deps=("match",)),
+    Stage("cover_letter", _cover_letter_stage, deps=("match",)),
+    Stage("interview_questions",
+          lambda r: generate_interview_questions(r["jd_profile"].text, r["match"]["matched_skills"], num_questions=5,
+                                                 seed=_analysis_seed(r)),
+          deps=("match",)),
+    Stage("formatting_tips", lambda r: r["resume_profile"].formatting_tips, deps=("resume_profile",)),
+    Stage("improved_resume", _improved_resume_stage, deps=("match",)),
+    Stage("company_insights",
+          lambda r: generate_company_insights(r["jd_profile"].text, r["match"]["matched_skills"],
+                                              r["match"]["missing_skills"], job_profile=r["jd_profile"]),
+          deps=("match",)),
+    Stage("tailoring_data", _tailoring_stage, deps=("match",)),
+]
+
+# JOBFIT_PIPELINE_WORKERS threads (0 = serial), JOBFIT_STAGE_TIMEOUT seconds per running stage
+analysis_pipeline = pipeline_from_env(
+    ANALYSIS_STAGES, inputs=("jd_text", "resume_text", "jd_profile_ref", "resume_profile_ref")
+)
+
+# Response sections and the result fields each one contains. A request for
+# "score" only runs the profile and match stages, no generators.
+ANALYSIS_SECTIONS = {
+    "score": ("score", "jd_skills", "resume_skills", "matched_skills", "missing_skills"),
+    "upskilling": ("upskilling_plan",),
+    "cover_letter": ("cover_letter",),
+    "interview": ("interview_questions",),
+    "formatting": ("formatting_tips",),
+    "resume": ("improved_resume",),
+    "insights": ("company_insights",),
+    "tailoring": ("tailoring_data",),
+}
+
+# Stage outputs of recent analyses, so sections requested later (e.g. when a
+# tab is opened) reuse the profiles, the match and any generated content
+ANALYSIS_SESSION_LIMIT = int(os.environ.get('JOBFIT_ANALYSIS_SESSIONS', '256'))
+_analysis_sessions = OrderedDict()
+_analysis_sessions_lock = threading.Lock()
+
+def parse_sections(sections):
+    """
+    Normalizes a list or comma-separated string of section names.
+    None or empty means every section. Raises ValueError for unknown names.
+    """
+    if isinstance(sections, str):
+        sections = [name.strip() for name in sections.split(',')]
+    sections = [name for name in (sections or []) if name]
+    if not sections:
+        return list(ANALYSIS_SECTIONS)
+    unknown = [name for name in sections if name not in ANALYSIS_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown section(s): {', '.join(unknown)}. Use any of {', '.join(ANALYSIS_SECTIONS)}.")
+    return list(dict.fromkeys(sections))
+
+def _field_value(r, field):
+    if field == "jd_skills":
+        return list(r["jd_profile"].skills)
+    if field == "resume_skills":
+        return list(r["resume_profile"].skills)
+    if field in ("score", "matched_skills", "missing_skills"):
+        return r["match"][field]
+    return r[field]
+
+def _section_stages(sections):
+    return ["match" if section == "score" else ANALYSIS_SECTIONS[section][0] for section in sections]
+
+def _remember_session(r):
+    analysis_id = f"{r['jd_profile'].profile_id}-{r['resume_profile'].profile_id}"
+
+    # Remember stage outputs, not the caller's raw texts
+    stored = {name: value for name, value in r.items() if name in analysis_pipeline.stages}
+    with _analysis_sessions_lock:
+        stored = {**_analysis_sessions.get(analysis_id, {}), **stored}
+        _analysis_sessions[analysis_id] = stored
+        _analysis_sessions.move_to_end(analysis_id)
+        while len(_analysis_sessions) > ANALYSIS_SESSION_LIMIT:
+            _analysis_sessions.popitem(last=False)
+    return analysis_id
+
+def _section_data(r, sections):
+    return {field: _field_value(r, field) for section in sections for field in ANALYSIS_SECTIONS[section]}
+
+def _run_sections(sections, inputs, timings=None, serial=False, around_stage=None):
+    r = analysis_pipeline.run(inputs, only=_section_stages(sections), timings=timings, serial=serial,
+                              around_stage=around_stage)
+    return {"analysis_id": _remember_session(r), **_section_data(r, sections)}
+
+def _analysis_inputs(jd_text, resume_text, resume_profile, jd_profile):
     return {
-        "score": match_score,
-        "jd_skills": list(jd_skills),
-        "resume_skills": list(resume_skills),
-        "matched_skills": matched_skills,
-        "missing_skills": missing_skills,
-        "upskilling_plan": upskilling_plan,
-        "cover_letter": cover_letter,
-        "interview_questions": interview_questions,
-        "formatting_tips": formatting_tips,
-        "improved_resume": improved_resume,
-        "company_insights": company_insights,
-        "tailoring_data": tailoring_data
+        "jd_text": jd_text,
+        "resume_text": resume_text,
+        "jd_profile_ref": jd_profile,
+        "resume_profile_ref": resume_profile
     }
+
+def analyze_job_match(jd_text=None, resume_text=None, resume_profile=None, jd_profile=None, sections=None,
+                      timings=None, serial=False, around_stage=None):
+    """
+    Main function to coordinate the analysis using Local AI.
+    Both sides come from cached profiles (given directly, by ID, or built
+    from the text), so repeat matches only run the work that needs the pair.
+    Only the stages behind the requested sections run (all by default).
+    Pass a dict as timings to receive the milliseconds spent in each stage.
+    The returned analysis_id can be given to analyze_section later.
+    serial=True runs every stage in the calling thread (used when profiling);
+    around_stage wraps each stage in a context manager, e.g. MemoryTracer.stage.
+    """
+    return _run_sections(
+        parse_sections(sections), _analysis_inputs(jd_text, resume_text, resume_profile, jd_profile), timings=timings,
+        serial=serial, around_stage=around_stage
+    )
+
+def stream_job_match(jd_text=None, resume_text=None, resume_profile=None, jd_profile=None, sections=None,
+                     timings=None):
+    """
+    Same analysis as analyze_job_match, delivered incrementally.
+    Yields (section, data) pairs: the score first (as soon as the skill match
+    is done, with the analysis_id), then every other requested section the
+    moment its stage finishes, and finally ("done", {"analysis_id": ...}).
+    """
+    sections = parse_sections(sections)
+    stage_sections = dict(zip(_section_stages(sections), sections))
+    held = []
+    score_sent = "score" not in sections
+    r = {}
+
+    for name, r in analysis_pipeline.stream(
+            _analysis_inputs(jd_text, resume_text, resume_profile, jd_profile),
+            only=stage_sections, timings=timings):
+        if name not in stage_sections:
+            continue
+        section = stage_sections[name]
+        if section == "score":
+            analysis_id = f"{r['jd_profile'].profile_id}-{r['resume_profile'].profile_id}"
+            yield "score", {"analysis_id": analysis_id, **_section_data(r, ["score"])}
+            score_sent, ready, held = True, held, []
+        elif not score_sent:
+            # e.g. formatting tips can finish before the match; keep the score first
+            held.append(section)
+            continue
+        else:
+            ready = [section]
+        for pending in ready:
+            yield pending, _section_data(r, [pending])
+
+    yield "done", {"analysis_id": _remember_session(r)}
+
+def analyze_section(analysis_id, section, timings=None):
+    """
+    Returns one more section of an earlier analysis, reusing whatever that
+    analysis already computed. Works from the profile caches alone when the
+    session has been evicted. Raises ValueError for an unknown analysis.
+    """
+    sections = parse_sections([section])
+    jd_profile_id, _, resume_profile_id = analysis_id.partition('-')
+    if not jd_profile_id or not resume_profile_id:
+        raise ValueError(f"Unknown analysis '{analysis_id}'.")
+
+    with _analysis_sessions_lock:
+        known = dict(_analysis_sessions.get(analysis_id, {}))
+    return _run_sections(sections, {
+        "jd_text": None,
+        "resume_text": None,
+        "jd_profile_ref": jd_profile_id,
+        "resume_profile_ref": resume_profile_id,
+        **known
+    }, timings=timings)
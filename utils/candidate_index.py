@@ -0,0 +1,324 @@
+"""
+Candidate Index
+Persistent on-disk index of resume and JD skill sets for fast top-k ranking
+in both directions (resumes for a JD, JDs for a resume)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from utils.analyzer import SIMILARITY_THRESHOLD, encode_skills, extract_skills, skill_rows, skill_similarity
+from utils.vector_storage import EncodedVectors, default_encoding, row_dtype
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_INDEX_PATH = os.path.join(PROJECT_ROOT, 'data', 'candidate_index.sqlite')
+
+KINDS = ('resume', 'jd')
+
+# Pruning keeps skills this close to the threshold, so float rounding between
+# it and the exact rescoring never drops a skill that would score
+PRUNE_SLACK = 1e-5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    kind TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    skills TEXT NOT NULL,
+    pooled BLOB,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (kind, doc_id)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    kind TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    PRIMARY KEY (kind, skill, doc_id)
+);
+"""
+
+
+def _check_kind(kind):
+    if kind not in KINDS:
+        raise ValueError(f"Unknown document kind '{kind}'. Use 'resume' or 'jd'.")
+
+
+class CandidateIndex:
+    """
+    SQLite-backed inverted skill index with a pooled embedding per document.
+
+    Queries run in two stages: candidates are pruned to documents sharing a
+    skill within the similarity threshold of a query skill (or, with
+    prune="embedding", to the nearest pooled embeddings), then rescored
+    exactly with the same threshold logic as calculate_semantic_match.
+    Skill pruning ranks candidates by that same threshold score, so capping
+    them at max_candidates never drops a document that would rank higher.
+
+    The embeddings of every indexed skill are kept per kind and refreshed
+    when a write (from any process) bumps the kind's version in meta.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, encoding=None):
+        self.path = path
+        self.encoding = encoding or default_encoding()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._vocab_lock = threading.Lock()
+        self._vocab_cache = {}
+
+    @contextmanager
+    def _connect(self):
+        """
+        Open a connection for one transaction; the schema is created on first use
+        """
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    conn = sqlite3.connect(self.path)
+                    conn.executescript(_SCHEMA)
+                    # Pooled vectors keep the encoding the index was created with
+                    conn.execute("INSERT OR IGNORE INTO meta (name, value) VALUES ('encoding', ?)", (self.encoding,))
+                    self.encoding = conn.execute("SELECT value FROM meta WHERE name = 'encoding'").fetchone()[0]
+                    conn.commit()
+                    conn.close()
+                    self._initialized = True
+
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def upsert(self, kind, doc_id, text=None, skills=None):
+        """
+        Add or replace a document
+
+        Args:
+            kind (str): "resume" or "jd"
+            doc_id (str): Caller-chosen identifier
+            text (str): Document text (skills are extracted from it)
+            skills (iterable): Precomputed skills, used instead of text
+
+        Returns:
+            list: Sorted skills stored for the document
+        """
+        _check_kind(kind)
+        skills = sorted(set(skills) if skills is not None else extract_skills(text or ''))
+
+        pooled = None
+        if skills:
+            vector = encode_skills(skills).mean(axis=0)
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                pooled = vector / norm
+
+        with self._connect() as conn:
+            if pooled is not None:
+                pooled = EncodedVectors.encode(pooled[None, :], self.encoding).tobytes()
+            conn.execute("DELETE FROM postings WHERE kind = ? AND doc_id = ?", (kind, doc_id))
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (kind, doc_id, skills, pooled, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, doc_id, json.dumps(skills), pooled, time.time())
+            )
+            conn.executemany(
+                "INSERT INTO postings (kind, skill, doc_id) VALUES (?, ?, ?)",
+                [(kind, skill, doc_id) for skill in skills]
+            )
+            self._bump_version(conn, kind)
+        return skills
+
+    def delete(self, kind, doc_id):
+        """
+        Remove a document. Returns True if it existed.
+        """
+        _check_kind(kind)
+        with self._connect() as conn:
+            conn.execute("DELETE FROM postings WHERE kind = ? AND doc_id = ?", (kind, doc_id))
+            deleted = conn.execute("DELETE FROM documents WHERE kind = ? AND doc_id = ?", (kind, doc_id)).rowcount
+            if deleted:
+                self._bump_version(conn, kind)
+        return deleted > 0
+
+    @staticmethod
+    def _bump_version(conn, kind):
+        conn.execute(
+            "INSERT INTO meta (name, value) VALUES (?, '1') "
+            "ON CONFLICT (name) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+            (f'{kind}_version',)
+        )
+
+    def get_skills(self, kind, doc_id):
+        """
+        Return the stored skills of a document, or None if it is not indexed
+        """
+        _check_kind(kind)
+        with self._connect() as conn:
+            row = conn.execute("SELECT skills FROM documents WHERE kind = ? AND doc_id = ?", (kind, doc_id)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self, kind):
+        _check_kind(kind)
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM documents WHERE kind = ?", (kind,)).fetchone()[0]
+
+    def _vocabulary(self, conn, kind):
+        """
+        (skills, EncodedVectors) of every skill indexed for kind, in the
+        encoding rescoring uses. Only skills added since the cached version
+        are encoded.
+        """
+        row = conn.execute("SELECT value FROM meta WHERE name = ?", (f'{kind}_version',)).fetchone()
+        version = row[0] if row else '0'
+        with self._vocab_lock:
+            cached = self._vocab_cache.get(kind)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+
+        vocab = [row[0] for row in conn.execute("SELECT DISTINCT skill FROM postings WHERE kind = ? ORDER BY skill", (kind,))]
+        known = {skill: i for i, skill in enumerate(cached[1])} if cached is not None else {}
+        new = [skill for skill in vocab if skill not in known]
+        vectors = None
+        if vocab:
+            # Rows of skills still indexed, then the new ones; vocab is reordered to match
+            kept = [skill for skill in vocab if skill in known]
+            blocks = [cached[2].take([known[skill] for skill in kept])] if kept else []
+            if new:
+                blocks.append(skill_rows(new))
+            vectors = EncodedVectors.concatenate(blocks)
+            vocab = kept + new
+        with self._vocab_lock:
+            self._vocab_cache[kind] = (version, vocab, vectors)
+        return vocab, vectors
+
+    def _prune_by_skills(self, conn, kind, query_skills, max_candidates):
+        vocab, vectors = self._vocabulary(conn, kind)
+        if not vocab:
+            return []
+
+        # Any document scoring above zero holds a skill within threshold of a
+        # query skill; scored on the same rows as _rescore
+        close = skill_rows(query_skills).dot(vectors) >= SIMILARITY_THRESHOLD - PRUNE_SLACK
+        pairs = [(int(q), vocab[k]) for q, k in zip(*np.nonzero(close))]
+        if not pairs:
+            return []
+
+        # (query skill, indexed skill within threshold of it)
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS query_neighbours "
+                     "(query_index INTEGER NOT NULL, skill TEXT NOT NULL, PRIMARY KEY (skill, query_index))")
+        conn.execute("DELETE FROM query_neighbours")
+        conn.executemany("INSERT INTO query_neighbours (query_index, skill) VALUES (?, ?)", pairs)
+
+        # Rank by the threshold score itself, so the cap cuts only lower-scoring documents
+        if kind == 'resume':
+            # The query is the JD: the score counts JD skills covered by any of the resume's skills
+            sql = ("SELECT p.doc_id FROM postings p JOIN query_neighbours q ON p.skill = q.skill "
+                   "WHERE p.kind = ? GROUP BY p.doc_id "
+                   "ORDER BY COUNT(DISTINCT q.query_index) DESC, p.doc_id LIMIT ?")
+        else:
+            # The query is the resume: the score is the share of the JD's skills that are covered
+            sql = ("SELECT p.doc_id FROM postings p JOIN query_neighbours q ON p.skill = q.skill "
+                   "JOIN documents d ON d.kind = p.kind AND d.doc_id = p.doc_id "
+                   "WHERE p.kind = ? GROUP BY p.doc_id "
+                   "ORDER BY CAST(COUNT(DISTINCT p.skill) AS REAL) / json_array_length(d.skills) DESC, "
+                   "p.doc_id LIMIT ?")
+        return [row[0] for row in conn.execute(sql, (kind, max_candidates))]
+
+    def _prune_by_embedding(self, conn, kind, query_skills, max_candidates):
+        rows = conn.execute("SELECT doc_id, pooled FROM documents WHERE kind = ? AND pooled IS NOT NULL", (kind,)).fetchall()
+        if not rows:
+            return []
+
+        query = encode_skills(query_skills).mean(axis=0)
+        # Score directly on the stored encoding, without expanding to float32
+        dim = len(query)
+        pooled = np.frombuffer(b''.join(row[1] for row in rows), dtype=row_dtype(dim, self.encoding))
+        scores = EncodedVectors.from_rows(pooled, self.encoding).dot_vector(query)
+        top = np.argsort(-scores, kind='stable')[:max_candidates]
+        return [rows[i][0] for i in top]
+
+    def query(self, query_skills, target_kind, top_k=50, max_candidates=5000, prune='skills'):
+        """
+        Rank indexed documents of target_kind against a set of query skills
+
+        Args:
+            query_skills (iterable): Skills of the query document
+            target_kind (str): "resume" to rank resumes for a JD,
+                "jd" to rank JDs for a resume
+            top_k (int): Number of results to return
+            max_candidates (int): Upper bound on documents rescored exactly
+            prune (str): "skills" (inverted index) or "embedding" (pooled vectors)
+
+        Returns:
+            list: Dicts with doc_id, score, matched_skills, missing_skills
+        """
+        _check_kind(target_kind)
+        query_skills = sorted(set(query_skills))
+        if not query_skills:
+            return []
+
+        with self._connect() as conn:
+            if prune == 'embedding':
+                candidates = self._prune_by_embedding(conn, target_kind, query_skills, max_candidates)
+            else:
+                candidates = self._prune_by_skills(conn, target_kind, query_skills, max_candidates)
+            if not candidates:
+                return []
+
+            doc_skills = {}
+            for start in range(0, len(candidates), 500):
+                chunk = candidates[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for doc_id, skills in conn.execute(
+                    f"SELECT doc_id, skills FROM documents WHERE kind = ? AND doc_id IN ({placeholders})",
+                    [target_kind] + chunk
+                ):
+                    doc_skills[doc_id] = json.loads(skills)
+
+        results = self._rescore(query_skills, doc_skills, target_kind)
+        results.sort(key=lambda r: (-r['score'], r['doc_id']))
+        return results[:top_k]
+
+    def _rescore(self, query_skills, doc_skills, target_kind):
+        union = sorted(set().union(*doc_skills.values()))
+        if not union:
+            return []
+        column = {skill: i for i, skill in enumerate(union)}
+        similarity = skill_similarity(query_skills, union)
+
+        results = []
+        if target_kind == 'resume':
+            # The query is the JD: each JD skill needs a close resume skill
+            for doc_id, skills in doc_skills.items():
+                if not skills:
+                    continue
+                hits = similarity[:, [column[s] for s in skills]].max(axis=1) >= SIMILARITY_THRESHOLD
+                results.append(self._result(doc_id, query_skills, hits))
+        else:
+            # The query is the resume: a JD skill is covered if any resume skill is close
+            covered = similarity.max(axis=0) >= SIMILARITY_THRESHOLD
+            for doc_id, skills in doc_skills.items():
+                if not skills:
+                    continue
+                hits = covered[[column[s] for s in skills]]
+                results.append(self._result(doc_id, skills, hits))
+        return results
+
+    @staticmethod
+    def _result(doc_id, jd_skills, hits):
+        return {
+            'doc_id': doc_id,
+            'score': round(float(hits.sum()) / len(jd_skills) * 100, 2),
+            'matched_skills': [s for s, hit in zip(jd_skills, hits) if hit],
+            'missing_skills': [s for s, hit in zip(jd_skills, hits) if not hit]
+        }
@@ -124,7 +124,41 @@ def analyze_company_culture(jd_text):
     return culture_signals
 
 
-def generate_role_insights(jd_text, company_info, culture_signals, matched_skills, missing_skills):
+# Keyword groups behind the emphasis, tip and red/green flag rules
+JD_SIGNAL_KEYWORDS = {
+    'leadership': ['leadership', 'senior'],
+    'startup': ['startup'],
+    'portfolio': ['portfolio', 'github'],
+    'referral': ['referral', 'employee referral'],
+    'unpaid': ['unpaid', 'no compensation'],
+    'overtime': ['overtime expected', 'long hours'],
+    'urgent': ['urgent'],
+    'immediate': ['immediate'],
+    'development': ['professional development', 'training budget'],
+    'remote': ['remote', 'work from home'],
+    'equity': ['equity', 'stock options'],
+    'diversity': ['diverse', 'inclusive']
+}
+
+
+def extract_jd_signals(jd_text):
+    """
+    Detect the JD-only inputs of the role insight rules
+    
+    Args:
+        jd_text (str): Job description text
+        
+    Returns:
+        dict: Signal name -> whether any of its keywords appears
+    """
+    jd_lower = jd_text.lower()
+    return {
+        signal: any(keyword in jd_lower for keyword in keywords)
+        for signal, keywords in JD_SIGNAL_KEYWORDS.items()
+    }
+
+
+def generate_role_insights(jd_text, company_info, culture_signals, matched_skills, missing_skills, jd_signals=None):
     """
     Generate strategic insights and recommendations for the application
     
@@ -134,10 +168,14 @@ def generate_role_insights(jd_text, company_info, culture_signals, matched_skill
         culture_signals (list): Cultural attributes
         matched_skills (list): Skills the candidate has
         missing_skills (list): Skills the candidate needs
+        jd_signals (dict): Precomputed extract_jd_signals(jd_text), e.g. from a JobProfile
         
     Returns:
         dict: Comprehensive insights and recommendations
     """
+    if jd_signals is None:
+        jd_signals = extract_jd_signals(jd_text)
+    
     insights = {
         'company_overview': '',
         'role_focus': '',
@@ -165,8 +203,6 @@ def generate_role_insights(jd_text, company_info, culture_signals, matched_skill
         insights['role_focus'] += "."
     
     # What to Emphasize
-    jd_lower = jd_text.lower()
-    
     if 'Open Source Friendly' in culture_signals:
         insights['what_to_emphasize'].append("💡 Highlight your GitHub profile and any open source contributions")
     
@@ -182,10 +218,10 @@ def generate_role_insights(jd_text, company_info, culture_signals, matched_skill
     if 'Customer-Centric' in culture_signals:
         insights['what_to_emphasize'].append("⭐ Include examples of improving user experience or customer satisfaction")
     
-    if 'leadership' in jd_lower or 'senior' in jd_lower:
+    if jd_signals['leadership']:
         insights['what_to_emphasize'].append("👔 Demonstrate leadership experience and mentoring capabilities")
     
-    if 'startup' in jd_lower or company_info['company_size'] == 'startup':
+    if jd_signals['startup'] or company_info['company_size'] == 'startup':
         insights['what_to_emphasize'].append("⚡ Show adaptability, wearing multiple hats, and thriving in ambiguity")
     
     # Application Tips
@@ -195,10 +231,10 @@ def generate_role_insights(jd_text, company_info, culture_signals, matched_skill
     if len(matched_skills) >= 7:
         insights['application_tips'].append("✅ Strong skill match! Lead with your technical expertise in the cover letter")
     
-    if 'portfolio' in jd_lower or 'github' in jd_lower:
+    if jd_signals['portfolio']:
         insights['application_tips'].append("📂 Attach or link your portfolio/GitHub - it's likely required for review")
     
-    if 'referral' in jd_lower or 'employee referral' in jd_lower:
+    if jd_signals['referral']:
         insights['application_tips'].append("🔗 Seek an employee referral if possible - the JD mentions it")
     
     insights['application_tips'].append("📝 Customize your resume to mirror the language used in this JD")
@@ -228,29 +264,29 @@ def generate_role_insights(jd_text, company_info, culture_signals, matched_skill
         insights['career_path'] = "Career progression varies by role; typically Junior → Senior → Lead → Manager"
     
     # Red Flags
-    if 'unpaid' in jd_lower or 'no compensation' in jd_lower:
+    if jd_signals['unpaid']:
         insights['red_flags'].append("🚩 Unpaid position - consider if this aligns with your goals")
     
-    if 'overtime expected' in jd_lower or 'long hours' in jd_lower:
+    if jd_signals['overtime']:
         insights['red_flags'].append("🚩 Mentions expected overtime - assess work-life balance expectations")
     
     if len(missing_skills) > 10:
         insights['red_flags'].append("🚩 Many missing skills - this role might be a significant stretch")
     
-    if 'urgent' in jd_lower and 'immediate' in jd_lower:
+    if jd_signals['urgent'] and jd_signals['immediate']:
         insights['red_flags'].append("⚠️ Urgency signals possible high turnover or critical backfill")
     
     # Green Flags
-    if 'professional development' in jd_lower or 'training budget' in jd_lower:
+    if jd_signals['development']:
         insights['green_flags'].append("✅ Offers professional development opportunities")
     
-    if 'remote' in jd_lower or 'work from home' in jd_lower:
+    if jd_signals['remote']:
         insights['green_flags'].append("✅ Remote work options available")
     
-    if 'equity' in jd_lower or 'stock options' in jd_lower:
+    if jd_signals['equity']:
         insights['green_flags'].append("✅ Equity/stock options mentioned - potential for ownership")
     
-    if 'diverse' in jd_lower or 'inclusive' in jd_lower:
+    if jd_signals['diversity']:
         insights['green_flags'].append("✅ Company emphasizes diversity and inclusion")
     
     if len(matched_skills) >= 8:
@@ -259,7 +295,7 @@ def generate_role_insights(jd_text, company_info, culture_signals, matched_skill
     return insights
 
 
-def generate_company_insights(jd_text, matched_skills, missing_skills):
+def generate_company_insights(jd_text, matched_skills, missing_skills, job_profile=None):
     """
     Main function to generate complete company and role insights
     
@@ -267,13 +303,22 @@ def generate_company_insights(jd_text, matched_skills, missing_skills):
         jd_text (str): Job description text
         matched_skills (list): Skills the candidate has
         missing_skills (list): Skills the candidate needs
+        job_profile (JobProfile): Precompiled JD analysis; skips re-parsing jd_text
         
     Returns:
         dict: Complete insights package
     """
-    company_info = extract_company_info(jd_text)
-    culture_signals = analyze_company_culture(jd_text)
-    insights = generate_role_insights(jd_text, company_info, culture_signals, matched_skills, missing_skills)
+    if job_profile is not None:
+        company_info = job_profile.company_info
+        culture_signals = job_profile.culture_signals
+        jd_signals = job_profile.jd_signals
+    else:
+        company_info = extract_company_info(jd_text)
+        culture_signals = analyze_company_culture(jd_text)
+        jd_signals = extract_jd_signals(jd_text)
+    insights = generate_role_insights(
+        jd_text, company_info, culture_signals, matched_skills, missing_skills, jd_signals=jd_signals
+    )
     
     return {
         'company_info': company_info,
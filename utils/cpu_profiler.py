@@ -0,0 +1,150 @@
+"""
+CPU Profiler
+Runs a single request under cProfile and keeps the result on disk: a .pstats
+dump (readable by pstats, snakeviz, flameprof or gprof2dot), a text report
+and a small JSON summary used for listings
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PROFILE_DIR = os.path.join(PROJECT_ROOT, 'profiles')
+
+PROFILE_ID_PATTERN = re.compile(r'^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$')
+TOP_FUNCTIONS = 15
+
+
+def _function_label(func):
+    filename, line, name = func
+    if filename == '~':
+        return name  # built-ins such as {method 'extract_text' ...}
+    return f"{os.path.relpath(filename, PROJECT_ROOT) if filename.startswith(PROJECT_ROOT) else filename}:{line}({name})"
+
+
+class CpuProfileStore:
+    """
+    Directory of profiled requests; the oldest beyond keep are deleted.
+
+    Args:
+        directory (str): Where profiles are written
+        keep (int): Number of profiles retained
+    """
+
+    def __init__(self, directory=DEFAULT_PROFILE_DIR, keep=100):
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def path(self, profile_id, extension):
+        """
+        File of a stored profile ('pstats', 'txt' or 'json'); raises
+        ValueError for malformed IDs so callers cannot escape the directory
+        """
+        if not PROFILE_ID_PATTERN.match(profile_id or ''):
+            raise ValueError(f"Invalid profile ID '{profile_id}'.")
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def run(self, fn, label, details=None):
+        """
+        Call fn() under cProfile and store the profile, even if fn raises
+        (the exception then carries a profile_id attribute)
+
+        Args:
+            fn (callable): Work to profile; must run in the calling thread
+            label (str): What was profiled, e.g. the endpoint name
+            details (dict): Extra fields for the summary (request size, ...)
+
+        Returns:
+            tuple: (fn's return value, profile ID)
+        """
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            result = fn()
+        except Exception as e:
+            profiler.disable()
+            # The profile of a failing request is kept too; its ID rides on the exception
+            e.profile_id = self._save(profiler, label, time.perf_counter() - started, details, e)
+            raise
+        profiler.disable()
+        return result, self._save(profiler, label, time.perf_counter() - started, details, None)
+
+    def _save(self, profiler, label, elapsed, details, error):
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{uuid.uuid4().hex[:8]}"
+        os.makedirs(self.directory, exist_ok=True)
+        profiler.dump_stats(self.path(profile_id, 'pstats'))
+
+        report = io.StringIO()
+        stats = pstats.Stats(profiler, stream=report)
+        stats.sort_stats('cumulative').print_stats(60)
+        stats.sort_stats('tottime').print_stats(30)
+        with open(self.path(profile_id, 'txt'), 'w') as f:
+            f.write(report.getvalue())
+
+        by_self_time = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:TOP_FUNCTIONS]
+        summary = {
+            'profile_id': profile_id,
+            'label': label,
+            'created_at': time.time(),
+            'duration_ms': round(elapsed * 1000, 3),
+            'error': str(error) if error is not None else None,
+            **(details or {}),
+            'top_functions': [
+                {'function': _function_label(func), 'calls': nc, 'self_ms': round(tt * 1000, 3),
+                 'cumulative_ms': round(ct * 1000, 3)}
+                for func, (cc, nc, tt, ct, callers) in by_self_time
+            ]
+        }
+        with open(self.path(profile_id, 'json'), 'w') as f:
+            json.dump(summary, f, indent=2)
+
+        self._prune()
+        return profile_id
+
+    def _prune(self):
+        with self._lock:
+            ids = sorted(self._ids())
+            for profile_id in ids[:max(len(ids) - self.keep, 0)]:
+                for extension in ('pstats', 'txt', 'json'):
+                    try:
+                        os.remove(self.path(profile_id, extension))
+                    except FileNotFoundError:
+                        pass
+
+    def _ids(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return [name[:-5] for name in os.listdir(self.directory)
+                if name.endswith('.json') and PROFILE_ID_PATTERN.match(name[:-5])]
+
+    def list(self):
+        """
+        Summaries of the stored profiles, newest first
+        """
+        summaries = []
+        for profile_id in sorted(self._ids(), reverse=True):
+            try:
+                with open(self.path(profile_id, 'json')) as f:
+                    summaries.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return summaries
+
+
+def cpu_profile_store_from_env():
+    """
+    Store in JOBFIT_PROFILE_DIR keeping the newest JOBFIT_PROFILE_KEEP profiles
+    """
+    return CpuProfileStore(
+        os.environ.get('JOBFIT_PROFILE_DIR', DEFAULT_PROFILE_DIR),
+        keep=int(os.environ.get('JOBFIT_PROFILE_KEEP', '100'))
+    )
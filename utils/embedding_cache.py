@@ -0,0 +1,362 @@
+"""
+Embedding Cache
+Content-addressed cache for phrase embeddings: a byte-bounded in-memory LRU
+in front of a persistent, memory-mapped store shared across workers
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+from utils.vector_storage import EncodedVectors, default_encoding, row_dtype
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process writes only
+    fcntl = None
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_ROOT, 'data', 'embedding_cache')
+
+# Keys per "IN (...)" query, well below SQLite's bound-variable limit
+KEY_CHUNK = 500
+
+
+def phrase_key(model_name, phrase):
+    """
+    Content address of a phrase embedding for a given model
+    """
+    return hashlib.sha1(f"{model_name}\0{phrase}".encode('utf-8')).hexdigest()
+
+
+class DiskEmbeddingStore:
+    """
+    Append-only vector file plus a SQLite key -> row index.
+
+    Rows are read through a read-only memory map, so many worker processes
+    can share the same pages. Appends take an exclusive file lock. The row
+    encoding (float32, float16 or int8), the vector dimension and the model
+    identity are recorded in the meta table when the first vectors arrive.
+    A store written by other model weights, or whose files disagree with its
+    meta table, is emptied when first used for writing and ignored when
+    read-only. model_id may be a callable: hashing the weights can be slow,
+    so it is only resolved on first use.
+    """
+
+    def __init__(self, directory, readonly=False, encoding=None, model_id=None):
+        self.directory = directory
+        self.readonly = readonly
+        self._model_id = model_id
+        self._validated = False
+        self.vectors_path = os.path.join(directory, 'vectors.bin')
+        self.index_path = os.path.join(directory, 'index.sqlite')
+        self.lock_path = os.path.join(directory, 'write.lock')
+        self._configured_encoding = encoding or default_encoding()
+        self.encoding = self._configured_encoding
+        self._meta = None
+        self._dim = None
+        self._mmap = None
+        self._mapped_rows = 0
+        self._lock = threading.Lock()
+
+        if not readonly:
+            os.makedirs(directory, exist_ok=True)
+            with sqlite3.connect(self.index_path) as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+                conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    @property
+    def model_id(self):
+        if callable(self._model_id):
+            self._model_id = self._model_id()
+        return self._model_id
+
+    def _open(self):
+        """
+        Check the stored files against this process once, before first use
+        """
+        if not self._validated:
+            if os.path.exists(self.index_path):
+                self._validate()
+            self._validated = True
+
+    def _connect(self):
+        if self.readonly:
+            return sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True, timeout=30)
+        return sqlite3.connect(self.index_path, timeout=30)
+
+    def _stored_rows(self, conn, keys):
+        """
+        {key: row} for the keys already in the index
+        """
+        found = {}
+        for start in range(0, len(keys), KEY_CHUNK):
+            chunk = keys[start:start + KEY_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            found.update(conn.execute(f"SELECT key, row FROM entries WHERE key IN ({placeholders})", chunk))
+        return found
+
+    @contextmanager
+    def _write_lock(self):
+        with self._lock, open(self.lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_meta(self, conn):
+        meta = dict(conn.execute("SELECT name, value FROM meta"))
+        if meta != self._meta:
+            # Created, or rebuilt by another process: the old mapping is stale
+            self._meta = meta
+            self._mmap = None
+            self._mapped_rows = 0
+            self._dim = int(meta['dim']) if 'dim' in meta else None
+            self.encoding = meta.get('encoding', 'float32') if self._dim else self._configured_encoding
+        return meta
+
+    def _problem(self, conn, meta):
+        """
+        Why the stored vectors cannot be used by this process, or None
+        """
+        if self._dim is None:
+            return None
+        if self.model_id is not None and meta.get('model') != self.model_id:
+            return f"written by model {meta.get('model', 'unknown')}, not {self.model_id}"
+        row_bytes = row_dtype(self._dim, self.encoding).itemsize
+        size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        last_row = conn.execute("SELECT MAX(row) FROM entries").fetchone()[0]
+        if size % row_bytes or (last_row is not None and last_row >= size // row_bytes):
+            return f"vector file does not hold {self._dim}-dim {self.encoding} rows"
+        return None
+
+    def _reset(self, conn):
+        conn.execute("DELETE FROM entries")
+        conn.execute("DELETE FROM meta")
+        # A fresh file rather than a truncation: other processes may still map the old one
+        fd, path = tempfile.mkstemp(dir=self.directory)
+        os.close(fd)
+        os.replace(path, self.vectors_path)
+        self._read_meta(conn)
+
+    def _validate(self):
+        if self.readonly:
+            conn = self._connect()
+            try:
+                problem = self._problem(conn, self._read_meta(conn))
+            finally:
+                conn.close()
+            if problem:
+                print(f"Ignoring embedding cache {self.directory}: {problem}")
+            return
+
+        with self._write_lock():
+            conn = self._connect()
+            try:
+                with conn:
+                    problem = self._problem(conn, self._read_meta(conn))
+                    if problem:
+                        print(f"Rebuilding embedding cache {self.directory}: {problem}")
+                        self._reset(conn)
+            finally:
+                conn.close()
+
+    def _rows(self, needed):
+        # Re-map when another process appended past the current mapping
+        if self._mmap is None or needed >= self._mapped_rows:
+            dtype = row_dtype(self._dim, self.encoding)
+            total = os.path.getsize(self.vectors_path) // dtype.itemsize
+            self._mmap = np.memmap(self.vectors_path, dtype=dtype, mode='r', shape=(total,))
+            self._mapped_rows = total
+        return self._mmap
+
+    def get_many(self, keys):
+        """
+        Return {key: vector} for the keys present on disk
+        """
+        if not keys or not os.path.exists(self.index_path):
+            return {}
+        self._open()
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                meta = self._read_meta(conn)
+                if self._dim is None or (self.model_id is not None and meta.get('model') != self.model_id):
+                    return {}
+                found = self._stored_rows(conn, keys)
+            finally:
+                conn.close()
+
+            if not found:
+                return {}
+            keys = list(found)
+            rows = self._rows(max(found.values()))[[found[key] for key in keys]]
+            vectors = EncodedVectors.from_rows(rows, self.encoding).to_float32()
+            return dict(zip(keys, vectors))
+
+    def put_many(self, keys, vectors):
+        """
+        Append vectors for keys that are not stored yet. Vectors from another
+        model, or of another dimension than the stored ones, are not written.
+        """
+        if self.readonly or not keys:
+            return
+        self._open()
+        vectors = np.asarray(vectors, dtype=np.float32)
+
+        with self._write_lock():
+            conn = self._connect()
+            try:
+                with conn:
+                    meta = self._read_meta(conn)
+                    if self._dim is None:
+                        self._dim = vectors.shape[1]
+                        conn.executemany("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", [
+                            ('dim', str(self._dim)), ('encoding', self.encoding),
+                            ('model', self.model_id or ''), ('generation', uuid.uuid4().hex)
+                        ])
+                        meta = self._read_meta(conn)
+                    elif self.model_id is not None and meta.get('model') != self.model_id:
+                        print(f"Not caching embeddings: {self.directory} now belongs to model {meta.get('model')}")
+                        return
+                    if vectors.ndim != 2 or vectors.shape[1] != self._dim:
+                        print(f"Not caching embeddings: shape {vectors.shape} does not match "
+                              f"the stored dimension {self._dim}")
+                        return
+
+                    # First position of every key, so a repeated phrase is written once
+                    positions = {}
+                    for i, key in enumerate(keys):
+                        positions.setdefault(key, i)
+                    existing = self._stored_rows(conn, list(positions))
+                    new = [(key, i) for key, i in positions.items() if key not in existing]
+                    if not new:
+                        return
+
+                    encoded = EncodedVectors.encode(vectors[[i for _, i in new]], self.encoding)
+                    with open(self.vectors_path, 'ab') as f:
+                        first_row = f.tell() // row_dtype(self._dim, self.encoding).itemsize
+                        f.write(encoded.tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO entries (key, row) VALUES (?, ?)",
+                        [(key, first_row + n) for n, (key, _) in enumerate(new)]
+                    )
+            finally:
+                conn.close()
+
+
+class EmbeddingCache:
+    """
+    Byte-bounded LRU in front of an optional DiskEmbeddingStore.
+
+    Args:
+        model_name (str): Part of every key, so models never share vectors
+        max_bytes (int): Memory budget for cached vectors
+        store (DiskEmbeddingStore): Persistent layer, or None for memory only
+    """
+
+    def __init__(self, model_name, max_bytes=64 * 1024 * 1024, store=None):
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self.store = store
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _remember(self, key, vector):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        self._entries[key] = vector
+        self._bytes += vector.nbytes
+        while self._bytes > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.counters['evictions'] += 1
+
+    def get_many(self, phrases):
+        """
+        Look phrases up in memory, then on disk
+
+        Returns:
+            dict: {phrase: vector} for every phrase found
+        """
+        keys = {phrase: phrase_key(self.model_name, phrase) for phrase in dict.fromkeys(phrases)}
+        found = {}
+        with self._lock:
+            for phrase, key in keys.items():
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[phrase] = vector
+            self.counters['memory_hits'] += len(found)
+
+        remaining = [phrase for phrase in keys if phrase not in found]
+        if remaining and self.store is not None:
+            on_disk = self.store.get_many([keys[phrase] for phrase in remaining])
+            with self._lock:
+                for phrase in remaining:
+                    vector = on_disk.get(keys[phrase])
+                    if vector is not None:
+                        found[phrase] = vector
+                        self._remember(keys[phrase], vector)
+                        self.counters['disk_hits'] += 1
+
+        with self._lock:
+            self.counters['misses'] += len(keys) - len(found)
+        return found
+
+    def put_many(self, phrases, vectors):
+        """
+        Store freshly encoded vectors in memory and on disk
+        """
+        keys = [phrase_key(self.model_name, phrase) for phrase in phrases]
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._remember(key, np.array(vector, dtype=np.float32))
+        if self.store is not None:
+            self.store.put_many(keys, vectors)
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self.counters,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'persistent': self.store is not None,
+                'readonly': bool(self.store and self.store.readonly)
+            }
+
+
+def embedding_cache_from_env(model_name, model_id=None):
+    """
+    Build the cache from JOBFIT_EMBEDDING_CACHE* settings; None when disabled.
+    The disk store only serves vectors written by the model named by model_id
+    (a string, or a callable resolved on first use).
+    """
+    if os.environ.get('JOBFIT_EMBEDDING_CACHE', '1') == '0':
+        return None
+
+    store = None
+    directory = os.environ.get('JOBFIT_EMBEDDING_CACHE_DIR', DEFAULT_CACHE_DIR)
+    if directory:
+        readonly = os.environ.get('JOBFIT_EMBEDDING_CACHE_READONLY', '0') == '1'
+        store = DiskEmbeddingStore(os.path.join(directory, model_name), readonly=readonly, model_id=model_id)
+
+    max_bytes = int(float(os.environ.get('JOBFIT_EMBEDDING_CACHE_MB', '64')) * 1024 * 1024)
+    return EmbeddingCache(model_name, max_bytes=max_bytes, store=store)
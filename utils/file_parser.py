@@ -1,35 +1,354 @@
+import codecs
+import multiprocessing
 import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+import zipfile
+from collections import deque
+from contextlib import closing, contextmanager
 from pypdf import PdfReader
 from docx import Document
+from werkzeug.datastructures import FileStorage
+from utils.metrics import document_pages, file_parse_seconds
 
-def extract_text_from_file(file_storage):
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+# Guards against zip bombs: largest single entry accepted from an archive
+MAX_ARCHIVE_ENTRY_BYTES = 20 * 1024 * 1024
+
+# Per-document limits (0 disables one): upload size, PDF pages, and the
+# characters kept from a document; longer text is truncated, not rejected
+MAX_FILE_BYTES = int(float(os.environ.get('JOBFIT_MAX_FILE_MB', '10')) * 1024 * 1024)
+MAX_PAGES = int(os.environ.get('JOBFIT_MAX_PAGES', '50'))
+MAX_CHARS = int(os.environ.get('JOBFIT_MAX_CHARS', '100000'))
+
+# Archive entries above this size are spooled to a temporary file
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+# PDFs of at least JOBFIT_PDF_PARALLEL_PAGES pages are extracted page by page
+# in JOBFIT_PDF_WORKERS processes (0 keeps every PDF in-process). A page that
+# takes longer than JOBFIT_PDF_PAGE_TIMEOUT seconds (0: no limit) is skipped:
+# by the pool for long PDFs, in-process by a deadline checked between the
+# page's content-stream operators for the others.
+PDF_WORKERS = int(os.environ.get('JOBFIT_PDF_WORKERS', str(min(os.cpu_count() or 1, 4))))
+PDF_PARALLEL_PAGES = int(os.environ.get('JOBFIT_PDF_PARALLEL_PAGES', '8'))
+PDF_PAGE_TIMEOUT = float(os.environ.get('JOBFIT_PDF_PAGE_TIMEOUT', '10'))
+
+# Starts every PDF page after the first in extracted text (as pdftotext
+# does), so page boundaries reach section detection; see split_pages
+PAGE_BREAK = '\f'
+
+class DocumentTooLargeError(ValueError):
+    """
+    An upload over the byte or page limit; the API answers it with 413
+    """
+
+class PageTimeoutError(Exception):
+    """
+    A PDF page still extracting after PDF_PAGE_TIMEOUT seconds
+    """
+
+def truncate_text(text, max_chars=MAX_CHARS):
+    """
+    Cuts text to max_chars characters.
+
+    Returns:
+        tuple: (text, whether it was truncated)
+    """
+    if max_chars and len(text) > max_chars:
+        return text[:max_chars], True
+    return text, False
+
+def _check_size(file_storage):
     """
-    Extracts text from a FileStorage object (PDF or DOCX).
+    Rejects an upload over MAX_FILE_BYTES before any parsing; the stream is
+    a spooled file for large uploads, so this only seeks.
+    """
+    stream = file_storage.stream
+    position = stream.tell()
+    size = stream.seek(0, os.SEEK_END)
+    stream.seek(position)
+    if MAX_FILE_BYTES and size > MAX_FILE_BYTES:
+        raise DocumentTooLargeError(
+            f"'{file_storage.filename}' is {size / 1024 / 1024:.1f} MB; "
+            f"the limit is {MAX_FILE_BYTES / 1024 / 1024:g} MB."
+        )
+
+def extract_document(file_storage, max_chars=MAX_CHARS):
+    """
+    Extracts text from a FileStorage object (PDF, DOCX or TXT), reading no
+    further than max_chars characters.
+    Raises DocumentTooLargeError for uploads over the byte or page limit.
+
+    Returns:
+        tuple: (text, whether it was truncated at max_chars)
     """
     filename = file_storage.filename.lower()
+    started = time.perf_counter()
     
     try:
+        _check_size(file_storage)
         if filename.endswith('.pdf'):
-            return _extract_from_pdf(file_storage)
+            text = _extract_from_pdf(file_storage, max_chars)
         elif filename.endswith('.docx'):
-            return _extract_from_docx(file_storage)
+            text = _extract_from_docx(file_storage, max_chars)
         elif filename.endswith('.txt'):
-            return file_storage.read().decode('utf-8')
+            text = _read_text(file_storage.stream, max_chars)
         else:
             raise ValueError("Unsupported file format. Please upload PDF, DOCX, or TXT.")
+    except DocumentTooLargeError:
+        raise
     except Exception as e:
         raise ValueError(f"Error parsing file: {str(e)}")
+    finally:
+        file_format = os.path.splitext(filename)[1].lstrip('.')
+        if file_format in ('pdf', 'docx', 'txt'):
+            file_parse_seconds.observe(time.perf_counter() - started, format=file_format)
+    return truncate_text(text, max_chars)
+
+def extract_text_from_file(file_storage, max_chars=MAX_CHARS):
+    """
+    Extracts text from a FileStorage object (PDF or DOCX), truncated at
+    max_chars characters.
+    """
+    return extract_document(file_storage, max_chars)[0]
+
+def is_archive(file_storage):
+    return file_storage.filename.lower().endswith('.zip')
+
+def expand_archive(file_storage, max_files=1000):
+    """
+    Opens a .zip upload and returns one FileStorage per PDF, DOCX or TXT
+    entry, in archive order. Folders, hidden files and other formats are skipped.
+    """
+    try:
+        # Read in place: large uploads are already spooled to disk by the form parser
+        archive = zipfile.ZipFile(file_storage.stream)
+    except zipfile.BadZipFile:
+        raise ValueError(f"'{file_storage.filename}' is not a valid zip archive.")
+
+    files = []
+    with archive:
+        for info in archive.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or not name or name.startswith('.') or '__MACOSX' in info.filename:
+                continue
+            if not name.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+            if info.file_size > MAX_ARCHIVE_ENTRY_BYTES:
+                raise ValueError(f"'{info.filename}' in '{file_storage.filename}' is too large.")
+            if len(files) >= max_files:
+                raise ValueError(f"'{file_storage.filename}' holds more than {max_files} documents.")
+            files.append(FileStorage(stream=_spool_entry(archive, info), filename=name))
+    return files
+
+def _spool_entry(archive, info):
+    """
+    Copies one archive entry into a file that stays in memory up to
+    SPOOL_MEMORY_BYTES. The size is enforced on the bytes actually
+    inflated, since the size in the zip header may be forged.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    with archive.open(info) as entry:
+        for chunk in iter(lambda: entry.read(64 * 1024), b''):
+            spool.write(chunk)
+            if spool.tell() > MAX_ARCHIVE_ENTRY_BYTES:
+                spool.close()
+                raise ValueError(f"'{info.filename}' in the archive is too large.")
+    spool.seek(0)
+    return spool
+
+def _read_text(stream, max_chars):
+    """
+    Decodes UTF-8 text chunk by chunk, stopping once max_chars + 1
+    characters are in (one more than kept, so truncation is detected)
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    parts, length = [], 0
+    for chunk in iter(lambda: stream.read(64 * 1024), b''):
+        part = decoder.decode(chunk)
+        parts.append(part)
+        length += len(part)
+        if max_chars and length > max_chars:
+            return ''.join(parts)
+    parts.append(decoder.decode(b'', final=True))
+    return ''.join(parts)
+
+def split_pages(text):
+    """
+    Removes PAGE_BREAK marks from extracted text.
+
+    Returns:
+        tuple: (text without the marks, line index where each page after
+        the first starts)
+    """
+    if PAGE_BREAK not in text:
+        return text, []
+    breaks = [i for i, line in enumerate(text.split('\n')) if line.startswith(PAGE_BREAK)]
+    return text.replace(PAGE_BREAK, ''), breaks
+
+def iter_pdf_pages(file_storage):
+    """
+    Yields the text of each page of a PDF upload in order, each as soon as
+    it and the pages before it are extracted; stop iterating to stop
+    extracting. Long documents are extracted by the page worker pool. A page
+    that fails or times out is skipped and yields None.
+    Raises DocumentTooLargeError for more than MAX_PAGES pages.
+    """
+    # pypdf reads objects from the (spooled) stream as pages are accessed
+    reader = PdfReader(file_storage.stream)
+    page_count = len(reader.pages)
+    document_pages.observe(page_count, format='pdf')
+    if MAX_PAGES and page_count > MAX_PAGES:
+        raise DocumentTooLargeError(
+            f"'{file_storage.filename}' has {page_count} pages; the limit is {MAX_PAGES}."
+        )
+
+    # Pool workers (e.g. of the jobfit CLI) cannot start processes of their own
+    can_fork = PDF_WORKERS and not multiprocessing.current_process().daemon
+    if can_fork and page_count >= PDF_PARALLEL_PAGES:
+        yield from _iter_pages_in_pool(file_storage, page_count)
+        return
+    for number, page in enumerate(reader.pages, 1):
+        try:
+            page_text = _extract_with_deadline(page, PDF_PAGE_TIMEOUT)
+        except Exception as e:
+            print(f"Skipped page {number} of '{file_storage.filename}': {e}")
+            page_text = None
+        yield page_text
+
+def _extract_with_deadline(page, seconds):
+    """
+    page.extract_text(), raising PageTimeoutError once seconds (0: no limit)
+    have passed. The deadline is checked before every content-stream
+    operator, so it works in request threads, where signals cannot reach.
+    """
+    if not seconds:
+        return page.extract_text()
+    deadline = time.monotonic() + seconds
+
+    def check_deadline(operator, operands, cm, tm):
+        if time.monotonic() > deadline:
+            raise PageTimeoutError(f"no text after {seconds:g}s")
+
+    return page.extract_text(visitor_operand_before=check_deadline)
+
+def _iter_pages_in_pool(file_storage, page_count):
+    # Workers open their own copy of the document, by path
+    fd, path = tempfile.mkstemp(suffix='.pdf')
+    try:
+        with os.fdopen(fd, 'wb') as copy:
+            file_storage.stream.seek(0)
+            shutil.copyfileobj(file_storage.stream, copy)
+
+        with page_pool.acquire() as pool:
+            # A few pages ahead of the consumer, so stopping early leaves little work behind
+            pending, submitted = deque(), 0
+            while pending or submitted < page_count:
+                while submitted < page_count and len(pending) < 2 * PDF_WORKERS:
+                    pending.append(pool.apply_async(_extract_page, (path, submitted)))
+                    submitted += 1
+                number = submitted - len(pending) + 1
+                try:
+                    yield pending.popleft().get(PDF_PAGE_TIMEOUT or None)
+                except multiprocessing.TimeoutError:
+                    print(f"Skipped page {number} of '{file_storage.filename}': "
+                          f"no text after {PDF_PAGE_TIMEOUT:g}s")
+                    # Its worker may never come back; the pool is replaced once idle
+                    page_pool.discard(pool)
+                    yield None
+                except Exception as e:
+                    print(f"Skipped page {number} of '{file_storage.filename}': {e}")
+                    yield None
+    finally:
+        os.remove(path)
+
+# Document last opened by this page worker process: (path, PdfReader)
+_worker_document = (None, None)
+
+def _init_page_worker():
+    # Restore default handling so terminate() works and Ctrl-C is left to the server
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def _extract_page(path, index):
+    global _worker_document
+    if _worker_document[0] != path:
+        _worker_document = (path, PdfReader(path))
+    return _worker_document[1].pages[index].extract_text()
+
+class PageWorkerPool:
+    """
+    Process pool for page extraction, started on first use. A pool with a
+    stuck worker is discarded: new documents get a fresh pool and the old
+    one is terminated when its last document is done with it.
+
+    Workers come from a forkserver where available (spawn elsewhere), never
+    from a fork of the calling process, which by then runs request threads
+    and may hold torch's thread pools. The forkserver imports __main__ once
+    and forks every worker from that single-threaded process.
+
+    Args:
+        workers (int): Processes in the pool
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._pool = None
+        self._users = {}
+        self._discarded = set()
+
+    @contextmanager
+    def acquire(self):
+        with self._lock:
+            if self._pool is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                self._pool = context.Pool(self.workers, initializer=_init_page_worker)
+            pool = self._pool
+            self._users[pool] = self._users.get(pool, 0) + 1
+        try:
+            yield pool
+        finally:
+            with self._lock:
+                self._users[pool] -= 1
+                finished = pool in self._discarded and not self._users[pool]
+                if finished:
+                    del self._users[pool]
+                    self._discarded.discard(pool)
+            if finished:
+                pool.terminate()
+
+    def discard(self, pool):
+        with self._lock:
+            self._discarded.add(pool)
+            if self._pool is pool:
+                self._pool = None
+
+page_pool = PageWorkerPool(PDF_WORKERS)
 
-def _extract_from_pdf(file_storage):
-    reader = PdfReader(file_storage)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() + "\n"
-    return text
+def _extract_from_pdf(file_storage, max_chars):
+    text, length = [], 0
+    with closing(iter_pdf_pages(file_storage)) as pages:
+        for page_text in pages:
+            # A skipped page stays a (blank) page so later page breaks keep their place
+            page_text = (PAGE_BREAK if text else "") + (page_text or "").lstrip('\n') + "\n"
+            text.append(page_text)
+            length += len(page_text)
+            if max_chars and length > max_chars:
+                break
+    return "".join(text)
 
-def _extract_from_docx(file_storage):
-    doc = Document(file_storage)
-    text = []
+def _extract_from_docx(file_storage, max_chars):
+    doc = Document(file_storage.stream)
+    text, length = [], 0
     for paragraph in doc.paragraphs:
         text.append(paragraph.text)
+        length += len(paragraph.text) + 1
+        if max_chars and length > max_chars:
+            break
     return "\n".join(text)
@@ -49,12 +49,15 @@ def extract_job_details(jd_text):
         
     return job_title, company
 
-def generate_cover_letter(jd_text, matched_skills, resume_text=""):
+def generate_cover_letter(jd_text, matched_skills, resume_text="", candidate_name=None, job_details=None):
     """
     Generates a simple template-based cover letter.
+    Pass candidate_name and job_details ((title, company)) when they are
+    already known to skip re-parsing the resume and the JD.
     """
-    job_title, company = extract_job_details(jd_text)
-    candidate_name = extract_name(resume_text)
+    job_title, company = job_details if job_details is not None else extract_job_details(jd_text)
+    if candidate_name is None:
+        candidate_name = extract_name(resume_text)
     
     # Format skills for the letter
     if matched_skills:
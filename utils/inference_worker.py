@@ -0,0 +1,167 @@
+"""
+Micro-batching Inference Worker
+Collects encode requests from concurrent callers for a few milliseconds,
+deduplicates the phrases and runs a single batched forward pass
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from utils.metrics import BucketHistogram
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+QUEUE_WAIT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class _Request:
+    __slots__ = ('phrases', 'future', 'enqueued_at')
+
+    def __init__(self, phrases):
+        self.phrases = phrases
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class BatchingEncoder:
+    """
+    Single background thread that owns all forward passes.
+
+    Args:
+        encode_fn (callable): Maps a list of phrases to a (n, dim) array
+        window_ms (float): How long to wait for more requests after the first
+        max_batch_size (int): Upper bound on unique phrases per forward pass
+        num_threads (int): Torch intra-op threads for the worker (None keeps the default)
+    """
+
+    def __init__(self, encode_fn, window_ms=5.0, max_batch_size=256, num_threads=None):
+        self.encode_fn = encode_fn
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.num_threads = num_threads
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = BucketHistogram(BATCH_SIZE_BUCKETS)
+        self._requests_per_batch = BucketHistogram(BATCH_SIZE_BUCKETS)
+        self._queue_wait_ms = BucketHistogram(QUEUE_WAIT_MS_BUCKETS)
+        self._phrases_requested = 0
+        self._phrases_encoded = 0
+
+    def _ensure_started(self):
+        # Started on first use so the thread is created in the serving process
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='batching-encoder', daemon=True)
+                    self._thread.start()
+
+    def submit(self, phrases):
+        """
+        Queue phrases for encoding
+
+        Returns:
+            Future: Resolves to a (len(phrases), dim) array
+        """
+        request = _Request(list(phrases))
+        if not request.phrases:
+            request.future.set_result(np.zeros((0, 0), dtype=np.float32))
+            return request.future
+        self._ensure_started()
+        self._queue.put(request)
+        return request.future
+
+    def encode(self, phrases, timeout=None):
+        """
+        Encode phrases through the shared batch and wait for the result
+        """
+        return self.submit(phrases).result(timeout=timeout)
+
+    def _collect(self):
+        first = self._queue.get()
+        batch = [first]
+        pending = len(first.phrases)
+        deadline = time.perf_counter() + self.window
+        while pending < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            pending += len(request.phrases)
+        return batch
+
+    def _run(self):
+        if self.num_threads:
+            import torch
+            torch.set_num_threads(self.num_threads)
+
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+
+            unique = list(dict.fromkeys(p for request in batch for p in request.phrases))
+            try:
+                parts = [
+                    np.asarray(self.encode_fn(unique[i:i + self.max_batch_size]), dtype=np.float32)
+                    for i in range(0, len(unique), self.max_batch_size)
+                ]
+                embeddings = np.concatenate(parts)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            row = {phrase: i for i, phrase in enumerate(unique)}
+            for request in batch:
+                request.future.set_result(embeddings[[row[p] for p in request.phrases]])
+
+            with self._stats_lock:
+                self._batch_sizes.observe(len(unique))
+                self._requests_per_batch.observe(len(batch))
+                for request in batch:
+                    self._queue_wait_ms.observe((started - request.enqueued_at) * 1000)
+                    self._phrases_requested += len(request.phrases)
+                self._phrases_encoded += len(unique)
+
+    def stats(self):
+        """
+        Batch size, requests per batch and queue wait distributions
+        """
+        with self._stats_lock:
+            return {
+                'window_ms': self.window * 1000,
+                'max_batch_size': self.max_batch_size,
+                'num_threads': self.num_threads,
+                'queue_depth': self._queue.qsize(),
+                'phrases_requested': self._phrases_requested,
+                'phrases_encoded': self._phrases_encoded,
+                'batch_size': self._batch_sizes.snapshot(),
+                'requests_per_batch': self._requests_per_batch.snapshot(),
+                'queue_wait_ms': self._queue_wait_ms.snapshot()
+            }
+
+
+def batching_encoder_from_env(encode_fn):
+    """
+    Build a BatchingEncoder when JOBFIT_MICROBATCH=1, else return None.
+    Tuned with JOBFIT_BATCH_WINDOW_MS, JOBFIT_BATCH_MAX_SIZE and JOBFIT_TORCH_THREADS.
+    """
+    if os.environ.get('JOBFIT_MICROBATCH', '0') != '1':
+        return None
+    threads = os.environ.get('JOBFIT_TORCH_THREADS')
+    return BatchingEncoder(
+        encode_fn,
+        window_ms=float(os.environ.get('JOBFIT_BATCH_WINDOW_MS', '5')),
+        max_batch_size=int(os.environ.get('JOBFIT_BATCH_MAX_SIZE', '256')),
+        num_threads=int(threads) if threads else None
+    )
@@ -23,11 +23,13 @@ def extract_key_technologies(jd_text, matched_skills):
     
     return list(technologies)[:10]  # Limit to top 10
 
-def generate_technical_question(skill, difficulty="medium"):
+def generate_technical_question(skill, difficulty="medium", rng=None):
     """
     Generates a technical interview question for a given skill.
     Uses templates to create realistic questions.
+    Pass a random.Random as rng for reproducible picks.
     """
+    rng = rng or random
     skill_lower = skill.lower()
     
     # Question templates based on common patterns
@@ -57,8 +59,8 @@ def generate_technical_question(skill, difficulty="medium"):
     }
     
     # Select random question type
-    question_type = random.choice(list(templates.keys()))
-    question = random.choice(templates[question_type])
+    question_type = rng.choice(list(templates.keys()))
+    question = rng.choice(templates[question_type])
     
     return {
         "skill": skill.title(),
@@ -67,15 +69,18 @@ def generate_technical_question(skill, difficulty="medium"):
         "category": question_type.title()
     }
 
-def generate_interview_questions(jd_text, matched_skills, num_questions=5):
+def generate_interview_questions(jd_text, matched_skills, num_questions=5, seed=None):
     """
     Generates a set of technical interview questions based on JD and matched skills.
+    The same seed always produces the same questions.
     """
     if not matched_skills:
         return []
     
-    # Get key technologies from JD
-    key_techs = list(set(matched_skills))[:num_questions]
+    rng = random.Random(seed) if seed is not None else random
+    
+    # Get key technologies from JD (first occurrence order, so the pick is stable)
+    key_techs = list(dict.fromkeys(matched_skills))[:num_questions]
     
     questions = []
     difficulties = ["easy", "medium", "hard"]
@@ -83,7 +88,7 @@ def generate_interview_questions(jd_text, matched_skills, num_questions=5):
     for i, skill in enumerate(key_techs):
         # Vary difficulty
         difficulty = difficulties[i % len(difficulties)]
-        question_obj = generate_technical_question(skill, difficulty)
+        question_obj = generate_technical_question(skill, difficulty, rng=rng)
         questions.append(question_obj)
     
     return questions
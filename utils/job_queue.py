@@ -0,0 +1,364 @@
+"""
+Job Queue
+Background batch analyses: one shared document (a JD or a resume) matched
+against many items by a local worker pool with bounded concurrency. Job
+state lives in a pluggable backend, in memory or in SQLite so queued work
+survives restarts
+"""
+
+import importlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_JOB_PATH = os.path.join(PROJECT_ROOT, 'data', 'jobs.sqlite')
+
+# What the items of a job are: "resumes" for one JD against many resumes,
+# "jds" for one resume against many JDs
+JOB_KINDS = ('resumes', 'jds')
+
+ITEM_STATES = ('pending', 'running', 'done', 'failed')
+
+
+def _job_status(job_id, kind, created_at, counts):
+    total = sum(counts.values())
+    finished = counts.get('done', 0) + counts.get('failed', 0)
+    return {
+        'job_id': job_id,
+        'kind': kind,
+        'created_at': created_at,
+        'total': total,
+        **{state: counts.get(state, 0) for state in ITEM_STATES},
+        'progress': round(finished / total, 4) if total else 1.0,
+        'state': 'finished' if finished == total else ('running' if finished or counts.get('running') else 'queued')
+    }
+
+
+class MemoryJobBackend:
+    """
+    In-process stand-in for tests and single-process use; jobs are lost on
+    restart. Finished jobs beyond max_jobs are dropped oldest first.
+    """
+
+    def __init__(self, max_jobs=100):
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def create(self, job_id, kind, document, options, items):
+        with self._lock:
+            self._jobs[job_id] = {
+                'kind': kind, 'document': document, 'options': options, 'created_at': time.time(),
+                'items': [{'label': label, 'text': text, 'status': 'pending', 'result': None, 'error': None,
+                           'claimed_at': None} for label, text in items]
+            }
+            self._pending.extend((job_id, index) for index in range(len(items)))
+            finished = [j for j, job in self._jobs.items()
+                        if all(item['status'] in ('done', 'failed') for item in job['items'])]
+            for old_id in finished[:max(len(self._jobs) - self.max_jobs, 0)]:
+                del self._jobs[old_id]
+
+    def claim(self):
+        with self._lock:
+            while self._pending:
+                job_id, index = self._pending.popleft()
+                job = self._jobs.get(job_id)
+                if job is None or job['items'][index]['status'] != 'pending':
+                    continue
+                item = job['items'][index]
+                item['status'], item['claimed_at'] = 'running', time.time()
+                return {'job_id': job_id, 'index': index, 'kind': job['kind'], 'document': job['document'],
+                        'options': job['options'], 'label': item['label'], 'text': item['text']}
+        return None
+
+    def finish(self, job_id, index, result=None, error=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job['items'][index].update(status='failed' if error else 'done', result=result, error=error,
+                                           text=None)
+
+    def recover(self, lease):
+        cutoff = time.time() - lease
+        with self._lock:
+            for job_id, job in self._jobs.items():
+                for index, item in enumerate(job['items']):
+                    if item['status'] == 'running' and item['claimed_at'] < cutoff:
+                        item['status'] = 'pending'
+                        self._pending.append((job_id, index))
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            counts = {}
+            for item in job['items']:
+                counts[item['status']] = counts.get(item['status'], 0) + 1
+            return _job_status(job_id, job['kind'], job['created_at'], counts)
+
+    def results(self, job_id, offset, limit):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return [
+                {'index': index, 'label': item['label'], 'status': item['status'],
+                 'result': item['result'], 'error': item['error']}
+                for index, item in enumerate(job['items'][offset:offset + limit], start=offset)
+            ]
+
+
+class SQLiteJobBackend:
+    """
+    Jobs and items in a SQLite file. Claims are atomic, so several worker
+    processes on one host can share the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with sqlite3.connect(path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, kind TEXT NOT NULL, document TEXT NOT NULL, "
+                "options TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS items (job_id TEXT NOT NULL, idx INTEGER NOT NULL, label TEXT NOT NULL, "
+                "text TEXT, status TEXT NOT NULL, result TEXT, error TEXT, claimed_at REAL, "
+                "PRIMARY KEY (job_id, idx))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS items_status ON items (status)")
+
+    def _connect(self):
+        # Autocommit mode; transactions are opened explicitly where needed
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def create(self, job_id, kind, document, options, items):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            conn.execute("INSERT INTO jobs VALUES (?, ?, ?, ?, ?)",
+                         (job_id, kind, document, json.dumps(options), time.time()))
+            conn.executemany(
+                "INSERT INTO items (job_id, idx, label, text, status) VALUES (?, ?, ?, ?, 'pending')",
+                [(job_id, index, label, text) for index, (label, text) in enumerate(items)]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def claim(self):
+        conn = self._connect()
+        try:
+            # IMMEDIATE takes the write lock up front, so two workers never claim the same item
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT i.job_id, i.idx, j.kind, j.document, j.options, i.label, i.text "
+                "FROM items i JOIN jobs j ON i.job_id = j.job_id WHERE i.status = 'pending' "
+                "ORDER BY j.created_at, i.idx LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE items SET status = 'running', claimed_at = ? WHERE job_id = ? AND idx = ?",
+                             (time.time(), row[0], row[1]))
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return {'job_id': row[0], 'index': row[1], 'kind': row[2], 'document': row[3],
+                'options': json.loads(row[4]), 'label': row[5], 'text': row[6]}
+
+    def finish(self, job_id, index, result=None, error=None):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE items SET status = ?, result = ?, error = ?, text = NULL WHERE job_id = ? AND idx = ?",
+                ('failed' if error else 'done', json.dumps(result) if result is not None else None, error,
+                 job_id, index)
+            )
+        finally:
+            conn.close()
+
+    def recover(self, lease):
+        conn = self._connect()
+        try:
+            conn.execute("UPDATE items SET status = 'pending' WHERE status = 'running' AND claimed_at < ?",
+                         (time.time() - lease,))
+        finally:
+            conn.close()
+
+    def status(self, job_id):
+        conn = self._connect()
+        try:
+            job = conn.execute("SELECT kind, created_at FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM items WHERE job_id = ? GROUP BY status",
+                                       (job_id,)).fetchall())
+        finally:
+            conn.close()
+        return _job_status(job_id, job[0], job[1], counts)
+
+    def results(self, job_id, offset, limit):
+        conn = self._connect()
+        try:
+            if conn.execute("SELECT 1 FROM jobs WHERE job_id = ?", (job_id,)).fetchone() is None:
+                return None
+            rows = conn.execute(
+                "SELECT idx, label, status, result, error FROM items WHERE job_id = ? ORDER BY idx LIMIT ? OFFSET ?",
+                (job_id, limit, offset)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [
+            {'index': idx, 'label': label, 'status': status,
+             'result': json.loads(result) if result is not None else None, 'error': error}
+            for idx, label, status, result, error in rows
+        ]
+
+
+class JobQueue:
+    """
+    Worker pool over a job backend.
+
+    A backend implements create(job_id, kind, document, options, items),
+    claim(), finish(job_id, index, result, error), recover(lease),
+    status(job_id) and results(job_id, offset, limit); see
+    MemoryJobBackend for the reference behaviour.
+
+    Args:
+        backend: Job backend
+        process (callable): Called with a claimed item dict, returns a
+            JSON-serializable result; exceptions mark the item failed
+        workers (int): Items processed concurrently by this process
+        lease (float): Seconds after which a running item is assumed lost
+            (e.g. its process died) and is queued again
+        poll_interval (float): Idle wait between claims, so items queued by
+            other processes sharing the backend are picked up
+    """
+
+    def __init__(self, backend, process, workers=2, lease=600, poll_interval=1.0):
+        self.backend = backend
+        self.process = process
+        self.workers = workers
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self.counters = {'submitted': 0, 'processed': 0, 'failed': 0}
+
+    def start(self):
+        """
+        Requeue lost items and start the worker threads (once)
+        """
+        with self._lock:
+            if self._threads or not self.workers:
+                return
+            self.backend.recover(self.lease)
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'job-worker-{n}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, kind, document, items, options=None):
+        """
+        Queue a job and return its ID right away
+
+        Args:
+            kind (str): "resumes" (document is a JD) or "jds" (document is a resume)
+            document (str): The shared document text
+            items (list): (label, text) pairs
+            options (dict): Passed to process() with every item
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'. Use 'resumes' or 'jds'.")
+        if not items:
+            raise ValueError("A job needs at least one item.")
+        job_id = uuid.uuid4().hex[:16]
+        self.backend.create(job_id, kind, document, options or {}, list(items))
+        with self._lock:
+            self.counters['submitted'] += 1
+        self.start()
+        self._wakeup.set()
+        return job_id
+
+    def status(self, job_id):
+        return self.backend.status(job_id)
+
+    def results(self, job_id, offset=0, limit=50):
+        return self.backend.results(job_id, max(offset, 0), max(limit, 1))
+
+    def _work(self):
+        recovered = time.monotonic()
+        while True:
+            try:
+                item = self.backend.claim()
+                if item is None and time.monotonic() - recovered >= self.lease:
+                    # Items whose result could not be stored are picked up again here
+                    recovered = time.monotonic()
+                    self.backend.recover(self.lease)
+            except Exception as e:
+                print(f"Job backend unavailable: {e}")
+                item = None
+            if item is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            try:
+                result, error = self.process(item), None
+            except Exception as e:
+                result, error = None, str(e) or type(e).__name__
+            error = self._finish(item, result, error)
+            with self._lock:
+                self.counters['failed' if error else 'processed'] += 1
+
+    def _finish(self, item, result, error):
+        """
+        Store an item's outcome. A result the backend rejects (a locked
+        database, a value that is not JSON-serializable) fails the item
+        instead of the worker thread. Returns the error that was stored.
+        """
+        try:
+            self.backend.finish(item['job_id'], item['index'], result=result, error=error)
+            return error
+        except Exception as e:
+            error = f"Could not store the result: {e}"
+        try:
+            self.backend.finish(item['job_id'], item['index'], error=error)
+        except Exception as e:
+            # Left 'running'; recover() queues it again once the lease expires
+            print(f"Could not finish item {item['index']} of job {item['job_id']}: {e}")
+        return error
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, 'workers': len(self._threads), 'backend': type(self.backend).__name__}
+
+
+def job_backend_from_env():
+    """
+    Backend chosen by JOBFIT_JOB_BACKEND: sqlite (default, at
+    JOBFIT_JOB_PATH), memory, or "package.module:factory" for an external
+    service; the factory is called without arguments
+    """
+    kind = os.environ.get('JOBFIT_JOB_BACKEND', 'sqlite')
+    if kind == 'sqlite':
+        return SQLiteJobBackend(os.environ.get('JOBFIT_JOB_PATH', DEFAULT_JOB_PATH))
+    if kind == 'memory':
+        return MemoryJobBackend()
+    module_name, _, factory = kind.partition(':')
+    if not factory:
+        raise ValueError(f"Unsupported job backend '{kind}'. Use sqlite, memory or module:factory.")
+    return getattr(importlib.import_module(module_name), factory)()
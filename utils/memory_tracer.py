@@ -0,0 +1,118 @@
+"""
+Memory Tracer
+Opt-in tracemalloc accounting for one request: peak allocation and the top
+allocation sites of every pipeline stage, plus the process peak RSS
+"""
+
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+TOP_SITES = 10
+
+# tracemalloc is process-wide, so traced requests take turns
+_trace_lock = threading.Lock()
+
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+)
+
+
+def peak_rss_bytes():
+    """
+    Highest resident set size of this process so far, or None when unknown
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+
+def _site_label(frame):
+    filename = frame.filename
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if filename.startswith(root):
+        filename = os.path.relpath(filename, root)
+    return f"{filename}:{frame.lineno}"
+
+
+class MemoryTracer:
+    """
+    Context manager tracing allocations while it is active. Wrap each unit
+    of work in stage(name); stages must run one at a time in this process
+    for the numbers to be attributable (see Pipeline.run's around_stage).
+
+    Args:
+        top (int): Allocation sites reported per stage
+        frames (int): Traceback depth kept by tracemalloc
+    """
+
+    def __init__(self, top=TOP_SITES, frames=1):
+        self.top = top
+        self.frames = frames
+        self.stages = {}
+        self._started_tracing = False
+
+    def __enter__(self):
+        _trace_lock.acquire()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self._baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        self._peak = 0
+        return self
+
+    def __exit__(self, *exc):
+        self._peak = max(self._peak, tracemalloc.get_traced_memory()[1] - self._baseline)
+        if self._started_tracing:
+            tracemalloc.stop()
+        _trace_lock.release()
+        return False
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Record peak bytes above the stage's starting point, bytes still held
+        when it ends, and the sites that allocated them
+        """
+        before = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        self._peak = max(self._peak, tracemalloc.get_traced_memory()[1] - self._baseline)
+        start = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            diff = [stat for stat in after.compare_to(before, 'lineno') if stat.size_diff > 0][:self.top]
+            self._peak = max(self._peak, peak - self._baseline)
+            self.stages[name] = {
+                'peak_bytes': peak - start,
+                'retained_bytes': current - start,
+                'top_sites': [
+                    {'site': _site_label(stat.traceback[0]), 'bytes': stat.size_diff, 'blocks': stat.count_diff}
+                    for stat in diff
+                ]
+            }
+            tracemalloc.reset_peak()
+
+    def report(self):
+        """
+        Per-stage results plus the request peak over the starting allocation
+        and the process peak RSS
+        """
+        return {
+            'peak_bytes': self._peak,
+            'peak_rss_bytes': peak_rss_bytes(),
+            'stages': self.stages
+        }
@@ -0,0 +1,260 @@
+"""
+Metrics
+Prometheus text-format metrics without the prometheus_client dependency:
+labelled counters, gauges and histograms, plus collectors that export the
+counters other components already keep
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+CHARACTER_BUCKETS = (500, 1000, 2000, 5000, 10000, 20000, 50000, 100000)
+PAGE_BUCKETS = (1, 2, 3, 5, 10, 20, 50)
+SKILL_BUCKETS = (0, 5, 10, 20, 30, 50, 100)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escape = lambda v: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels.items()) + '}'
+
+
+class BucketHistogram:
+    """
+    Cumulative bucket counts plus sum and max, enough for a JSON stats
+    endpoint. Not thread-safe: owners observe under their own lock.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3) if self.count else 0,
+            'max': round(self.max, 3),
+            'buckets': {str(bound): n for bound, n in zip(self.buckets, self.counts)}
+        }
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric '{self.name}' takes labels {self.labelnames}, got {tuple(labels)}.")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """
+        (suffix, labels, value) triples for the exposition format
+        """
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield '', dict(zip(self.labelnames, key)), value
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels):
+        """
+        Count the block as in progress while it runs
+        """
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            histogram = self._values.get(key)
+            if histogram is None:
+                histogram = self._values[key] = BucketHistogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the duration of the block in seconds
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(h.counts), h.count, h.total) for key, h in self._values.items()]
+        for key, counts, count, total in items:
+            labels = dict(zip(self.labelnames, key))
+            # BucketHistogram already keeps cumulative bucket counts
+            for bound, n in zip(self.buckets, counts):
+                yield '_bucket', {**labels, 'le': _format_value(bound)}, n
+            yield '_bucket', {**labels, 'le': '+Inf'}, count
+            yield '_sum', labels, total
+            yield '_count', labels, count
+
+
+class Registry:
+    """
+    Metrics rendered by /metrics. Collectors are called at scrape time and
+    return (name, kind, help, [(labels, value), ...]) tuples, for values
+    that already live elsewhere (cache counters, queue sizes).
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self.register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def add_collector(self, collect):
+        self._collectors.append(collect)
+        return collect
+
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format (version 0.0.4)
+        """
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for metric in self._metrics:
+            header(metric.name, metric.kind, metric.help)
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+
+        families = {}
+        for collect in self._collectors:
+            for name, kind, help_text, samples in collect():
+                families.setdefault((name, kind, help_text), []).extend(samples)
+        for (name, kind, help_text), samples in families.items():
+            header(name, kind, help_text)
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+request_seconds = registry.histogram(
+    'jobfit_request_duration_seconds', 'HTTP request latency.', ('endpoint', 'method', 'status'))
+requests_in_flight = registry.gauge(
+    'jobfit_requests_in_flight', 'HTTP requests currently being handled.', ('endpoint',))
+stage_seconds = registry.histogram(
+    'jobfit_stage_duration_seconds', 'Time spent in each analysis pipeline stage.', ('stage',))
+stages_in_flight = registry.gauge(
+    'jobfit_stages_in_flight', 'Analysis pipeline stages currently running.', ('stage',))
+operation_seconds = registry.histogram(
+    'jobfit_operation_duration_seconds', 'Time spent in skill extraction, encoding and similarity.', ('operation',))
+file_parse_seconds = registry.histogram(
+    'jobfit_file_parse_duration_seconds', 'Time spent extracting text from uploads.', ('format',))
+document_characters = registry.histogram(
+    'jobfit_document_characters', 'Characters per analyzed document.', ('kind',), CHARACTER_BUCKETS)
+document_pages = registry.histogram(
+    'jobfit_document_pages', 'Pages per uploaded PDF.', ('format',), PAGE_BUCKETS)
+document_skills = registry.histogram(
+    'jobfit_document_skills', 'Skills found per analyzed document.', ('kind',), SKILL_BUCKETS)
+
+
+def cache_collector(name, stats):
+    """
+    Collector exporting a cache's hits/misses counters (and entries, when
+    reported) with cache="<name>"; stats returns the cache's stats() dict
+    """
+    def collect():
+        values = stats()
+        labels = {'cache': name}
+        families = [
+            ('jobfit_cache_hits_total', 'counter', 'Cache lookups answered from the cache.',
+             [(labels, values.get('hits', 0))]),
+            ('jobfit_cache_misses_total', 'counter', 'Cache lookups that had to compute the value.',
+             [(labels, values.get('misses', 0))])
+        ]
+        if 'entries' in values:
+            families.append(('jobfit_cache_entries', 'gauge', 'Entries currently held by the cache.',
+                             [(labels, values['entries'])]))
+        return families
+    return collect
@@ -0,0 +1,187 @@
+"""
+Model Loader
+Loads the sentence encoder lazily from a pinned local directory, optionally
+warming it up in a background thread
+"""
+
+import argparse
+import hashlib
+import os
+import threading
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+MODEL_DIR = os.environ.get('JOBFIT_MODEL_DIR', os.path.join(PROJECT_ROOT, 'models', MODEL_NAME))
+CHECKSUM_FILE = MODEL_DIR.rstrip(os.sep) + '.sha256'
+
+_model = None
+_identity = None
+_lock = threading.Lock()
+_status = {
+    'loaded': False,
+    'loading': False,
+    'source': None,
+    'load_seconds': None,
+    'error': None
+}
+
+
+def directory_checksum(path):
+    """
+    Compute a SHA-256 over every file in a model directory
+
+    Args:
+        path (str): Model directory
+
+    Returns:
+        str: Hex digest over relative paths and file contents
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            digest.update(os.path.relpath(file_path, path).replace(os.sep, '/').encode('utf-8'))
+            with open(file_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _expected_checksum():
+    expected = os.environ.get('JOBFIT_MODEL_SHA256')
+    if expected:
+        return expected.strip()
+    if os.path.exists(CHECKSUM_FILE):
+        with open(CHECKSUM_FILE) as f:
+            return f.read().strip()
+    return None
+
+
+def model_identity():
+    """
+    Identify the model weights that embeddings are computed with, without
+    loading them: the pinned checksum, else a checksum of MODEL_DIR, else the
+    hub model name. Persisted vectors and profiles are keyed on it.
+
+    Returns:
+        str: Stable identifier, computed once per process
+    """
+    global _identity
+    if _identity is None:
+        expected = _expected_checksum()
+        if expected:
+            _identity = f"{MODEL_NAME}@{expected}"
+        elif os.path.isdir(MODEL_DIR):
+            _identity = f"{MODEL_NAME}@{directory_checksum(MODEL_DIR)}"
+        else:
+            _identity = f"{MODEL_NAME}@hub"
+    return _identity
+
+
+def _load_model():
+    if os.path.isdir(MODEL_DIR):
+        expected = _expected_checksum()
+        if expected and directory_checksum(MODEL_DIR) != expected:
+            raise RuntimeError(f"Checksum mismatch for model directory {MODEL_DIR}")
+        # Everything is on disk, so never wait on the hub
+        os.environ.setdefault('HF_HUB_OFFLINE', '1')
+        source = MODEL_DIR
+    elif os.environ.get('JOBFIT_OFFLINE') == '1':
+        raise RuntimeError(
+            f"Model directory {MODEL_DIR} not found and JOBFIT_OFFLINE=1. "
+            f"Run 'python -m utils.model_loader download' first."
+        )
+    else:
+        print(f"Model directory {MODEL_DIR} not found, falling back to the model hub.")
+        source = MODEL_NAME
+
+    from sentence_transformers import SentenceTransformer
+    print(f"Loading AI Model ({MODEL_NAME}) from {source}...")
+    model = SentenceTransformer(source)
+    print("AI Model Loaded.")
+    return model, source
+
+
+def get_model():
+    """
+    Return the sentence encoder, loading it on first use
+    """
+    global _model
+    if _model is not None:
+        return _model
+
+    with _lock:
+        if _model is None:
+            _status['loading'] = True
+            start = time.perf_counter()
+            try:
+                _model, _status['source'] = _load_model()
+            except Exception as e:
+                _status['error'] = str(e)
+                raise
+            finally:
+                _status['loading'] = False
+            _status['loaded'] = True
+            _status['error'] = None
+            _status['load_seconds'] = round(time.perf_counter() - start, 3)
+    return _model
+
+
+def start_warmup():
+    """
+    Load the model in a background thread so the first request does not pay for it
+
+    Returns:
+        threading.Thread: The warm-up thread
+    """
+    def warm():
+        try:
+            get_model()
+        except Exception as e:
+            print(f"Model warm-up failed: {e}")
+
+    thread = threading.Thread(target=warm, name='model-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+def is_model_loaded():
+    return _model is not None
+
+
+def model_status():
+    """
+    Snapshot of the loader state for health endpoints
+    """
+    return dict(_status)
+
+
+def download_model():
+    """
+    Save the hub model into MODEL_DIR and pin its checksum next to it
+    """
+    from sentence_transformers import SentenceTransformer
+    SentenceTransformer(MODEL_NAME).save(MODEL_DIR)
+    checksum = directory_checksum(MODEL_DIR)
+    with open(CHECKSUM_FILE, 'w') as f:
+        f.write(checksum + '\n')
+    return checksum
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the local sentence encoder.")
+    parser.add_argument('command', choices=['download', 'checksum'])
+    args = parser.parse_args(argv)
+
+    if args.command == 'download':
+        checksum = download_model()
+        print(f"Saved {MODEL_NAME} to {MODEL_DIR} (sha256 {checksum})")
+    else:
+        print(directory_checksum(MODEL_DIR))
+
+
+if __name__ == '__main__':
+    main()
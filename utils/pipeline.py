@@ -0,0 +1,245 @@
+"""
+Stage Pipeline
+Runs a small DAG of analysis stages on a shared thread pool, so independent
+stages overlap and latency follows the critical path instead of the sum
+"""
+
+import os
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.metrics import BucketHistogram, stage_seconds, stages_in_flight
+
+STAGE_MS_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class StageTimeoutError(Exception):
+    """
+    A stage did not finish within its timeout
+    """
+
+
+class Stage:
+    """
+    One node of the pipeline.
+
+    Args:
+        name (str): Key of the stage output in the results
+        fn (callable): Called with the results dict; sees every dependency's output
+        deps (tuple): Names of stages (or pipeline inputs) that must finish first
+        timeout (float): Seconds before the run fails (None uses the pipeline default, 0 disables)
+    """
+
+    def __init__(self, name, fn, deps=(), timeout=None):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.timeout = timeout
+
+
+class Pipeline:
+    """
+    Validated stage graph plus per-stage timing statistics.
+
+    Args:
+        stages (list): Stage objects; order does not matter
+        inputs (tuple): Names provided by the caller of run()
+        max_workers (int): Thread pool size; 0 runs stages serially in the caller
+        default_timeout (float): Timeout for stages that do not set one, counted
+            from the moment the stage starts running
+        queue_timeout (float): Seconds a stage may wait for a free thread
+            before the run fails (None waits indefinitely)
+    """
+
+    def __init__(self, stages, inputs=(), max_workers=8, default_timeout=None, queue_timeout=None):
+        names = [stage.name for stage in stages]
+        if len(names) != len(set(names)):
+            raise ValueError("Duplicate stage names in pipeline.")
+        self.stages = {stage.name: stage for stage in stages}
+        self.inputs = tuple(inputs)
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self.queue_timeout = queue_timeout
+        self.order = self._topological_order()
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._timings = {name: BucketHistogram(STAGE_MS_BUCKETS) for name in self.order}
+
+    def _topological_order(self):
+        order, done, visiting = [], set(self.inputs), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a cycle through stage '{name}'.")
+            if name not in self.stages:
+                raise ValueError(f"Unknown pipeline dependency '{name}'.")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def _get_executor(self):
+        # Created on first use so the threads belong to the serving process
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pipeline')
+        return self._executor
+
+    def _call(self, stage, results, started_at=None):
+        with stages_in_flight.track(stage=stage.name):
+            started = time.perf_counter()
+            if started_at is not None:
+                # Tells the waiting caller when this stage's timeout starts
+                started_at.append(started)
+            value = stage.fn(results)
+            return value, (time.perf_counter() - started) * 1000
+
+    def _record(self, timings, name, elapsed_ms):
+        if timings is not None:
+            timings[name] = round(elapsed_ms, 3)
+        with self._lock:
+            self._timings[name].observe(elapsed_ms)
+        stage_seconds.observe(elapsed_ms / 1000, stage=name)
+
+    def run(self, inputs=None, only=None, timings=None, serial=False, around_stage=None):
+        """
+        Execute the stages. Timeouts only apply when a thread pool is used.
+
+        Args:
+            inputs (dict): Values for the declared pipeline inputs; outputs of
+                earlier runs may be passed too and those stages are skipped
+            only (iterable): Stages whose output is needed; their dependencies
+                run as well (None runs every stage)
+            timings (dict): Filled with stage name -> milliseconds spent in the stage
+            serial (bool): Run every stage in the calling thread, e.g. so a
+                profiler attached to it sees all the work
+            around_stage (callable): Called with each stage name; the returned
+                context manager wraps that stage (implies serial)
+
+        Returns:
+            dict: Inputs plus the output of every stage that ran
+        """
+        results = dict(inputs or {})
+        for _ in self._execute(results, only, timings, serial, around_stage):
+            pass
+        return results
+
+    def stream(self, inputs=None, only=None, timings=None):
+        """
+        Like run(), but yields (stage name, results so far) as soon as each
+        stage finishes. Closing the generator cancels stages not yet started.
+        """
+        results = dict(inputs or {})
+        for name in self._execute(results, only, timings):
+            yield name, results
+
+    def _execute(self, results, only, timings, serial=False, around_stage=None):
+        wanted = self._closure(only if only is not None else self.order, results)
+        order = [name for name in self.order if name in wanted]
+
+        if serial or around_stage or not self.max_workers:
+            for name in order:
+                with around_stage(name) if around_stage else nullcontext():
+                    results[name], elapsed = self._call(self.stages[name], results)
+                self._record(timings, name, elapsed)
+                yield name
+            return
+
+        executor = self._get_executor()
+        remaining = order
+        running = {}
+        try:
+            while remaining or running:
+                for name in [n for n in remaining if all(dep in results for dep in self.stages[n].deps)]:
+                    remaining.remove(name)
+                    stage = self.stages[name]
+                    started_at = []
+                    # Each stage sees a snapshot, so later writes never race with it
+                    future = executor.submit(self._call, stage, dict(results), started_at)
+                    running[future] = (name, time.perf_counter(), started_at)
+
+                deadlines = [deadline for deadline, _ in map(self._deadline, running.values()) if deadline is not None]
+                wait_for = max(min(deadlines) - time.perf_counter(), 0) if deadlines else None
+                done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name, _, _ = running.pop(future)
+                    results[name], elapsed = future.result()
+                    self._record(timings, name, elapsed)
+                    yield name
+
+                now = time.perf_counter()
+                for future, entry in running.items():
+                    deadline, error = self._deadline(entry)
+                    if deadline is not None and now >= deadline and not future.done():
+                        raise StageTimeoutError(error)
+        finally:
+            for future in running:
+                future.cancel()
+
+    def _deadline(self, entry):
+        """
+        (deadline, error message) of a submitted stage: its own timeout once
+        it runs, the queue timeout while it waits for a thread
+        """
+        name, submitted, started_at = entry
+        if started_at:
+            stage = self.stages[name]
+            timeout = stage.timeout if stage.timeout is not None else self.default_timeout
+            return (started_at[0] + timeout if timeout else None), f"Analysis stage '{name}' timed out."
+        if self.queue_timeout:
+            return submitted + self.queue_timeout, f"Analysis stage '{name}' waited too long for a free worker."
+        return None, None
+
+    def _closure(self, names, results):
+        needed, stack = set(), list(names)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown pipeline stage '{name}'.")
+            if name in needed or name in results:
+                continue
+            needed.add(name)
+            stack.extend(dep for dep in self.stages[name].deps if dep in self.stages)
+        return needed
+
+    def stats(self):
+        """
+        Per-stage duration distributions in milliseconds
+        """
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'default_timeout': self.default_timeout,
+                'queue_timeout': self.queue_timeout,
+                'stages': {name: self._timings[name].snapshot() for name in self.order}
+            }
+
+
+def pipeline_from_env(stages, inputs=()):
+    """
+    Build a Pipeline sized by JOBFIT_PIPELINE_WORKERS (0 = serial) with
+    JOBFIT_STAGE_TIMEOUT seconds per running stage and at most
+    JOBFIT_STAGE_QUEUE_TIMEOUT seconds waiting for a thread (0 = no timeout)
+    """
+    timeout = float(os.environ.get('JOBFIT_STAGE_TIMEOUT', '30'))
+    queue_timeout = float(os.environ.get('JOBFIT_STAGE_QUEUE_TIMEOUT', '60'))
+    return Pipeline(
+        stages,
+        inputs=inputs,
+        max_workers=int(os.environ.get('JOBFIT_PIPELINE_WORKERS', '8')),
+        default_timeout=timeout or None,
+        queue_timeout=queue_timeout or None
+    )
@@ -0,0 +1,61 @@
+"""
+Pre-fork Serving
+Hooks for a pre-forking server (see gunicorn.conf.py): the master loads the
+model and the precomputed matrices once before forking, so every worker
+shares those pages copy-on-write, and each worker gets its own slice of the
+CPU for torch
+"""
+
+import gc
+import os
+import sys
+
+
+def torch_threads_per_worker(workers):
+    """
+    JOBFIT_TORCH_THREADS, or the CPUs divided among the workers so their
+    intra-op pools do not oversubscribe the machine
+    """
+    configured = os.environ.get('JOBFIT_TORCH_THREADS')
+    if configured:
+        return int(configured)
+    return max(1, (os.cpu_count() or 1) // max(workers, 1))
+
+
+def set_torch_threads(count):
+    """
+    Limit torch's intra-op threads in this process. Torch is imported lazily
+    (and never in precomputed mode), so the OpenMP / MKL variables are set
+    too for a later import to pick up.
+    """
+    for name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[name] = str(count)
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        torch.set_num_threads(count)
+
+
+def preload_master():
+    """
+    Run in the master after the app is imported and before any worker is
+    forked. Loads and warms the model with a single torch thread: an OpenMP
+    thread pool started here would not survive the fork. Then moves every
+    object created so far out of the garbage collector's reach so collections
+    in the workers do not touch, and thereby copy, the shared pages.
+    """
+    from utils.analyzer import skill_matrix
+    from utils.model_loader import get_model
+
+    if skill_matrix is None:
+        set_torch_threads(1)
+        # Straight to the model: the micro-batching thread must start in the workers
+        get_model().encode(['python'])
+    gc.collect()
+    gc.freeze()
+
+
+def init_worker(workers):
+    """
+    Run in each worker right after the fork, before it serves requests
+    """
+    set_torch_threads(torch_threads_per_worker(workers))
@@ -0,0 +1,247 @@
+"""
+Document Profiles
+Everything derived from a single resume or job description, computed once per
+normalized text and reused across every document it is matched against
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """
+    Normalize line endings and trailing whitespace so trivially different
+    copies of a document share one profile. Line structure is preserved.
+    """
+    lines = (text or '').replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    return '\n'.join(line.rstrip() for line in lines).strip('\n')
+
+
+def profile_key(text):
+    """
+    Profile ID of a text: its content hash together with the analysis
+    version (skill taxonomy and embedding model), so profiles persisted by
+    another version are never served
+    """
+    from utils.analyzer import analysis_version
+    return hashlib.sha256(f"{analysis_version()}\0{normalize_text(text)}".encode('utf-8')).hexdigest()[:32]
+
+
+class ResumeProfile:
+    """
+    Resume-only analysis: skills with their embeddings, candidate name,
+    formatting tips and parsed sections.
+    """
+
+    def __init__(self, profile_id, text, skills, skill_embeddings, name, formatting_tips, sections):
+        self.profile_id = profile_id
+        self.text = text
+        self.skills = skills
+        self.skill_embeddings = skill_embeddings
+        self.name = name
+        self.formatting_tips = formatting_tips
+        self.sections = sections
+
+    @classmethod
+    def build(cls, resume_text):
+        # Imported here because the analyzer itself consumes profiles
+        from utils.analyzer import encode_skills, extract_skills
+        from utils.generator import extract_name
+        from utils.resume_formatter import analyze_resume_structure
+        from utils.file_parser import split_pages
+        from utils.resume_tailor import extract_resume_sections
+
+        # The ID covers the page breaks, since they shape the sections
+        profile_id = profile_key(resume_text)
+        text, page_breaks = split_pages(normalize_text(resume_text))
+        skills = sorted(extract_skills(text))
+        return cls(
+            profile_id=profile_id,
+            text=text,
+            skills=skills,
+            skill_embeddings=encode_skills(skills) if skills else None,
+            name=extract_name(text),
+            formatting_tips=analyze_resume_structure(text),
+            sections=extract_resume_sections(text, page_breaks)
+        )
+
+    def summary(self):
+        return {
+            "profile_id": self.profile_id,
+            "name": self.name,
+            "skills": self.skills
+        }
+
+
+class JobProfile:
+    """
+    JD-only analysis: skills with their embeddings, title and company,
+    company info, culture signals and the keyword signals behind the role
+    insight rules.
+    """
+
+    def __init__(self, profile_id, text, skills, skill_embeddings, job_title, company, company_info,
+                 culture_signals, jd_signals):
+        self.profile_id = profile_id
+        self.text = text
+        self.skills = skills
+        self.skill_embeddings = skill_embeddings
+        self.job_title = job_title
+        self.company = company
+        self.company_info = company_info
+        self.culture_signals = culture_signals
+        self.jd_signals = jd_signals
+
+    @classmethod
+    def build(cls, jd_text):
+        from utils.analyzer import encode_skills, extract_skills
+        from utils.company_insights import analyze_company_culture, extract_company_info, extract_jd_signals
+        from utils.generator import extract_job_details
+        from utils.file_parser import split_pages
+
+        profile_id = profile_key(jd_text)
+        text, _ = split_pages(normalize_text(jd_text))
+        skills = sorted(extract_skills(text))
+        job_title, company = extract_job_details(text)
+        return cls(
+            profile_id=profile_id,
+            text=text,
+            skills=skills,
+            skill_embeddings=encode_skills(skills) if skills else None,
+            job_title=job_title,
+            company=company,
+            company_info=extract_company_info(text),
+            culture_signals=analyze_company_culture(text),
+            jd_signals=extract_jd_signals(text)
+        )
+
+    @property
+    def job_details(self):
+        return self.job_title, self.company
+
+    def summary(self):
+        return {
+            "profile_id": self.profile_id,
+            "job_title": self.job_title,
+            "company": self.company,
+            "skills": self.skills
+        }
+
+
+class ProfileStore:
+    """
+    SQLite backend so profiles survive restarts and are shared by workers
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS profiles (profile_id TEXT PRIMARY KEY, payload BLOB NOT NULL)")
+
+    def get(self, profile_id):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            row = conn.execute("SELECT payload FROM profiles WHERE profile_id = ?", (profile_id,)).fetchone()
+        finally:
+            conn.close()
+        return pickle.loads(row[0]) if row else None
+
+    def put(self, profile):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO profiles (profile_id, payload) VALUES (?, ?)",
+                             (profile.profile_id, pickle.dumps(profile)))
+        finally:
+            conn.close()
+
+
+class ProfileCache:
+    """
+    Bounded LRU of profiles keyed by profile_key, with an optional ProfileStore.
+
+    Args:
+        factory (callable): Builds a profile from raw text
+        max_entries (int): Profiles kept in memory
+        store (ProfileStore): Persistent backend, or None
+    """
+
+    def __init__(self, factory, max_entries=1024, store=None):
+        self.factory = factory
+        self.max_entries = max_entries
+        self.store = store
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _remember(self, profile):
+        with self._lock:
+            self._entries[profile.profile_id] = profile
+            self._entries.move_to_end(profile.profile_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def get(self, profile_id):
+        """
+        Return a cached profile by ID, or None
+        """
+        with self._lock:
+            profile = self._entries.get(profile_id)
+            if profile is not None:
+                self._entries.move_to_end(profile_id)
+                self.counters['hits'] += 1
+                return profile
+
+        profile = self.store.get(profile_id) if self.store is not None else None
+        if profile is not None:
+            self._remember(profile)
+            with self._lock:
+                self.counters['hits'] += 1
+        return profile
+
+    def get_or_build(self, text):
+        """
+        Return the profile for this text, building it on first sight
+        """
+        profile = self.get(profile_key(text))
+        if profile is not None:
+            return profile
+
+        with self._lock:
+            self.counters['misses'] += 1
+        profile = self.factory(text)
+        self._remember(profile)
+        if self.store is not None:
+            self.store.put(profile)
+        return profile
+
+    def clear(self):
+        """
+        Drop the in-memory profiles (the persistent store is left alone)
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, 'entries': len(self._entries), 'max_entries': self.max_entries}
+
+
+def profile_cache_from_env(factory, prefix):
+    """
+    Build a ProfileCache sized by JOBFIT_<PREFIX>_PROFILE_CACHE_SIZE and
+    persisted to JOBFIT_<PREFIX>_PROFILE_STORE when that path is set
+    """
+    size = int(os.environ.get(f'JOBFIT_{prefix}_PROFILE_CACHE_SIZE', '1024'))
+    path = os.environ.get(f'JOBFIT_{prefix}_PROFILE_STORE')
+    return ProfileCache(factory, max_entries=size, store=ProfileStore(path) if path else None)
+
+
+resume_profiles = profile_cache_from_env(ResumeProfile.build, 'RESUME')
+job_profiles = profile_cache_from_env(JobProfile.build, 'JOB')
@@ -0,0 +1,181 @@
+"""
+Response Encoding
+Compact analysis payloads (edit lists instead of resume copies, shared
+strings), gzip/brotli compression and optional msgpack serialization
+"""
+
+import gzip
+import os
+from collections import Counter
+from difflib import SequenceMatcher
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:  # JSON only
+    msgpack = None
+
+COMPRESS_MIN_BYTES = int(os.environ.get('JOBFIT_COMPRESS_MIN_BYTES', '1024'))
+DEDUPE_MIN_LENGTH = 16
+
+
+def line_edits(original_text, new_text):
+    """
+    Line-level edit list that turns original_text into new_text
+
+    Returns:
+        list: [start, end, [replacement lines]] items; original lines
+        start..end-1 are replaced, and indexes refer to the original text
+    """
+    original_lines = original_text.split('\n')
+    new_lines = new_text.split('\n')
+    matcher = SequenceMatcher(None, original_lines, new_lines, autojunk=False)
+    return [
+        [i1, i2, new_lines[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != 'equal'
+    ]
+
+
+def apply_line_edits(original_text, edits):
+    """
+    Inverse of line_edits
+    """
+    lines = original_text.split('\n')
+    for start, end, replacement in reversed(edits):
+        lines[start:end] = replacement
+    return '\n'.join(lines)
+
+
+def compact_tailoring(tailoring_data, omit_input=False):
+    """
+    Tailoring workbench without redundant copies: the tailored resume
+    becomes tailored_edits against original_resume, and the per-line copies
+    in suggestions (original_line) and highlights (context) are dropped.
+    With omit_input the original resume is left out too; edits then apply
+    to the resume text as analyzed (see utils.profiles.normalize_text).
+    """
+    compact = dict(tailoring_data)
+    compact['tailored_edits'] = line_edits(compact['original_resume'], compact.pop('tailored_resume'))
+    compact['suggestions'] = [
+        {k: v for k, v in suggestion.items() if k != 'original_line'} for suggestion in compact['suggestions']
+    ]
+    compact['highlights'] = [
+        {k: v for k, v in highlight.items() if k != 'context'} for highlight in compact['highlights']
+    ]
+    if omit_input:
+        del compact['original_resume']
+    return compact
+
+
+def _walk_strings(value, visit):
+    if isinstance(value, str):
+        return visit(value)
+    if isinstance(value, dict):
+        return {k: _walk_strings(v, visit) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_walk_strings(v, visit) for v in value]
+    return value
+
+
+def dedupe_strings(payload, min_length=DEDUPE_MIN_LENGTH):
+    """
+    Replace string values that occur more than once with {"$s": index}
+    references into a shared table
+
+    Returns:
+        tuple: (payload with references, list of shared strings)
+    """
+    counts = Counter()
+
+    def count(text):
+        if len(text) >= min_length:
+            counts[text] += 1
+        return text
+
+    _walk_strings(payload, count)
+    table = [text for text, n in counts.items() if n > 1]
+    if not table:
+        return payload, []
+    index = {text: i for i, text in enumerate(table)}
+    return _walk_strings(payload, lambda text: {'$s': index[text]} if text in index else text), table
+
+
+def expand_strings(payload):
+    """
+    Inverse of compact_analysis' string sharing: resolves {"$s": i}
+    references against the "_strings" table and drops the table
+    """
+    payload = dict(payload)
+    table = payload.pop('_strings', [])
+
+    def expand(value):
+        if isinstance(value, dict):
+            if len(value) == 1 and '$s' in value:
+                return table[value['$s']]
+            return {k: expand(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [expand(v) for v in value]
+        return value
+
+    return expand(payload) if table else payload
+
+
+def compact_analysis(data, omit_input=False):
+    """
+    Compact form of an analysis result (or a single section of one).
+    Shared strings are listed once under "_strings".
+    """
+    data = dict(data)
+    if 'tailoring_data' in data:
+        data['tailoring_data'] = compact_tailoring(data['tailoring_data'], omit_input=omit_input)
+    data, table = dedupe_strings(data)
+    if table:
+        data['_strings'] = table
+    return data
+
+
+def msgpack_available():
+    return msgpack is not None
+
+
+def pack(payload):
+    """
+    Serialize with msgpack. Raises ValueError when msgpack is not installed.
+    """
+    if msgpack is None:
+        raise ValueError("msgpack encoding requested but the msgpack package is not installed.")
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def choose_encoding(accept_encoding):
+    """
+    Pick br (when the brotli package is installed) or gzip from an
+    Accept-Encoding header; None when neither is accepted
+    """
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+
+    for encoding in (('br', 'gzip') if brotli is not None else ('gzip',)):
+        if accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
@@ -0,0 +1,185 @@
+"""
+Result Cache
+Finished response bodies keyed by a hash of the normalized inputs and
+options, with TTL + LRU eviction and an in-process or SQLite backend
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RESULT_CACHE_PATH = os.path.join(PROJECT_ROOT, 'data', 'result_cache.sqlite')
+
+
+def result_key(**parts):
+    """
+    Stable cache key for a set of JSON-serializable request parts
+    """
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def body_etag(body):
+    return hashlib.sha1(body).hexdigest()[:20]
+
+
+class MemoryResultBackend:
+    """
+    Per-process LRU of (expires_at, etag, body, mimetype) entries
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1:]
+
+    def put(self, key, etag, body, mimetype, expires_at):
+        with self._lock:
+            self._entries[key] = (expires_at, etag, body, mimetype)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteResultBackend:
+    """
+    Entries in a SQLite file shared by every worker on the host.
+    LRU order is kept in a last_used column.
+    """
+
+    def __init__(self, path, max_entries=256):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with sqlite3.connect(path) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, etag TEXT NOT NULL, body BLOB NOT NULL, "
+                "mimetype TEXT NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key, now):
+        conn = self._connect()
+        try:
+            with conn:
+                row = conn.execute("SELECT etag, body, mimetype, expires_at FROM results WHERE key = ?",
+                                   (key,)).fetchone()
+                if row is None:
+                    return None
+                if row[3] <= now:
+                    conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    return None
+                conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (now, key))
+                return row[0], bytes(row[1]), row[2]
+        finally:
+            conn.close()
+
+    def put(self, key, etag, body, mimetype, expires_at):
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                             (key, etag, body, mimetype, expires_at, now))
+                conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+                conn.execute(
+                    "DELETE FROM results WHERE key IN "
+                    "(SELECT key FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+        finally:
+            conn.close()
+
+    def __len__(self):
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        finally:
+            conn.close()
+
+
+class ResultCache:
+    """
+    TTL front end over a result backend.
+
+    Args:
+        backend: MemoryResultBackend or SQLiteResultBackend
+        ttl (float): Seconds an entry stays valid
+    """
+
+    def __init__(self, backend, ttl=3600):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'stores': 0}
+
+    def get(self, key):
+        """
+        Returns (etag, body, mimetype) for a live entry, or None
+        """
+        entry = self.backend.get(key, time.time())
+        with self._lock:
+            self.counters['hits' if entry is not None else 'misses'] += 1
+        return entry
+
+    def put(self, key, body, mimetype):
+        """
+        Stores a response body and returns its ETag
+        """
+        etag = body_etag(body)
+        self.backend.put(key, etag, body, mimetype, time.time() + self.ttl)
+        with self._lock:
+            self.counters['stores'] += 1
+        return etag
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            **counters,
+            'entries': len(self.backend),
+            'max_entries': self.backend.max_entries,
+            'ttl': self.ttl,
+            'backend': 'sqlite' if isinstance(self.backend, SQLiteResultBackend) else 'memory'
+        }
+
+
+def result_cache_from_env():
+    """
+    Build the cache from JOBFIT_RESULT_CACHE (memory, sqlite or off),
+    JOBFIT_RESULT_CACHE_SIZE, JOBFIT_RESULT_CACHE_TTL and, for sqlite,
+    JOBFIT_RESULT_CACHE_PATH; None when disabled
+    """
+    kind = os.environ.get('JOBFIT_RESULT_CACHE', 'memory').lower()
+    if kind in ('off', '0', 'none'):
+        return None
+    size = int(os.environ.get('JOBFIT_RESULT_CACHE_SIZE', '256'))
+    ttl = float(os.environ.get('JOBFIT_RESULT_CACHE_TTL', '3600'))
+    if kind == 'sqlite':
+        path = os.environ.get('JOBFIT_RESULT_CACHE_PATH', DEFAULT_RESULT_CACHE_PATH)
+        return ResultCache(SQLiteResultBackend(path, max_entries=size), ttl=ttl)
+    if kind != 'memory':
+        raise ValueError(f"Unsupported result cache '{kind}'. Use memory, sqlite or off.")
+    return ResultCache(MemoryResultBackend(max_entries=size), ttl=ttl)
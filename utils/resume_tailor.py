@@ -4,20 +4,62 @@ Analyzes resume and suggests specific improvements to match job description
 """
 
 import re
+from collections import defaultdict
 from difflib import SequenceMatcher
 
+# "3", "Page 3", "3 of 5", "3/5", "- 3 -"
+PAGE_NUMBER_PATTERN = re.compile(r'^-?\s*(page\s*)?\d+\s*((of|/)\s*\d+)?\s*-?$', re.IGNORECASE)
 
-def extract_resume_sections(resume_text):
+
+def find_page_furniture(lines, page_breaks):
+    """
+    Find running headers and footers of a multi-page resume
+    
+    Args:
+        lines (list): Resume lines
+        page_breaks (list): Line index where each page after the first starts
+        
+    Returns:
+        set: Indices of lines that are the first or last text on a page and
+        either repeat there on another page (digits ignored) or are a bare
+        page number. The top of the first page is the real header and is kept.
+    """
+    starts = [0] + list(page_breaks)
+    ends = list(page_breaks) + [len(lines)]
+    edges = defaultdict(list)
+    furniture = set()
+    for page, (start, end) in enumerate(zip(starts, ends)):
+        filled = [i for i in range(start, end) if lines[i].strip()]
+        if not filled:
+            continue
+        for i in {filled[0], filled[-1]} - ({filled[0]} if page == 0 else set()):
+            text = lines[i].strip()
+            if PAGE_NUMBER_PATTERN.match(text):
+                furniture.add(i)
+            else:
+                edges[re.sub(r'\d+', '#', text.lower())].append(i)
+    for indices in edges.values():
+        if len(indices) >= 2:
+            furniture.update(indices)
+    return furniture
+
+
+def extract_resume_sections(resume_text, page_breaks=None):
     """
     Parse resume into sections for targeted improvements
     
     Args:
         resume_text (str): Original resume text
+        page_breaks (list): Line index where each page after the first
+            starts, if known (see file_parser.split_pages). Running headers,
+            footers and page numbers are then never taken for section
+            headings and are left out of the section text.
         
     Returns:
         dict: Resume sections with line numbers
     """
     lines = resume_text.split('\n')
+    furniture = find_page_furniture(lines, page_breaks) if page_breaks else set()
     sections = {
         'header': {'start': 0, 'end': 0, 'lines': []},
         'summary': {'start': 0, 'end': 0, 'lines': []},
@@ -42,6 +84,11 @@ def extract_resume_sections(resume_text):
     }
     
     for i, line in enumerate(lines):
+        if i in furniture:
+            # Blanked rather than dropped so line numbers stay aligned
+            if current_section:
+                sections[current_section]['lines'].append('')
+            continue
         line_lower = line.lower().strip()
         
         # Detect section headers
@@ -270,7 +317,7 @@ def create_diff_highlights(original_text, tailored_text):
     return highlights
 
 
-def generate_tailoring_analysis(resume_text, jd_text, missing_skills, matched_skills):
+def generate_tailoring_analysis(resume_text, jd_text, missing_skills, matched_skills, resume_sections=None):
     """
     Main function to generate complete tailoring workbench data
     
@@ -279,12 +326,14 @@ def generate_tailoring_analysis(resume_text, jd_text, missing_skills, matched_sk
         jd_text (str): Job description
         missing_skills (list): Skills to add
         matched_skills (list): Existing skills
+        resume_sections (dict): Sections already parsed from resume_text (optional)
         
     Returns:
         dict: Complete tailoring data
     """
     # Parse resume
-    resume_sections = extract_resume_sections(resume_text)
+    if resume_sections is None:
+        resume_sections = extract_resume_sections(resume_text)
     
     # Find insertion points
     suggestions = find_skill_insertion_points(resume_sections, missing_skills, matched_skills)
@@ -0,0 +1,184 @@
+"""
+Skill Taxonomy & Matcher
+Loads the skill vocabulary from a local file and finds every occurrence in a
+single pass over the text, independent of vocabulary size
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+from itertools import accumulate
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_TAXONOMY_PATH = os.path.join(PROJECT_ROOT, 'data', 'skill_taxonomy.json')
+
+# Words and individual punctuation marks ("node.js" -> node . js)
+_TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+_PART_RE = re.compile(r'\w+|[^\w\s]|\s+')
+# Multi-word phrases never span lines ("aws\nservices" is two list items)
+_LINE_BREAK_RE = re.compile(r'[\n\r\v\f\x1c-\x1e\x85\u2028\u2029]')
+
+# Trie key marking the end of a phrase
+_END = None
+
+SkillMatch = namedtuple('SkillMatch', ['skill', 'category', 'start', 'end'])
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+
+def _phrase_keys(phrase):
+    """
+    Turn a phrase into trie keys. After the first token each key also records
+    whether whitespace separated it from the previous token, so "node.js"
+    does not match "node . js" and "rest api" does not match "restapi".
+    """
+    keys = []
+    prev_end = None
+    for match in _TOKEN_RE.finditer(phrase):
+        if prev_end is None:
+            keys.append(match.group())
+        else:
+            keys.append((match.group(), match.start() != prev_end))
+        prev_end = match.end()
+    return keys
+
+
+class SkillTaxonomy:
+    """
+    Skills, aliases and categories compiled into a token trie.
+
+    Each entry is a dict with "name", optional "category" and optional
+    "aliases". Aliases are reported under their canonical name. fingerprint
+    changes whenever a name, category or alias does.
+    """
+
+    def __init__(self, entries):
+        self.categories = {}
+        self._trie = {}
+        digest = hashlib.sha256()
+
+        for entry in entries:
+            name = entry['name'].strip().lower()
+            if not name:
+                continue
+            self.categories[name] = entry.get('category')
+            aliases = [alias.strip().lower() for alias in entry.get('aliases') or []]
+            digest.update(json.dumps([name, entry.get('category'), aliases]).encode('utf-8'))
+            for phrase in [name] + aliases:
+                self._add_phrase(phrase, name)
+        self.fingerprint = digest.hexdigest()[:16]
+
+    @property
+    def skills(self):
+        return set(self.categories)
+
+    def __len__(self):
+        return len(self.categories)
+
+    def _add_phrase(self, phrase, skill):
+        keys = _phrase_keys(phrase)
+        if not keys:
+            return
+        node = self._trie
+        for key in keys:
+            node = node.setdefault(key, {})
+        skills = node.setdefault(_END, [])
+        if skill not in skills:
+            skills.append(skill)
+
+    def find_matches(self, text):
+        """
+        Find every skill occurrence in the text
+
+        Matches must not be glued to a letter, digit or underscore on either
+        side. Words of a phrase may be separated by any whitespace except a
+        line break. Overlapping matches ("rest" and "rest api") are all reported.
+        Offsets index into the lower-cased text, which lines up with the input
+        for everything except a handful of exotic Unicode characters.
+
+        Args:
+            text (str): Text to scan
+
+        Returns:
+            list: SkillMatch tuples ordered by start offset
+        """
+        if not text:
+            return []
+
+        text_lower = text.lower()
+        # Words, single punctuation marks and whitespace runs; together they
+        # cover the text exactly, so offsets are running sums of part lengths
+        parts = _PART_RE.findall(text_lower)
+        root = self._trie
+        candidates = [i for i, part in enumerate(parts) if part in root]
+        if not candidates:
+            return []
+
+        offsets = list(accumulate(map(len, parts), initial=0))
+        last = len(parts) - 1
+        matches = []
+
+        for i in candidates:
+            # Word parts are maximal runs, so only punctuation can be glued on the left
+            if i > 0 and not _is_word_char(parts[i][0]) and _is_word_char(parts[i - 1][0]):
+                continue
+
+            node = root[parts[i]]
+            j = i
+            while True:
+                if _END in node and (j == last or _is_word_char(parts[j][0])
+                                     or not _is_word_char(parts[j + 1][0])):
+                    for skill in node[_END]:
+                        matches.append(SkillMatch(skill, self.categories.get(skill), offsets[i], offsets[j + 1]))
+                j += 1
+                if j > last:
+                    break
+                gap = parts[j][0].isspace()
+                if gap:
+                    if _LINE_BREAK_RE.search(parts[j]):
+                        break
+                    j += 1
+                    if j > last:
+                        break
+                node = node.get((parts[j], gap))
+                if node is None:
+                    break
+
+        return matches
+
+
+def load_taxonomy(path=DEFAULT_TAXONOMY_PATH):
+    """
+    Load a taxonomy from a JSON or CSV file
+
+    JSON files hold {"skills": [{"name", "category", "aliases"}, ...]}.
+    CSV files need a "name" column and may have "category" and "aliases"
+    columns, with aliases separated by "|".
+
+    Args:
+        path (str): Taxonomy file path
+
+    Returns:
+        SkillTaxonomy: Compiled taxonomy
+    """
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            entries = [
+                {
+                    'name': row['name'],
+                    'category': row.get('category') or None,
+                    'aliases': [a for a in (row.get('aliases') or '').split('|') if a.strip()]
+                }
+                for row in csv.DictReader(f)
+            ]
+    else:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        entries = data['skills'] if isinstance(data, dict) else data
+
+    return SkillTaxonomy(entries)
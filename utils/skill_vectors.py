@@ -0,0 +1,198 @@
+"""
+Precomputed Skill Vectors
+Encodes the skill vocabulary once and serves similarity lookups without torch
+"""
+
+import argparse
+import hashlib
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from utils.vector_storage import EncodedVectors, default_encoding
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MATRIX_PATH = os.path.join(PROJECT_ROOT, 'data', 'skill_vectors.npz')
+
+
+def vocabulary_fingerprint(skills, model_name):
+    """
+    Fingerprint a skill vocabulary so a stale matrix can be detected
+
+    Args:
+        skills (iterable): Skill vocabulary
+        model_name (str): Name of the model used for encoding
+
+    Returns:
+        str: Hex digest identifying the vocabulary and model
+    """
+    digest = hashlib.sha256(model_name.encode('utf-8'))
+    for skill in sorted(skills):
+        digest.update(b'\n' + skill.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def vectors_fingerprint(vectors):
+    """
+    Fingerprint the stored vectors themselves, so re-encoding the same
+    vocabulary (float32 -> int8, say) is told apart from the original
+
+    Args:
+        vectors (EncodedVectors): Rows as stored in the matrix
+
+    Returns:
+        str: Hex digest of the encoding and the stored bytes
+    """
+    digest = hashlib.sha256(vectors.encoding.encode('utf-8'))
+    digest.update(vectors.tobytes())
+    return digest.hexdigest()
+
+
+class SkillMatrix:
+    """
+    Row-normalized embedding matrix for a fixed skill vocabulary.
+    Cosine similarity between skills reduces to a dot product of rows.
+    Rows are held in their storage encoding (float32, float16 or int8).
+    fingerprint identifies the vocabulary and model, vectors_fingerprint
+    the stored rows.
+    """
+
+    def __init__(self, vocab, vectors, fingerprint, stored_fingerprint):
+        self.vocab = list(vocab)
+        self.vectors = vectors
+        self.fingerprint = fingerprint
+        self.vectors_fingerprint = stored_fingerprint
+        self.index = {skill: i for i, skill in enumerate(self.vocab)}
+
+    def __contains__(self, skill):
+        return skill in self.index
+
+    def rows(self, skills):
+        """
+        Return the stored rows for the given skills, in order, as EncodedVectors
+        """
+        try:
+            return self.vectors.take([self.index[skill] for skill in skills])
+        except KeyError as e:
+            raise KeyError(f"Skill {e.args[0]!r} is not in the precomputed vocabulary; rebuild the skill matrix.")
+
+    def lookup(self, skills):
+        """
+        Return the embedding rows for the given skills, in order, as float32
+        """
+        return self.rows(skills).to_float32()
+
+    def similarity(self, skills_a, skills_b):
+        """
+        Cosine similarity matrix between two skill lists, computed on the
+        stored encoding (two int8 blocks are multiplied as integers)
+        """
+        return self.rows(skills_a).dot(self.rows(skills_b))
+
+
+def build_skill_matrix(model, skills, model_name, path=DEFAULT_MATRIX_PATH, encoding=None):
+    """
+    Encode the whole vocabulary once and save a normalized matrix to disk
+
+    Args:
+        model: Loaded SentenceTransformer
+        skills (iterable): Skill vocabulary
+        model_name (str): Name of the model used for encoding
+        path (str): Output .npz path
+        encoding (str): float32, float16 or int8 (default: JOBFIT_EMBEDDING_DTYPE)
+
+    Returns:
+        SkillMatrix: The freshly built matrix
+    """
+    vocab = sorted(skills)
+    embeddings = model.encode(vocab, convert_to_numpy=True, normalize_embeddings=True)
+    vectors = EncodedVectors.encode(embeddings, encoding or default_encoding())
+    fingerprint = vocabulary_fingerprint(vocab, model_name)
+    stored_fingerprint = vectors_fingerprint(vectors)
+
+    arrays = {'vocab': np.array(vocab), 'embeddings': vectors.data, 'encoding': np.array(vectors.encoding),
+              'fingerprint': np.array(fingerprint), 'vectors_fingerprint': np.array(stored_fingerprint),
+              'model_name': np.array(model_name)}
+    if vectors.scales is not None:
+        arrays['scales'] = vectors.scales
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+    return SkillMatrix(vocab, vectors, fingerprint, stored_fingerprint)
+
+
+def load_skill_matrix(skills, model_name, path=DEFAULT_MATRIX_PATH):
+    """
+    Load a precomputed matrix if it exists and matches the current vocabulary
+
+    Returns:
+        SkillMatrix or None: None when the file is missing or stale
+    """
+    if not os.path.exists(path):
+        return None
+
+    with np.load(path) as data:
+        fingerprint = str(data['fingerprint'])
+        if fingerprint != vocabulary_fingerprint(skills, model_name):
+            return None
+        encoding = str(data['encoding']) if 'encoding' in data else 'float32'
+        scales = data['scales'] if 'scales' in data else None
+        vectors = EncodedVectors(data['embeddings'], scales, encoding)
+        # Matrices written before vectors_fingerprint was stored are hashed on load
+        stored_fingerprint = (str(data['vectors_fingerprint']) if 'vectors_fingerprint' in data
+                              else vectors_fingerprint(vectors))
+        return SkillMatrix([str(s) for s in data['vocab']], vectors, fingerprint, stored_fingerprint)
+
+
+def load_or_rebuild_skill_matrix(skills, model_name, path=DEFAULT_MATRIX_PATH):
+    """
+    Load the precomputed matrix, rebuilding it when the vocabulary changed.
+
+    The rebuild runs in a subprocess so the serving process never imports
+    torch. Set JOBFIT_AUTO_REBUILD=0 to refuse to start instead.
+    """
+    matrix = load_skill_matrix(skills, model_name, path)
+    if matrix is not None:
+        return matrix
+
+    if os.environ.get('JOBFIT_AUTO_REBUILD', '1') == '0':
+        raise RuntimeError(
+            f"Skill matrix at {path} is missing or does not match the skill vocabulary. "
+            f"Run 'python -m utils.skill_vectors build' before starting the server."
+        )
+
+    print("Skill matrix missing or stale, rebuilding...")
+    subprocess.run(
+        [sys.executable, '-m', 'utils.skill_vectors', 'build', '--output', path],
+        cwd=PROJECT_ROOT, check=True
+    )
+
+    matrix = load_skill_matrix(skills, model_name, path)
+    if matrix is None:
+        raise RuntimeError(f"Rebuilt skill matrix at {path} still does not match the skill vocabulary.")
+    return matrix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the precomputed skill embedding matrix.")
+    parser.add_argument('command', choices=['build'])
+    parser.add_argument('--output', default=DEFAULT_MATRIX_PATH, help="Path of the .npz file to write")
+    parser.add_argument('--encoding', choices=['float32', 'float16', 'int8'], help="Storage encoding of the rows")
+    args = parser.parse_args(argv)
+
+    # The build step always needs the real model
+    os.environ['JOBFIT_EMBEDDING_MODE'] = 'model'
+    from utils import analyzer
+    from utils.model_loader import get_model
+
+    matrix = build_skill_matrix(get_model(), analyzer.COMMON_SKILLS, analyzer.MODEL_NAME, args.output, args.encoding)
+    print(f"Saved {len(matrix.vocab)} {matrix.vectors.encoding} skill vectors to {args.output}")
+
+
+if __name__ == '__main__':
+    main()